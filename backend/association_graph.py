@@ -0,0 +1,231 @@
+"""
+Граф ассоциаций для оценки похожести
+
+Собирает word_categories.WORD_CATEGORIES и выученные категории
+AILearningSystem в CSR-структуру (indptr/indices/weights по id слова)
+и заранее считает силу связей на 1 и 2 шага. get_similarity получает
+силу ассоциации за O(степени вершины), без вызова most_similar.
+
+Граф собирается офлайн (или один раз при старте, если файла нет) и во
+время работы не перестраивается: выученные после этого категории
+учитывает AILearningSystem.get_learned_similarity, а неизменный граф
+сохраняет одинаковую оценку для головоломки дня (отпечаток в daily.py).
+Чтобы включить новые категории в граф, пересоберите файл и перезапустите
+сервер.
+
+Сборка файла (из папки backend):
+    python association_graph.py [ai_learning_data.json] [association_graph.npz]
+"""
+
+import hashlib
+import json
+import os
+import sys
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+
+from logger import get_logger
+
+logger = get_logger("graph")
+
+DEFAULT_GRAPH_PATH = "association_graph.npz"
+
+CURATED_WEIGHT = 1.0     # связь из WORD_CATEGORIES
+LEARNED_WEIGHT = 0.6     # связь из выученной категории (как в get_learned_similarity)
+HOP2_DECAY = 0.5         # ослабление связи через промежуточное слово
+HOP2_MAX_PER_WORD = 64   # 2-шаговых соседей на слово (плюс обратные связи от других слов)
+
+
+def _normalize(word: str) -> str:
+    return word.lower().strip().replace('ё', 'е')
+
+
+def _to_csr(rows: dict, size: int):
+    """rows: {id: {neighbor_id: weight}} → (indptr, indices, weights)"""
+    indptr = np.zeros(size + 1, dtype=np.int32)
+    for node, neighbors in rows.items():
+        indptr[node + 1] = len(neighbors)
+    np.cumsum(indptr, out=indptr)
+
+    indices = np.empty(indptr[-1], dtype=np.int32)
+    weights = np.empty(indptr[-1], dtype=np.float32)
+    for node, neighbors in rows.items():
+        start = indptr[node]
+        for offset, neighbor in enumerate(sorted(neighbors)):
+            indices[start + offset] = neighbor
+            weights[start + offset] = neighbors[neighbor]
+    return indptr, indices, weights
+
+
+def build_arrays(curated: dict, learned: dict = None) -> dict:
+    """Компилирует словари ассоциаций в массивы CSR для 1 и 2 шагов"""
+    edges = {}
+
+    def add_edge(a, b, weight):
+        if a == b or not a or not b or ' ' in a or ' ' in b:
+            return
+        for x, y in ((a, b), (b, a)):
+            row = edges.setdefault(x, {})
+            if weight > row.get(y, 0.0):
+                row[y] = weight
+
+    for key, associations in curated.items():
+        for word in associations:
+            add_edge(_normalize(key), _normalize(word), CURATED_WEIGHT)
+
+    for key, words in (learned or {}).items():
+        for word in words:
+            add_edge(_normalize(key), _normalize(word), LEARNED_WEIGHT)
+
+    vocab = sorted(set(edges) | {w for row in edges.values() for w in row})
+    word_to_id = {w: i for i, w in enumerate(vocab)}
+
+    hop1 = {
+        word_to_id[a]: {word_to_id[b]: w for b, w in row.items()}
+        for a, row in edges.items()
+    }
+
+    hop2 = {}
+    for a, neighbors in hop1.items():
+        reach = {}
+        for b, w_ab in neighbors.items():
+            for c, w_bc in hop1.get(b, {}).items():
+                if c == a or c in neighbors:
+                    continue
+                strength = w_ab * w_bc * HOP2_DECAY
+                if strength > reach.get(c, 0.0):
+                    reach[c] = strength
+        if len(reach) > HOP2_MAX_PER_WORD:
+            strongest = sorted(reach.items(), key=lambda x: x[1], reverse=True)[:HOP2_MAX_PER_WORD]
+            reach = dict(strongest)
+        if reach:
+            hop2[a] = reach
+
+    # Ограничение режет строки по-разному (a оставил c, а c не оставил a):
+    # добавляем обратные связи, чтобы strength(a, c) == strength(c, a)
+    for a, reach in list(hop2.items()):
+        for c, strength in reach.items():
+            row = hop2.setdefault(c, {})
+            if strength > row.get(a, 0.0):
+                row[a] = strength
+
+    indptr1, indices1, weights1 = _to_csr(hop1, len(vocab))
+    indptr2, indices2, weights2 = _to_csr(hop2, len(vocab))
+    return {
+        'vocab': np.array(vocab, dtype=str),
+        'hop1_indptr': indptr1, 'hop1_indices': indices1, 'hop1_weights': weights1,
+        'hop2_indptr': indptr2, 'hop2_indices': indices2, 'hop2_weights': weights2,
+    }
+
+
+class _CSR:
+    """Строки CSR в массивах array для быстрого bisect без numpy-скаляров"""
+
+    __slots__ = ("indptr", "indices", "weights")
+
+    def __init__(self, indptr, indices, weights):
+        self.indptr = array('i', np.asarray(indptr, dtype=np.int32).tobytes())
+        self.indices = array('i', np.asarray(indices, dtype=np.int32).tobytes())
+        self.weights = array('f', np.asarray(weights, dtype=np.float32).tobytes())
+
+    def get(self, row: int, column: int) -> float:
+        start = self.indptr[row]
+        end = self.indptr[row + 1]
+        pos = bisect_left(self.indices, column, start, end)
+        if pos < end and self.indices[pos] == column:
+            return self.weights[pos]
+        return 0.0
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+
+def arrays_fingerprint(arrays: dict) -> str:
+    """Короткий хэш содержимого графа: меняется вместе со связями"""
+    digest = hashlib.sha1()
+    for key in sorted(arrays):
+        digest.update(key.encode())
+        digest.update(np.ascontiguousarray(arrays[key]).tobytes())
+    return digest.hexdigest()[:16]
+
+
+class AssociationGraph:
+    def __init__(self, arrays: dict):
+        self.fingerprint = arrays_fingerprint(arrays)
+        self.vocab = [str(w) for w in arrays['vocab']]
+        self.word_to_id = {w: i for i, w in enumerate(self.vocab)}
+        self.hop1 = _CSR(arrays['hop1_indptr'], arrays['hop1_indices'], arrays['hop1_weights'])
+        self.hop2 = _CSR(arrays['hop2_indptr'], arrays['hop2_indices'], arrays['hop2_weights'])
+
+    @classmethod
+    def build(cls, curated: dict, learned: dict = None) -> "AssociationGraph":
+        return cls(build_arrays(curated, learned))
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_GRAPH_PATH) -> "AssociationGraph":
+        with np.load(path) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def strength(self, word1: str, word2: str) -> float:
+        """Сила ассоциации: прямая связь, иначе лучший путь через одно слово"""
+        id1 = self.word_to_id.get(word1)
+        if id1 is None:
+            return 0.0
+        id2 = self.word_to_id.get(word2)
+        if id2 is None:
+            return 0.0
+        direct = self.hop1.get(id1, id2)
+        if direct:
+            return direct
+        return self.hop2.get(id1, id2)
+
+    def stats(self) -> dict:
+        return {
+            "words": len(self.vocab),
+            "edges_1hop": self.hop1.nnz,
+            "edges_2hop": self.hop2.nnz,
+            "fingerprint": self.fingerprint,
+        }
+
+
+def load_learned_categories(ai_data_path: str) -> dict:
+    """Категории из файла AILearningSystem (без загрузки всей AI системы)"""
+    if not os.path.exists(ai_data_path):
+        return {}
+    with open(ai_data_path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('categories', {})
+
+
+def load_or_build(graph_path: str = DEFAULT_GRAPH_PATH, ai_system=None) -> AssociationGraph:
+    """Загружает собранный граф или собирает его в памяти при отсутствии файла.
+
+    Категории AI берутся на момент вызова; позже граф не обновляется.
+    """
+    if os.path.exists(graph_path):
+        graph = AssociationGraph.load(graph_path)
+    else:
+        from word_categories import WORD_CATEGORIES
+        learned = dict(ai_system.word_categories) if ai_system else {}
+        graph = AssociationGraph.build(WORD_CATEGORIES, learned)
+    logger.info(f"🕸️ Граф ассоциаций: {graph.stats()}")
+    return graph
+
+
+def main():
+    from word_categories import WORD_CATEGORIES
+
+    ai_data_path = sys.argv[1] if len(sys.argv) > 1 else 'ai_learning_data.json'
+    graph_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_GRAPH_PATH
+
+    arrays = build_arrays(WORD_CATEGORIES, load_learned_categories(ai_data_path))
+    np.savez(graph_path, **arrays)
+
+    graph = AssociationGraph(arrays)
+    print(f"✓ Граф сохранен в {graph_path}: {graph.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Автодополнение слов по префиксу
+
+Индекс — отсортированный список слов: диапазон слов с префиксом
+находится двумя bisect. Все слова один раз упорядочиваются по популярности
+(score), и для каждого префикса с диапазоном больше DENSE_RANGE топ-K
+считается при построении. Остальные префиксы покрывают не больше
+DENSE_RANGE слов, и их топ-K выбирается частичной сортировкой на лету.
+"""
+
+from bisect import bisect_left
+
+import numpy as np
+
+from logger import get_logger
+from metrics import timed
+
+logger = get_logger("autocomplete")
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 20
+DENSE_RANGE = 64
+
+POPULAR_BONUS = 1000.0
+LENGTH_PENALTY = 0.01
+
+
+class PrefixIndex:
+    def __init__(self, words, order_rank, limit=MAX_LIMIT):
+        self.words = words
+        # order_rank[i] — место слова i в общем рейтинге популярности (0 — лучшее)
+        self.order_rank = order_rank
+        self.by_rank = np.argsort(order_rank).astype(np.int32)
+        self.limit = limit
+        self._top = {}
+
+    @classmethod
+    def build(cls, word_database: dict, popular=()) -> "PrefixIndex":
+        """Популярные слова, затем часто угадываемые, затем короткие"""
+        keys = list(word_database)
+        words = sorted(keys)
+        count = len(words)
+
+        # База из load_dictionary.py уже отсортирована — тогда обходим values() по порядку
+        infos = word_database.values() if words == keys else map(word_database.__getitem__, words)
+        weights = np.array(
+            [info.get('frequency', 0) + info.get('times_guessed', 0) for info in infos],
+            dtype=np.float64
+        )
+        weights -= LENGTH_PENALTY * np.fromiter(map(len, words), dtype=np.float64, count=count)
+        for word in popular:
+            position = bisect_left(words, word)
+            if position < count and words[position] == word:
+                weights[position] += POPULAR_BONUS
+
+        # Равный вес — раньше по алфавиту
+        order = np.lexsort((np.arange(count), -weights))
+        order_rank = np.empty(count, dtype=np.int32)
+        order_rank[order] = np.arange(count, dtype=np.int32)
+
+        index = cls(words, order_rank)
+        index._expand("", 0, count)
+        logger.info(f"🔎 Индекс автодополнения: {count} слов, {len(index._top)} префиксов")
+        return index
+
+    def _expand(self, prefix: str, start: int, end: int):
+        """Записывает топ-K для префикса и рекурсивно для его крупных продолжений"""
+        if end - start <= DENSE_RANGE:
+            return
+        if prefix:
+            self._top[prefix] = self._select(start, end, self.limit)
+
+        words = self.words
+        depth = len(prefix)
+        position = start
+        while position < end:
+            word = words[position]
+            if len(word) <= depth:
+                position += 1
+                continue
+            child = word[:depth + 1]
+            child_end = bisect_left(words, child + '\uffff', position, end)
+            self._expand(child, position, child_end)
+            position = child_end
+
+    def _select(self, start: int, end: int, limit: int) -> tuple:
+        ranks = self.order_rank[start:end]
+        if end - start > limit:
+            ranks = np.partition(ranks, limit - 1)[:limit]
+        ranks = np.sort(ranks)
+        return tuple(self.words[i] for i in self.by_rank[ranks])
+
+    @timed("complete")
+    def complete(self, prefix: str, limit: int = DEFAULT_LIMIT) -> list:
+        """До limit слов с префиксом, самые популярные первыми"""
+        prefix = prefix.lower().strip().replace('ё', 'е')
+        if not prefix:
+            return []
+        limit = max(1, min(limit, self.limit))
+
+        precomputed = self._top.get(prefix)
+        if precomputed is not None:
+            return list(precomputed[:limit])
+
+        start = bisect_left(self.words, prefix)
+        end = bisect_left(self.words, prefix + '\uffff', start)
+        if start == end:
+            return []
+        return list(self._select(start, end, limit))
@@ -0,0 +1,8 @@
+"""
+Бенчмарки WORDWEAVE
+
+Запуск из папки backend:
+    python -m benchmarks.micro            # микробенчмарки движка
+    python -m benchmarks.load             # нагрузка на WebSocket сервер
+Ключ --save-baseline обновляет benchmarks/baselines.json.
+"""
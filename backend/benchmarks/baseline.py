@@ -0,0 +1,67 @@
+"""
+Хранение и сравнение базовых результатов бенчмарков
+"""
+
+import json
+import os
+import statistics
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+# Рост p50 больше чем на этот процент считается регрессией
+DEFAULT_THRESHOLD = 0.20
+
+
+def summarize(samples_ns):
+    """Сводка по списку замеров в наносекундах"""
+    ordered = sorted(samples_ns)
+    count = len(ordered)
+    total_seconds = sum(ordered) / 1e9
+    return {
+        'count': count,
+        'mean_us': round(statistics.fmean(ordered) / 1000, 3),
+        'p50_us': round(ordered[count // 2] / 1000, 3),
+        'p99_us': round(ordered[min(count - 1, int(count * 0.99))] / 1000, 3),
+        'ops_per_sec': round(count / total_seconds, 1) if total_seconds else 0.0,
+    }
+
+
+def load_baselines():
+    if not os.path.exists(BASELINES_PATH):
+        return {}
+    with open(BASELINES_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baselines(suite, results):
+    """Сохраняет результаты набора (micro / load) как новый базовый уровень"""
+    baselines = load_baselines()
+    baselines[suite] = results
+    with open(BASELINES_PATH, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare(suite, results, threshold=DEFAULT_THRESHOLD):
+    """Печатает таблицу с отклонением от базового уровня.
+
+    Возвращает список названий бенчмарков, у которых p50 вырос больше порога.
+    """
+    baseline = load_baselines().get(suite, {})
+    regressions = []
+
+    print(f"{'бенчмарк':<40} {'p50 мкс':>10} {'p99 мкс':>10} {'база p50':>10} {'Δ':>8}")
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base and base.get('p50_us'):
+            delta = (current['p50_us'] - base['p50_us']) / base['p50_us']
+            delta_text = f"{delta:+.0%}"
+            if delta > threshold:
+                regressions.append(name)
+                delta_text += " ⚠️"
+            base_text = f"{base['p50_us']:.3f}"
+        else:
+            delta_text, base_text = "-", "-"
+        print(f"{name:<40} {current['p50_us']:>10.3f} {current['p99_us']:>10.3f} {base_text:>10} {delta_text:>8}")
+
+    return regressions
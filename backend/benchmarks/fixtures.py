@@ -0,0 +1,87 @@
+"""
+Синтетические данные для бенчмарков: небольшая база слов и
+word2vec модель, чтобы всё работало без скачивания RusVectōrēs
+"""
+
+import json
+import os
+import random
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+from popular_words import get_popular_words
+from vector_backend import save_word2vec_format
+from word_similarity import DEFAULT_MODEL_PATH
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPACT_WORDS_PATH = os.path.join(BACKEND_DIR, 'words_compact.json')
+
+
+def sample_words(count=5000, seed=42):
+    """Популярные слова + случайная выборка из words_compact.json"""
+    rng = random.Random(seed)
+    words = set(get_popular_words())
+    with open(COMPACT_WORDS_PATH, 'r', encoding='utf-8') as f:
+        compact = json.load(f)
+    words.update(rng.sample(compact, min(count, len(compact))))
+    return sorted(words)
+
+
+def build_vectors(words, vector_size=300, clusters=64, seed=42):
+    """Кластеризованные случайные векторы: у каждого слова есть осмысленные соседи"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, vector_size)).astype(np.float32)
+    assignment = rng.integers(0, clusters, size=len(words))
+    noise = rng.normal(scale=0.6, size=(len(words), vector_size)).astype(np.float32)
+    return centers[assignment] + noise
+
+
+def build_word_database(words):
+    """Та же структура записей, что создает load_dictionary.create_word_database"""
+    return {
+        word: {
+            'id': idx,
+            'word': word,
+            'length': len(word),
+            'first_letter': word[0],
+            'last_letter': word[-1],
+            'rank': 99999,
+            'frequency': 0,
+            'times_guessed': 0,
+            'times_used_as_target': 0
+        }
+        for idx, word in enumerate(words)
+    }
+
+
+def create_fixture_dir(word_count=5000, vector_size=300, directory=None):
+    """Создает папку с word_database.json и моделью под стандартным именем.
+
+    Сервер, запущенный с этой папкой в качестве рабочей, подхватит
+    синтетические данные вместо настоящих.
+    """
+    directory = directory or tempfile.mkdtemp(prefix='wordweave_bench_')
+    words = sample_words(word_count)
+
+    with open(os.path.join(directory, 'word_database.json'), 'w', encoding='utf-8') as f:
+        json.dump(build_word_database(words), f, ensure_ascii=False)
+
+    save_word2vec_format(
+        os.path.join(directory, DEFAULT_MODEL_PATH),
+        [f"{w}_NOUN" for w in words],
+        build_vectors(words, vector_size=vector_size)
+    )
+
+    return directory, words
+
+
+@contextmanager
+def fixture_dir(word_count=5000, vector_size=300):
+    """create_fixture_dir во временной папке, которая удаляется после бенчмарка"""
+    directory = tempfile.mkdtemp(prefix='wordweave_bench_')
+    try:
+        yield create_fixture_dir(word_count, vector_size, directory)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
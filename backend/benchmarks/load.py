@@ -0,0 +1,174 @@
+"""
+Нагрузочный тест WebSocket сервера
+
+Поднимает uvicorn с main:app на синтетических данных (или подключается к
+уже работающему серверу через --url), открывает N одновременных клиентов и
+играет сценарные одиночные игры. Печатает пропускную способность и p50/p99
+времени ответа на попытку.
+
+Свой сервер запускается без лимита частоты (SERVER_ENV): тест меряет
+обработку попыток, а не token bucket. Против сервера с лимитами клиенты
+держат темп --rate попыток в секунду и ждут retry_after из ошибки
+rate_limited, прежде чем повторить попытку.
+
+    python -m benchmarks.load --clients 50 --games 3 --guesses 20 [--rate 4]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+
+import websockets
+
+from benchmarks.baseline import compare, save_baselines, summarize
+from benchmarks.fixtures import BACKEND_DIR, fixture_dir
+
+# Лимиты соединений (connection_manager) для своего сервера
+SERVER_ENV = {
+    "WORDWEAVE_WS_RATE": "1000000",
+    "WORDWEAVE_WS_BURST": "1000000",
+    "WORDWEAVE_WS_MAX_PER_HOST": "0",
+}
+MAX_RETRIES = 20
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(directory, port):
+    """Запускает uvicorn в отдельном процессе с рабочей папкой фикстур"""
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, WORDWEAVE_LOG_LEVEL="WARNING", **SERVER_ENV)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=directory, env=env
+    )
+
+
+async def wait_until_up(url, timeout=120.0):
+    """Ждет, пока /readyz не ответит 200"""
+    readyz = url.replace("ws://", "http://", 1).replace("wss://", "https://", 1) + "/readyz"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(readyz, timeout=2):
+                return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Сервер не поднялся")
+
+
+async def request(ws, message, expected):
+    """Отправляет сообщение и ждет ответ типа expected.
+
+    ping пропускается, на rate_limited клиент ждет retry_after и повторяет;
+    возвращает ответ и время от последней отправки в нс.
+    """
+    for _ in range(MAX_RETRIES):
+        start = time.perf_counter_ns()
+        await ws.send(json.dumps(message))
+        while True:
+            reply = json.loads(await ws.recv())
+            if reply.get("type") == "ping":
+                await ws.send(json.dumps({"action": "pong"}))
+                continue
+            break
+        if reply.get("error") == "rate_limited":
+            await asyncio.sleep(reply.get("retry_after") or 0.1)
+            continue
+        if reply.get("type") != expected:
+            raise RuntimeError(f"Ожидался {expected}, получено {reply}")
+        return reply, time.perf_counter_ns() - start
+    raise RuntimeError(f"{message['action']}: лимит частоты не отпускает")
+
+
+async def play_client(url, words, games, guesses, latencies, rng, rate=0.0):
+    client_id = f"bench_{uuid.uuid4().hex[:10]}"
+    interval = 1.0 / rate if rate > 0 else 0.0
+    async with websockets.connect(f"{url}/ws/{client_id}", max_size=None) as ws:
+        for _ in range(games):
+            started, _ = await request(ws, {"action": "start_solo"}, "game_started")
+            game_id = started["game_id"]
+
+            for word in rng.sample(words, guesses):
+                sent = time.monotonic()
+                result, elapsed = await request(
+                    ws, {"action": "guess", "game_id": game_id, "word": word}, "guess_result"
+                )
+                latencies.append(elapsed)
+                if result.get("is_correct"):
+                    break
+                if interval:
+                    await asyncio.sleep(max(0.0, interval - (time.monotonic() - sent)))
+
+
+async def run_load(url, words, clients, games, guesses, rate=0.0, seed=11):
+    latencies = []
+    rngs = [random.Random(seed + i) for i in range(clients)]
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        play_client(url, words, games, guesses, latencies, rngs[i], rate)
+        for i in range(clients)
+    ))
+    elapsed = time.perf_counter() - started
+    return latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест WORDWEAVE")
+    parser.add_argument('--url', help="ws://host:port работающего сервера (по умолчанию поднимается свой)")
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--games', type=int, default=3)
+    parser.add_argument('--guesses', type=int, default=20)
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help="попыток в секунду на клиента (0 — без паузы)")
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=0.20)
+    args = parser.parse_args()
+
+    with fixture_dir() as (directory, words):
+        server = None
+        url = args.url
+        if not url:
+            port = free_port()
+            server = start_server(directory, port)
+            url = f"ws://127.0.0.1:{port}"
+
+        try:
+            asyncio.run(wait_until_up(url))
+            latencies, elapsed = asyncio.run(
+                run_load(url, words, args.clients, args.games, args.guesses, args.rate)
+            )
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+
+    summary = summarize(latencies)
+    # Для нагрузочного теста важна общая пропускная способность, а не сумма задержек
+    summary['ops_per_sec'] = round(len(latencies) / elapsed, 1)
+    name = f"ws.guess[c={args.clients}]"
+
+    print(f"📊 {len(latencies)} попыток за {elapsed:.2f} с — {summary['ops_per_sec']} попыток/с")
+    regressions = compare('load', {name: summary}, args.threshold)
+    if args.save_baseline:
+        save_baselines('load', {name: summary})
+        print("✓ Базовый уровень сохранен")
+    elif regressions:
+        print(f"❌ Регрессия: {name}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Микробенчмарки горячего пути на синтетической модели
+
+    python -m benchmarks.micro [--iterations 2000] [--save-baseline]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+from ai_learning import AILearningSystem
+from game_logic import GameSession, GameMode
+from popular_words import get_popular_words
+from word_similarity import DEFAULT_MODEL_PATH, WordSimilarityEngine
+
+from benchmarks.baseline import compare, save_baselines, summarize
+from benchmarks.fixtures import fixture_dir
+
+
+def measure(func, args_list, iterations):
+    """Вызывает func по кругу на args_list и возвращает замеры в нс"""
+    samples = []
+    perf = time.perf_counter_ns
+    n = len(args_list)
+    for i in range(iterations):
+        args = args_list[i % n]
+        start = perf()
+        func(*args)
+        samples.append(perf() - start)
+    return samples
+
+
+def build_engine(directory):
+    ai_system = AILearningSystem(data_file=os.path.join(directory, 'ai_learning_data.json'))
+    engine = WordSimilarityEngine(
+        database_path=os.path.join(directory, 'word_database.json'),
+        ai_system=ai_system,
+        model_path=os.path.join(directory, DEFAULT_MODEL_PATH)
+    )
+    return engine, ai_system
+
+
+def run(iterations, seed=7):
+    with fixture_dir() as (directory, words):
+        engine, ai_system = build_engine(directory)
+        try:
+            return measure_all(engine, ai_system, words, iterations, seed)
+        finally:
+            ai_system.close()
+
+
+def measure_all(engine, ai_system, words, iterations, seed):
+    rng = random.Random(seed)
+
+    targets = [w for w in get_popular_words() if w in engine.word_database]
+    pairs = [(rng.choice(words), rng.choice(targets)) for _ in range(256)]
+
+    # Прогреваем AI ассоциации, чтобы get_learned_similarity ходил не только в пустоту
+    for guess, target in pairs[:128]:
+        ai_system.learn_from_guess(guess, target, 0.5, rng.randint(1, 5000), False)
+    ai_system.flush()
+
+    validate_args = [(w,) for w in rng.sample(words, 200)] + [("несуществующееслово",)]
+
+    results = {}
+    results['engine.get_similarity'] = summarize(measure(engine.get_similarity, pairs, iterations))
+    results['engine.get_rank'] = summarize(measure(engine.get_rank, pairs, iterations))
+    batches = [([g for g, _ in pairs[i:i + 100]], targets[i % len(targets)]) for i in range(0, 256, 32)]
+    results['engine.score_batch[100]'] = summarize(
+        measure(engine.score_batch, batches, max(1, iterations // 20))
+    )
+    results['engine.validate_word'] = summarize(measure(engine.validate_word, validate_args, iterations))
+    results['ai.get_learned_similarity'] = summarize(
+        measure(ai_system.get_learned_similarity, pairs, iterations)
+    )
+
+    # make_guess: новая игра на каждые 50 попыток, чтобы не упираться в повторы
+    games = []
+
+    def play(word):
+        if not games or len(games[-1].history["bench"]) >= 50:
+            games.append(GameSession("bench", GameMode.SOLO, engine, players=["bench"]))
+        games[-1].make_guess("bench", word)
+
+    guess_args = [(w,) for w in rng.sample(words, min(len(words), 1000))]
+    results['game.make_guess'] = summarize(measure(play, guess_args, iterations))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Микробенчмарки WORDWEAVE")
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=0.20)
+    args = parser.parse_args()
+
+    logging.getLogger("wordweave").setLevel(logging.WARNING)
+    results = run(args.iterations)
+
+    regressions = compare('micro', results, args.threshold)
+    if args.save_baseline:
+        save_baselines('micro', results)
+        print("✓ Базовый уровень сохранен")
+    elif regressions:
+        print(f"❌ Регрессии: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Пропускная способность горячего пути на играх ботов (simulate.py)
+
+Те же игры, что считают сложность целей: жадный бот на синтетической
+модели в нескольких процессах. Задержка — одна попытка make_guess,
+ops_per_sec — попыток в секунду по всем процессам.
+
+    python -m benchmarks.selfplay [--targets 40] [--games 5] [--workers 2] [--save-baseline]
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+from popular_words import get_popular_words
+from simulate import run_simulation
+from word_similarity import DEFAULT_MODEL_PATH
+
+from benchmarks.baseline import compare, save_baselines, summarize
+from benchmarks.fixtures import fixture_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Самоигра ботов как бенчмарк")
+    parser.add_argument('--targets', type=int, default=40)
+    parser.add_argument('--games', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=0.20)
+    args = parser.parse_args()
+
+    logging.getLogger("wordweave").setLevel(logging.WARNING)
+    with fixture_dir() as (directory, words):
+        vocabulary = set(words)
+        targets = sorted(w for w in get_popular_words() if w in vocabulary)[:args.targets]
+
+        records, elapsed = run_simulation(
+            directory, os.path.join(directory, DEFAULT_MODEL_PATH), targets, args.games, args.workers
+        )
+    latencies = [ns for record in records for ns in record["latencies_ns"]]
+    summary = summarize(latencies)
+    summary['ops_per_sec'] = round(len(latencies) / elapsed, 1)
+    name = f"selfplay.make_guess[w={args.workers}]"
+
+    solved = sum(1 for record in records if record["solved"])
+    print(f"📊 {len(records)} игр ({solved} решено), {len(latencies)} попыток за {elapsed:.2f} с — "
+          f"{summary['ops_per_sec']} попыток/с")
+    regressions = compare('selfplay', {name: summary}, args.threshold)
+    if args.save_baseline:
+        save_baselines('selfplay', {name: summary})
+        print("✓ Базовый уровень сохранен")
+    elif regressions:
+        print(f"❌ Регрессия: {name}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
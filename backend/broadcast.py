@@ -0,0 +1,147 @@
+"""
+Рассылка событий игры игрокам и зрителям
+
+BroadcastChannel — подписчики одной игры. Сообщение кодируется в JSON
+один раз и раскладывается по очередям соединений (ConnectionManager.broadcast),
+поэтому рассылка сотне зрителей стоит одного json.dumps, а медленный
+сокет не задерживает остальных.
+
+Lobby — комната на N игроков: игра начинается, когда комната заполнена.
+"""
+
+import secrets
+from typing import Dict, List, Optional, Set
+
+from logger import get_logger
+
+logger = get_logger("broadcast")
+
+MAX_SPECTATORS = 500
+MIN_LOBBY_SIZE = 2
+MAX_LOBBY_SIZE = 8
+
+
+class BroadcastChannel:
+    """Подписчики одной игры: игроки и зрители"""
+
+    def __init__(self, game_id: str, manager, players=()):
+        self.game_id = game_id
+        self.manager = manager
+        self.players: List[str] = list(players)
+        self.spectators: Set[str] = set()
+
+    def subscribers(self) -> List[str]:
+        return self.players + [s for s in self.spectators if s not in self.players]
+
+    def add_spectator(self, client_id: str) -> bool:
+        if client_id in self.spectators:
+            return True
+        if len(self.spectators) >= MAX_SPECTATORS:
+            return False
+        self.spectators.add(client_id)
+        return True
+
+    def remove(self, client_id: str):
+        self.spectators.discard(client_id)
+
+    async def publish(self, message: dict, exclude: Optional[str] = None) -> int:
+        """Отправляет сообщение всем подписчикам, кроме exclude"""
+        recipients = [c for c in self.subscribers() if c != exclude]
+        if not recipients:
+            return 0
+        return await self.manager.broadcast(message, recipients)
+
+
+class Lobby:
+    """Комната ожидания на size игроков"""
+
+    def __init__(self, lobby_id: str, size: int, host: str):
+        self.lobby_id = lobby_id
+        self.size = size
+        self.players: List[str] = [host]
+
+    @property
+    def is_full(self) -> bool:
+        return len(self.players) >= self.size
+
+    def info(self) -> dict:
+        return {
+            "lobby_id": self.lobby_id,
+            "size": self.size,
+            "players": list(self.players),
+        }
+
+
+class ChannelRegistry:
+    """Каналы активных игр и открытые лобби"""
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.channels: Dict[str, BroadcastChannel] = {}
+        self.lobbies: Dict[str, Lobby] = {}
+
+    def open(self, game) -> BroadcastChannel:
+        channel = self.channels.get(game.game_id)
+        if channel is None:
+            channel = BroadcastChannel(game.game_id, self.manager, game.players)
+            self.channels[game.game_id] = channel
+        return channel
+
+    def get(self, game_id: str) -> Optional[BroadcastChannel]:
+        return self.channels.get(game_id)
+
+    def close(self, game_id: str):
+        self.channels.pop(game_id, None)
+
+    # ========== ЛОББИ ==========
+
+    def create_lobby(self, host: str, size) -> Lobby:
+        try:
+            size = int(size)
+        except (TypeError, ValueError, OverflowError):
+            size = MIN_LOBBY_SIZE
+        size = max(MIN_LOBBY_SIZE, min(size, MAX_LOBBY_SIZE))
+
+        self.leave_lobbies(host)
+        lobby = Lobby(secrets.token_hex(3), size, host)
+        self.lobbies[lobby.lobby_id] = lobby
+        logger.info(f"🚪 Лобби {lobby.lobby_id} на {size} игроков создано ({host})")
+        return lobby
+
+    def join_lobby(self, lobby_id, client_id: str) -> Optional[Lobby]:
+        if not isinstance(lobby_id, str):
+            return None
+        lobby = self.lobbies.get(lobby_id)
+        if lobby is None or lobby.is_full:
+            return None
+        if client_id not in lobby.players:
+            self.leave_lobbies(client_id)
+            lobby.players.append(client_id)
+        if lobby.is_full:
+            del self.lobbies[lobby.lobby_id]
+        return lobby
+
+    def leave_lobbies(self, client_id: str) -> List[Lobby]:
+        """Убирает игрока из ожидающих лобби; пустые лобби удаляются"""
+        changed = []
+        for lobby_id, lobby in list(self.lobbies.items()):
+            if client_id in lobby.players:
+                lobby.players.remove(client_id)
+                if lobby.players:
+                    changed.append(lobby)
+                else:
+                    del self.lobbies[lobby_id]
+        return changed
+
+    def drop_client(self, client_id: str) -> List[Lobby]:
+        """Отключившийся клиент перестает быть зрителем и покидает лобби"""
+        for channel in self.channels.values():
+            channel.remove(client_id)
+        return self.leave_lobbies(client_id)
+
+    def stats(self) -> dict:
+        return {
+            "channels": len(self.channels),
+            "spectators": sum(len(c.spectators) for c in self.channels.values()),
+            "lobbies": len(self.lobbies),
+        }
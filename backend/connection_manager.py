@@ -0,0 +1,313 @@
+"""
+Управление WebSocket соединениями
+
+Каждое соединение получает:
+- token bucket на входящие сообщения (у каждого клиента своя доля пропускной
+  способности, каждое отклоненное сообщение получает ошибку с retry_after,
+  а устойчивый флуд — отключение);
+- ограниченную очередь исходящих сообщений и отдельную задачу отправки:
+  обработчики не ждут медленного клиента, а переполнение очереди означает
+  отключение «медленного потребителя»;
+- heartbeat: если от клиента ничего не приходило HEARTBEAT_INTERVAL, сервер
+  шлет ping (даже когда очередь отправки не пустеет), и соединение, от
+  которого ничего не приходило дольше HEARTBEAT_TIMEOUT, закрывается.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Callable, Dict, List
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+import metrics
+from logger import get_logger
+
+logger = get_logger("connections")
+
+RATE_PER_SECOND = float(os.environ.get("WORDWEAVE_WS_RATE", "5"))
+RATE_BURST = float(os.environ.get("WORDWEAVE_WS_BURST", "20"))
+# После стольких отброшенных подряд сообщений клиент отключается
+MAX_LIMITED_STREAK = 50
+SEND_QUEUE_SIZE = int(os.environ.get("WORDWEAVE_WS_SEND_QUEUE", "64"))
+SEND_TIMEOUT = 10.0
+HEARTBEAT_INTERVAL = float(os.environ.get("WORDWEAVE_WS_HEARTBEAT", "15"))
+HEARTBEAT_TIMEOUT = 3 * HEARTBEAT_INTERVAL
+MAX_MESSAGE_SIZE = 4096
+MAX_CONNECTIONS = int(os.environ.get("WORDWEAVE_WS_MAX_CONNECTIONS", "10000"))
+# Лимит соединений с одного адреса выключен по умолчанию (0): за прокси или NAT
+# все клиенты приходят с одного адреса. Реальный адрес клиента берется из
+# WORDWEAVE_WS_FORWARDED_HEADER (например, x-forwarded-for), если прокси его ставит.
+MAX_CONNECTIONS_PER_HOST = int(os.environ.get("WORDWEAVE_WS_MAX_PER_HOST", "0"))
+FORWARDED_HEADER = os.environ.get("WORDWEAVE_WS_FORWARDED_HEADER", "").strip().lower()
+
+# Стоимость действия в токенах: автодополнение дешевое, pong бесплатный
+ACTION_COST = {'pong': 0.0, 'complete': 0.25}
+
+# Коды закрытия
+CLOSE_GOING_AWAY = 1001
+CLOSE_POLICY = 1008
+CLOSE_TOO_BIG = 1009
+CLOSE_TRY_AGAIN = 1013
+CLOSE_REPLACED = 4000
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float = RATE_PER_SECOND, capacity: float = RATE_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def consume(self, cost: float = 1.0) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < cost:
+            return False
+        self.tokens -= cost
+        return True
+
+    def retry_after(self, cost: float = 1.0) -> float:
+        """Через сколько секунд накопится cost токенов"""
+        if self.rate <= 0:
+            return float(HEARTBEAT_INTERVAL)
+        return max(0.0, (cost - self.tokens) / self.rate)
+
+
+def client_host(websocket: WebSocket):
+    """Адрес клиента: из доверенного заголовка прокси или адрес сокета"""
+    if FORWARDED_HEADER:
+        forwarded = websocket.headers.get(FORWARDED_HEADER)
+        if forwarded:
+            # Первый адрес в цепочке — исходный клиент
+            return forwarded.split(",")[0].strip()
+    return websocket.client.host if websocket.client else None
+
+
+class Connection:
+    """Одно WebSocket соединение клиента со своей очередью и лимитами"""
+
+    def __init__(self, websocket: WebSocket, client_id: str):
+        self.websocket = websocket
+        self.client_id = client_id
+        self.host = client_host(websocket)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.bucket = TokenBucket()
+        self.connected_at = time.monotonic()
+        self.last_seen = self.connected_at
+        self.last_ping = self.connected_at
+        self.closed = False
+        self.sender = None
+        self.messages_in = 0
+        self.messages_out = 0
+        self.rate_limited = 0
+        self.limited_streak = 0
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "client_id": self.client_id,
+            "connected_seconds": round(now - self.connected_at, 1),
+            "idle_seconds": round(now - self.last_seen, 1),
+            "messages_in": self.messages_in,
+            "messages_out": self.messages_out,
+            "rate_limited": self.rate_limited,
+            "send_queue": self.queue.qsize(),
+        }
+
+
+class ConnectionManager:
+    def __init__(self):
+        self.active_connections: Dict[str, Connection] = {}
+        self._close_callbacks: List[Callable[[str, WebSocket], None]] = []
+
+    def on_close(self, callback: Callable[[str, WebSocket], None]):
+        """callback(client_id, websocket) вызывается при любом закрытии соединения"""
+        self._close_callbacks.append(callback)
+
+    def is_connected(self, client_id: str) -> bool:
+        return client_id in self.active_connections
+
+    async def connect(self, websocket: WebSocket, client_id: str):
+        """Принимает соединение; None, если сервер или хост перегружен"""
+        await websocket.accept()
+
+        host = client_host(websocket)
+        replacing = client_id in self.active_connections
+        if not replacing and (len(self.active_connections) >= MAX_CONNECTIONS
+                              or self._host_full(host)):
+            metrics.WS_DISCONNECTS.labels("capacity").inc()
+            logger.warning(f"⚠️ Отклонено соединение {client_id} ({host}): превышен лимит")
+            await websocket.close(code=CLOSE_TRY_AGAIN)
+            return None
+
+        previous = self.active_connections.get(client_id)
+        if previous is not None:
+            # Тот же клиент переподключился (например, из другой вкладки)
+            self._close(previous, CLOSE_REPLACED, "replaced")
+
+        connection = Connection(websocket, client_id)
+        connection.sender = asyncio.create_task(self._send_loop(connection))
+        self.active_connections[client_id] = connection
+        logger.info(f"✓ Подключен: {client_id}")
+        return connection
+
+    def _host_full(self, host) -> bool:
+        if MAX_CONNECTIONS_PER_HOST <= 0 or host is None:
+            return False
+        per_host = sum(1 for c in self.active_connections.values() if c.host == host)
+        return per_host >= MAX_CONNECTIONS_PER_HOST
+
+    def disconnect(self, connection: Connection, reason: str = "client"):
+        self._close(connection, None, reason)
+
+    def _close(self, connection: Connection, code, reason: str):
+        if connection.closed:
+            return
+        connection.closed = True
+        if connection.sender is not None:
+            connection.sender.cancel()
+        if self.active_connections.get(connection.client_id) is connection:
+            del self.active_connections[connection.client_id]
+        metrics.WS_DISCONNECTS.labels(reason).inc()
+        logger.info(f"✗ Отключен: {connection.client_id} ({reason})")
+
+        for callback in self._close_callbacks:
+            try:
+                callback(connection.client_id, connection.websocket)
+            except Exception as e:
+                logger.error(f"❌ Ошибка обработчика закрытия: {e}")
+
+        if code is not None:
+            asyncio.create_task(self._close_socket(connection.websocket, code))
+
+    @staticmethod
+    async def _close_socket(websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+    # ========== ПРИЕМ ==========
+
+    async def receive(self, connection: Connection) -> str:
+        """Следующее сообщение клиента; WebSocketDisconnect, если соединение мертво"""
+        if connection.closed:
+            raise WebSocketDisconnect(CLOSE_GOING_AWAY)
+        try:
+            text = await asyncio.wait_for(connection.websocket.receive_text(), HEARTBEAT_TIMEOUT)
+        except asyncio.TimeoutError:
+            self._close(connection, CLOSE_GOING_AWAY, "heartbeat")
+            raise WebSocketDisconnect(CLOSE_GOING_AWAY)
+
+        connection.last_seen = time.monotonic()
+        connection.messages_in += 1
+        if len(text) > MAX_MESSAGE_SIZE:
+            self._close(connection, CLOSE_TOO_BIG, "too_large")
+            raise WebSocketDisconnect(CLOSE_TOO_BIG)
+        return text
+
+    def allow(self, connection: Connection, action) -> bool:
+        """Проверяет лимит частоты.
+
+        На каждое отклоненное сообщение клиент получает ошибку с action и
+        retry_after, чтобы не ждать ответа, которого не будет; устойчивый
+        флуд закрывает соединение.
+        """
+        cost = ACTION_COST.get(action, 1.0) if isinstance(action, str) else 1.0
+        if connection.bucket.consume(cost):
+            connection.limited_streak = 0
+            return True
+
+        connection.rate_limited += 1
+        connection.limited_streak += 1
+        metrics.WS_RATE_LIMITED.inc()
+        if connection.limited_streak >= MAX_LIMITED_STREAK:
+            logger.warning(f"⚠️ {connection.client_id}: флуд, соединение закрыто")
+            self._close(connection, CLOSE_POLICY, "rate_limit")
+            return False
+
+        self._enqueue(json.dumps({
+            'type': 'error',
+            'error': 'rate_limited',
+            'action': action if isinstance(action, str) else None,
+            'retry_after': round(connection.bucket.retry_after(cost), 3),
+            'message': 'Слишком много запросов, подождите немного'
+        }), connection.client_id)
+        return False
+
+    # ========== ОТПРАВКА ==========
+
+    async def send_personal_message(self, message: dict, client_id: str):
+        """Ставит сообщение в очередь клиента, не дожидаясь отправки"""
+        self._enqueue(json.dumps(message), client_id)
+
+    async def broadcast(self, message: dict, client_ids) -> int:
+        """Кодирует сообщение один раз и раскладывает по очередям получателей.
+
+        Каждое соединение отправляет из своей задачи с SEND_TIMEOUT,
+        так что медленный получатель не задерживает остальных.
+        """
+        text = json.dumps(message)
+        delivered = sum(1 for client_id in client_ids if self._enqueue(text, client_id))
+        metrics.WS_BROADCAST_RECIPIENTS.observe(delivered)
+        return delivered
+
+    def _enqueue(self, text: str, client_id: str) -> bool:
+        connection = self.active_connections.get(client_id)
+        if connection is None or connection.closed:
+            return False
+        metrics.WS_SEND_QUEUE.observe(connection.queue.qsize())
+        try:
+            connection.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"⚠️ {client_id}: очередь отправки переполнена, отключаем")
+            self._close(connection, CLOSE_TRY_AGAIN, "slow_consumer")
+            return False
+
+    async def _send_loop(self, connection: Connection):
+        websocket = connection.websocket
+        ping = json.dumps({'type': 'ping'})
+        try:
+            while True:
+                # Ping зависит от тишины со стороны клиента, а не от простоя
+                # очереди: зритель с потоком сообщений тоже должен отвечать pong
+                now = time.monotonic()
+                quiet = now - max(connection.last_seen, connection.last_ping)
+                if quiet >= HEARTBEAT_INTERVAL:
+                    text = ping
+                    connection.last_ping = now
+                else:
+                    try:
+                        text = await asyncio.wait_for(connection.queue.get(), HEARTBEAT_INTERVAL - quiet)
+                    except asyncio.TimeoutError:
+                        continue
+                await asyncio.wait_for(websocket.send_text(text), SEND_TIMEOUT)
+                connection.messages_out += 1
+        except asyncio.CancelledError:
+            pass
+        except asyncio.TimeoutError:
+            self._close(connection, CLOSE_TRY_AGAIN, "slow_consumer")
+        except Exception:
+            self._close(connection, None, "send_error")
+
+    def stats(self) -> dict:
+        connections = [c.stats() for c in self.active_connections.values()]
+        connections.sort(key=lambda c: c["messages_in"], reverse=True)
+        return {
+            "connections": len(connections),
+            "limits": {
+                "rate_per_second": RATE_PER_SECOND,
+                "burst": RATE_BURST,
+                "max_connections": MAX_CONNECTIONS,
+                "max_per_host": MAX_CONNECTIONS_PER_HOST,
+                "send_queue": SEND_QUEUE_SIZE,
+                "heartbeat_seconds": HEARTBEAT_INTERVAL,
+            },
+            "clients": connections,
+        }
@@ -0,0 +1,42 @@
+"""
+Конвертация Word2Vec модели в формат vector_backend (офлайн)
+
+    python convert_model.py [ruscorpora_upos_skipgram_300_2_2019.bin] [выходное_имя]
+
+Пишет <имя>.npy (нормированные векторы float32) и <имя>.vocab рядом
+с моделью; сервер подхватывает их вместо .bin. Для форматов кроме
+бинарного word2vec нужен gensim (requirements-offline.txt).
+"""
+
+import sys
+import time
+
+from vector_backend import VectorModel, normalize_rows
+from word_similarity import DEFAULT_MODEL_PATH
+
+
+def load_source(path: str) -> VectorModel:
+    if path.endswith(".bin"):
+        return VectorModel.load_word2vec_format(path)
+
+    from gensim.models import KeyedVectors
+    if path.endswith((".kv", ".model")):
+        keyed = KeyedVectors.load(path)
+    else:
+        keyed = KeyedVectors.load_word2vec_format(path, binary=False)
+    return VectorModel(keyed.index_to_key, normalize_rows(keyed.vectors.astype("float32")))
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_MODEL_PATH
+    target = sys.argv[2] if len(sys.argv) > 2 else VectorModel.converted_path(source)
+
+    start = time.time()
+    model = load_source(source)
+    model.save(target)
+    print(f"✓ {len(model)} векторов × {model.vector_size} → {target}.npy / {target}.vocab "
+          f"за {time.time() - start:.1f}с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Ежедневная головоломка: одно загаданное слово на день для всех игроков
+
+Результаты (похожесть и ранг) для каждой попытки считаются один раз
+и хранятся в общей таблице головоломки, поэтому популярные слова у всех
+игроков отвечаются из памяти. Таблицу можно посчитать заранее:
+
+    python daily.py [--date 2026-01-31] [--all]
+
+Файлы сохраняются в daily_cache/<дата>-<модель>.json и подхватываются сервером.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+from logger import get_logger
+from metrics import timed, CacheStats
+from popular_words import get_popular_words
+
+logger = get_logger("daily")
+
+DAILY_CACHE_DIR = "daily_cache"
+EPOCH = date(2025, 1, 1)
+
+
+def today_utc() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def seconds_until_next_day() -> int:
+    """Сколько секунд ответ на сегодняшнюю головоломку остается актуальным"""
+    now = datetime.now(timezone.utc)
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), timezone.utc)
+    return max(1, int((tomorrow - now).total_seconds()))
+
+
+def pick_daily_target(day: date, candidates) -> str:
+    """Детерминированный выбор слова дня: одинаковый на всех воркерах"""
+    candidates = sorted(candidates)
+    if not candidates:
+        return "ошибка"
+    digest = hashlib.sha256(f"wordweave-daily-{day.isoformat()}".encode()).digest()
+    return candidates[int.from_bytes(digest[:8], "big") % len(candidates)]
+
+
+class DailyPuzzle:
+    def __init__(self, day: date, target_word: str, similarity_engine):
+        self.date = day
+        self.number = (day - EPOCH).days + 1
+        self.target_word = target_word
+        self.similarity_engine = similarity_engine
+        self._scores = {}
+        self._lock = threading.Lock()
+        self._stats = CacheStats("daily")
+
+    @property
+    def cache_path(self) -> str:
+        # Ранги зависят от модели, поэтому таблица своя для каждой модели
+        model = self.similarity_engine.model_name
+        return os.path.join(DAILY_CACHE_DIR, f"{self.date.isoformat()}-{model}.json")
+
+    @timed("daily_score")
+    def score(self, word: str) -> tuple:
+        """(similarity, rank) для уже проверенного слова, из общей таблицы"""
+        cached = self._scores.get(word)
+        if cached is not None:
+            self._stats.hit()
+            return cached
+
+        self._stats.miss()
+        engine = self.similarity_engine
+        result = (
+            round(engine.get_similarity(word, self.target_word), 4),
+            engine.get_rank(word, self.target_word)
+        )
+        # Первый посчитанный результат фиксируется на весь день
+        with self._lock:
+            return self._scores.setdefault(word, result)
+
+    def precompute(self, words) -> int:
+        """Заполняет таблицу для списка слов (фоновая задача или офлайн-скрипт)"""
+        count = 0
+        for word in words:
+            if word in self.similarity_engine.word_database:
+                self.score(word)
+                count += 1
+        return count
+
+    def warm_up(self) -> int:
+        """Соседи загаданного слова и популярные слова — самые частые попытки"""
+        neighbors = [w for w, _ in self.similarity_engine.get_synonyms(self.target_word, top_n=100)]
+        count = self.precompute(neighbors + list(get_popular_words()))
+        logger.info(f"📅 Головоломка #{self.number}: подготовлено {count} результатов")
+        return count
+
+    def save(self):
+        os.makedirs(DAILY_CACHE_DIR, exist_ok=True)
+        data = {
+            "date": self.date.isoformat(),
+            "target": self.target_word,
+            "model": self.similarity_engine.model_name,
+            "scoring": self.similarity_engine.scoring_fingerprint(),
+            "scores": {w: list(v) for w, v in self._scores.items()},
+        }
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+    def load(self) -> bool:
+        """Подхватывает заранее посчитанную таблицу, если она для того же слова
+        и посчитана тем же набором сигналов (модель, граф, AI)"""
+        if not os.path.exists(self.cache_path):
+            return False
+        with open(self.cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("target") != self.target_word or data.get("model") != self.similarity_engine.model_name:
+            return False
+        if data.get("scoring") != self.similarity_engine.scoring_fingerprint():
+            logger.info(f"📅 Кэш головоломки #{self.number} посчитан другим движком, пересчитываем")
+            return False
+        with self._lock:
+            for word, (similarity, rank) in data.get("scores", {}).items():
+                self._scores.setdefault(word, (similarity, rank))
+        logger.info(f"📅 Загружено {len(self._scores)} результатов головоломки #{self.number}")
+        return True
+
+    def info(self) -> dict:
+        return {
+            "date": self.date.isoformat(),
+            "number": self.number,
+            "cached_scores": len(self._scores),
+        }
+
+
+class DailyPuzzleManager:
+    """Держит головоломку текущего дня и создает новую при смене даты
+
+    Головоломку следующего дня можно подготовить заранее (prepare) — тогда
+    в полночь get только подменяет ссылку и не читает кэш с диска.
+    """
+
+    def __init__(self, similarity_engine):
+        self.similarity_engine = similarity_engine
+        self._puzzle = None
+        self._next = None
+        self._lock = threading.Lock()
+
+    def caches(self) -> list:
+        """Таблицы результатов загруженных головоломок (для учета памяти)"""
+        return [p._scores for p in (self._puzzle, self._next) if p is not None]
+
+    def candidates(self) -> list:
+        database = self.similarity_engine.word_database
+        return [w for w in get_popular_words() if w in database]
+
+    def _build(self, day: date) -> DailyPuzzle:
+        target = pick_daily_target(day, self.candidates())
+        puzzle = DailyPuzzle(day, target, self.similarity_engine)
+        try:
+            puzzle.load()
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось загрузить кэш головоломки: {e}")
+        return puzzle
+
+    def peek(self, day: date = None):
+        """Головоломка дня, если она уже создана; None — get будет ее строить"""
+        day = day or today_utc()
+        puzzle = self._puzzle
+        if puzzle is not None and puzzle.date == day:
+            return puzzle
+        return None
+
+    def prepare(self, day: date) -> DailyPuzzle:
+        """Строит и прогревает головоломку дня заранее, не делая ее текущей"""
+        prepared = self._next
+        if prepared is not None and prepared.date == day:
+            return prepared
+        puzzle = self._build(day)
+        puzzle.warm_up()
+        with self._lock:
+            current = self._puzzle
+            if current is None or current.date < day:
+                self._next = puzzle
+        return puzzle
+
+    def get(self, day: date = None) -> DailyPuzzle:
+        day = day or today_utc()
+        puzzle = self._puzzle
+        if puzzle is not None and puzzle.date == day:
+            return puzzle
+
+        with self._lock:
+            if self._puzzle is None or self._puzzle.date != day:
+                if self._next is not None and self._next.date == day:
+                    self._puzzle, self._next = self._next, None
+                else:
+                    self._puzzle = self._build(day)
+            return self._puzzle
+
+
+def main():
+    """Офлайн-подсчет таблицы результатов для головоломки дня"""
+    from ai_learning import AILearningSystem
+    from association_graph import DEFAULT_GRAPH_PATH, load_or_build
+    from word_similarity import WordSimilarityEngine
+    from model_registry import MODEL_PATH
+
+    parser = argparse.ArgumentParser(description="Подготовка ежедневной головоломки")
+    parser.add_argument('--date', help="дата в формате ГГГГ-ММ-ДД (по умолчанию сегодня, UTC)")
+    parser.add_argument('--all', action='store_true', help="посчитать ранги для всего словаря")
+    args = parser.parse_args()
+
+    day = date.fromisoformat(args.date) if args.date else today_utc()
+    # Движок собирается как в main.initialize_components: AI и граф участвуют в оценке
+    ai_system = AILearningSystem(data_file='ai_learning_data.json')
+    engine = WordSimilarityEngine(
+        database_path='word_database.json', ai_system=ai_system, model_path=MODEL_PATH
+    )
+    engine.association_graph = load_or_build(DEFAULT_GRAPH_PATH, ai_system)
+    puzzle = DailyPuzzleManager(engine).get(day)
+
+    puzzle.warm_up()
+    if args.all:
+        puzzle.precompute(engine.get_all_words())
+    puzzle.save()
+    ai_system.close()
+    print(f"✓ Головоломка #{puzzle.number} ({day}): {len(puzzle._scores)} результатов → {puzzle.cache_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Сложность загаданных слов по результатам самоигры (simulate.py)
+
+Файл target_difficulty.json лежит рядом с базой слов и привязан к модели:
+при другой модели ранги другие, и статистика не используется. Выбор
+слова для новой игры пропускает цели, которые бот решает слишком долго
+или не решает вовсе.
+"""
+
+import json
+import os
+from typing import Dict, Optional
+
+from logger import get_logger
+
+logger = get_logger("difficulty")
+
+DIFFICULTY_PATH = "target_difficulty.json"
+# Цель слишком сложная, если медиана попыток бота выше или он решает ее реже
+MAX_MEDIAN_ATTEMPTS = float(os.environ.get("WORDWEAVE_MAX_TARGET_ATTEMPTS", "80"))
+MIN_SOLVE_RATE = float(os.environ.get("WORDWEAVE_MIN_TARGET_SOLVE_RATE", "0.5"))
+
+
+class TargetDifficulty:
+    def __init__(self, targets: Dict[str, dict], model: Optional[str] = None):
+        self.targets = targets
+        self.model = model
+
+    @classmethod
+    def load(cls, path: str, model_name: str) -> Optional["TargetDifficulty"]:
+        """Статистика для model_name; None, если файла нет или он от другой модели"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Не удалось прочитать {path}: {e}")
+            return None
+
+        if data.get("model") != model_name:
+            logger.warning(f"⚠️ {path} посчитан для модели {data.get('model')}, пропускаем")
+            return None
+
+        difficulty = cls(data.get("targets", {}), model_name)
+        logger.info(f"🎯 Сложность целей: {difficulty.stats()}")
+        return difficulty
+
+    def get(self, word: str) -> Optional[dict]:
+        return self.targets.get(word)
+
+    def is_too_hard(self, word: str) -> bool:
+        stats = self.targets.get(word)
+        if stats is None:
+            return False
+        return stats["median_attempts"] > MAX_MEDIAN_ATTEMPTS or stats["solve_rate"] < MIN_SOLVE_RATE
+
+    def playable(self, candidates) -> list:
+        """Кандидаты без слишком сложных целей (слова без статистики остаются)"""
+        playable = [w for w in candidates if not self.is_too_hard(w)]
+        return playable or list(candidates)
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "targets": len(self.targets),
+            "too_hard": sum(1 for w in self.targets if self.is_too_hard(w)),
+        }
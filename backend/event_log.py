@@ -0,0 +1,350 @@
+"""
+Колоночный журнал попыток для аналитики
+
+Каждая попытка — 20 байт в колонках фиксированной ширины: время,
+игра, слово, ранг, похожесть и номер попытки. Обработчик только
+добавляет кортеж в deque (меньше микросекунды); поток event-log раз в
+FLUSH_INTERVAL переводит слова в id, собирает колонки в массивы numpy
+и дописывает их в файлы текущего сегмента.
+
+Сегмент — папка events/<время начала>/:
+    meta.json       начало сегмента (колонка time — мс от него) и типы колонок
+    games.jsonl     номер игры в сегменте → game_id, игрок, цель, режим
+    <колонка>.bin   значения подряд, только добавление
+
+Сегмент закрывается по числу событий или по возрасту; старые удаляются.
+Читать можно и открытый сегмент: длина — минимум по колонкам.
+
+    python event_log.py [events]    сводка по журналу
+"""
+
+import json
+import os
+import shutil
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+import metrics
+from logger import get_logger
+
+logger = get_logger("events")
+
+DEFAULT_EVENTS_DIR = os.environ.get("WORDWEAVE_EVENTS_DIR", "events")
+FLUSH_INTERVAL = 1.0
+SEGMENT_EVENTS = 1_000_000
+SEGMENT_SECONDS = 24 * 3600
+RETENTION_DAYS = float(os.environ.get("WORDWEAVE_EVENTS_RETENTION_DAYS", "30"))
+# Если поток записи не успевает, новые события отбрасываются, а не копятся в памяти
+MAX_PENDING = 200_000
+UNKNOWN_WORD = -1
+
+COLUMNS = {
+    "time": np.dtype("<u4"),        # мс от начала сегмента
+    "game": np.dtype("<u4"),        # строка games.jsonl
+    "word": np.dtype("<i4"),        # id слова в word_database, -1 если нет
+    "rank": np.dtype("<u4"),
+    "similarity": np.dtype("<f2"),
+    "attempt": np.dtype("<u2"),
+}
+
+EVENTS_LOGGED = metrics.counter("wordweave_events_logged_total", "Попытки, записанные в журнал")
+EVENTS_DROPPED = metrics.counter("wordweave_events_dropped_total", "Попытки, не попавшие в журнал")
+
+
+class _SegmentWriter:
+    """Открытый на запись сегмент (только поток event-log)"""
+
+    def __init__(self, directory: str):
+        self.started = time.time()
+        name = time.strftime("%Y%m%d-%H%M%S", time.gmtime(self.started))
+        self.path = os.path.join(directory, name)
+        suffix = 1
+        while os.path.exists(self.path):
+            suffix += 1
+            self.path = os.path.join(directory, f"{name}-{suffix}")
+        os.makedirs(self.path)
+
+        with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "version": 1,
+                "started": self.started,
+                "columns": {name: dtype.str for name, dtype in COLUMNS.items()},
+            }, f)
+        self.files = {name: open(os.path.join(self.path, f"{name}.bin"), "ab") for name in COLUMNS}
+        self.games_file = open(os.path.join(self.path, "games.jsonl"), "a", encoding="utf-8")
+        self.games: Dict[tuple, int] = {}
+        self.count = 0
+
+    def game_index(self, game_id: str, player: str, target: str, mode: str, target_id: int) -> int:
+        key = (game_id, player)
+        index = self.games.get(key)
+        if index is None:
+            index = len(self.games)
+            self.games[key] = index
+            self.games_file.write(json.dumps({
+                "game_id": game_id, "player": player, "target": target,
+                "target_id": target_id, "mode": mode
+            }, ensure_ascii=False) + "\n")
+        return index
+
+    def write(self, columns: Dict[str, np.ndarray]):
+        # Сначала игры: читатель не должен увидеть событие без строки игры
+        self.games_file.flush()
+        for name, values in columns.items():
+            self.files[name].write(values.tobytes())
+            self.files[name].flush()
+        self.count += len(columns["time"])
+
+    def is_full(self) -> bool:
+        return self.count >= SEGMENT_EVENTS or time.time() - self.started >= SEGMENT_SECONDS
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        self.games_file.close()
+
+
+class EventLog:
+    def __init__(self, directory: str = DEFAULT_EVENTS_DIR, word_id: Callable[[str], Optional[int]] = None):
+        self.directory = directory
+        self.word_id = word_id or (lambda word: None)
+        self._pending = deque()
+        self._stop = threading.Event()
+        self._segment: Optional[_SegmentWriter] = None
+        self.logged = 0
+        self.dropped = 0
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._writer_loop, name="event-log", daemon=True)
+        self._thread.start()
+
+    def log_guess(self, game_id: str, player: str, target: str, mode: str,
+                  word: str, rank: int, similarity: float, attempt: int):
+        """Горячий путь: только кортеж в очередь"""
+        if len(self._pending) >= MAX_PENDING:
+            self.dropped += 1
+            EVENTS_DROPPED.inc()
+            return
+        self._pending.append((time.time(), game_id, player, target, mode, word, rank, similarity, attempt))
+
+    # ========== ЗАПИСЬ (поток event-log) ==========
+
+    def _writer_loop(self):
+        self._remove_expired()
+        while not self._stop.wait(FLUSH_INTERVAL):
+            self._drain()
+        self._drain()
+        if self._segment is not None:
+            self._segment.close()
+
+    def _drain(self):
+        pending = self._pending
+        count = len(pending)
+        if not count:
+            return
+        events = [pending.popleft() for _ in range(count)]
+        try:
+            self._write(events)
+            self.logged += count
+            EVENTS_LOGGED.inc(count)
+        except Exception as e:
+            self.dropped += count
+            EVENTS_DROPPED.inc(count)
+            logger.error(f"❌ Ошибка записи журнала попыток: {e}")
+
+    def _write(self, events: list):
+        segment = self._segment
+        if segment is None or segment.is_full():
+            if segment is not None:
+                segment.close()
+                self._remove_expired()
+            segment = self._segment = _SegmentWriter(self.directory)
+
+        word_ids = {}
+
+        def lookup(word):
+            if word not in word_ids:
+                value = self.word_id(word)
+                word_ids[word] = UNKNOWN_WORD if value is None else value
+            return word_ids[word]
+
+        started = segment.started
+        columns = {name: [] for name in COLUMNS}
+        for timestamp, game_id, player, target, mode, word, rank, similarity, attempt in events:
+            columns["time"].append(max(0, int((timestamp - started) * 1000)))
+            columns["game"].append(segment.game_index(game_id, player, target, mode, lookup(target)))
+            columns["word"].append(lookup(word))
+            columns["rank"].append(rank)
+            columns["similarity"].append(similarity)
+            columns["attempt"].append(min(attempt, 0xFFFF))
+
+        segment.write({name: np.array(values, dtype=COLUMNS[name]) for name, values in columns.items()})
+
+    def _remove_expired(self):
+        cutoff = time.time() - RETENTION_DAYS * 24 * 3600
+        current = self._segment.path if self._segment is not None else None
+        for segment in list_segments(self.directory):
+            started = segment_started(segment)
+            if segment != current and started is not None and started < cutoff:
+                shutil.rmtree(segment, ignore_errors=True)
+                logger.info(f"🗑️ Сегмент журнала {os.path.basename(segment)} удален")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Ждет, пока очередь не опустеет (для тестов и остановки)"""
+        deadline = time.monotonic() + timeout
+        while self._pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._pending
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=10)
+
+    def stats(self) -> dict:
+        return {
+            "directory": self.directory,
+            "pending": len(self._pending),
+            "logged": self.logged,
+            "dropped": self.dropped,
+            "segments": len(list_segments(self.directory)),
+        }
+
+
+# ========== ЧТЕНИЕ ==========
+
+def list_segments(directory: str = DEFAULT_EVENTS_DIR) -> List[str]:
+    """Папки сегментов по времени начала"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if os.path.exists(os.path.join(directory, name, "meta.json"))
+    )
+
+
+def segment_started(path: str) -> Optional[float]:
+    try:
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            return json.load(f)["started"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+class EventSegment:
+    """Колонки одного сегмента (через mmap) и таблица его игр"""
+
+    def __init__(self, path: str, mmap: bool = True):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.started = meta["started"]
+        dtypes = {name: np.dtype(code) for name, code in meta["columns"].items()}
+
+        sizes = {name: os.path.getsize(os.path.join(path, f"{name}.bin")) // dtype.itemsize
+                 for name, dtype in dtypes.items()}
+        # Открытый сегмент мог быть дописан не во все колонки
+        self.length = min(sizes.values()) if sizes else 0
+        self.columns: Dict[str, np.ndarray] = {}
+        for name, dtype in dtypes.items():
+            file_path = os.path.join(path, f"{name}.bin")
+            if not self.length:
+                self.columns[name] = np.empty(0, dtype=dtype)
+            elif mmap:
+                self.columns[name] = np.memmap(file_path, dtype=dtype, mode="r", shape=(self.length,)).view(np.ndarray)
+            else:
+                self.columns[name] = np.fromfile(file_path, dtype=dtype, count=self.length)
+
+        with open(os.path.join(path, "games.jsonl"), "r", encoding="utf-8") as f:
+            self.games = [json.loads(line) for line in f if line.endswith("\n")]
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def timestamps(self) -> np.ndarray:
+        """Время событий в секундах Unix"""
+        return self.started + self.columns["time"].astype(np.float64) / 1000
+
+
+def read_segments(directory: str = DEFAULT_EVENTS_DIR, since: float = None,
+                  until: float = None, mmap: bool = True) -> Iterator[EventSegment]:
+    """Сегменты по порядку; since/until отсекают целые сегменты по времени.
+
+    Колонки открываются через mmap, так что проход по журналу держит
+    в памяти только текущий сегмент.
+    """
+    paths = list_segments(directory)
+    starts = [segment_started(path) or 0.0 for path in paths]
+    for position, path in enumerate(paths):
+        if until is not None and starts[position] > until:
+            break
+        # Следующий сегмент начался раньше since — этот целиком до него
+        if since is not None and position + 1 < len(paths) and starts[position + 1] <= since:
+            continue
+        yield EventSegment(path, mmap=mmap)
+
+
+def summarize(directory: str = DEFAULT_EVENTS_DIR) -> dict:
+    """Сводка по всему журналу, сегмент за сегментом"""
+    events = 0
+    sessions = 0
+    solved = 0
+    solved_attempts = []
+    first_ranks = []
+    words = Counter()
+    for segment in read_segments(directory):
+        if not len(segment):
+            continue
+        events += len(segment)
+        sessions += len(segment.games)
+        ranks = segment["rank"]
+        attempts = segment["attempt"]
+        wins = ranks == 0
+        solved += int(wins.sum())
+        solved_attempts.extend(attempts[wins].tolist())
+        first_ranks.extend(ranks[attempts == 1].tolist())
+        ids, counts = np.unique(segment["word"], return_counts=True)
+        words.update(dict(zip(ids.tolist(), counts.tolist())))
+
+    return {
+        "events": events,
+        "sessions": sessions,
+        "solved": solved,
+        "median_attempts_to_solve": statistics.median(solved_attempts) if solved_attempts else None,
+        "median_first_rank": statistics.median(first_ranks) if first_ranks else None,
+        "top_word_ids": [word_id for word_id, _ in words.most_common(20) if word_id != UNKNOWN_WORD],
+    }
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_EVENTS_DIR
+    segments = list_segments(directory)
+    size = sum(
+        os.path.getsize(os.path.join(path, name))
+        for path in segments for name in os.listdir(path)
+    )
+    summary = summarize(directory)
+
+    # id → слово, если рядом есть база слов
+    if os.path.exists('word_database.json'):
+        with open('word_database.json', 'r', encoding='utf-8') as f:
+            words_by_id = {
+                info['id']: word for word, info in json.load(f).items()
+                if isinstance(info, dict) and 'id' in info
+            }
+        summary["top_words"] = [words_by_id.get(i, i) for i in summary.pop("top_word_ids")]
+
+    print(f"📊 {len(segments)} сегментов, {size / 1024:.1f} КБ")
+    for key, value in summary.items():
+        print(f"   {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
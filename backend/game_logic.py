@@ -3,45 +3,125 @@ from typing import List, Dict, Optional
 import random
 from datetime import datetime
 from popular_words import get_popular_words
+from logger import get_logger
+from metrics import timed
+from profiling import profiled
+
+logger = get_logger("game")
 
 class GameMode(Enum):
     SOLO = "solo"
     MULTIPLAYER = "multiplayer"
+    DAILY = "daily"
 
 class GameSession:
     """Игровая сессия БЕЗ блокировки повторов"""
     
-    def __init__(self, game_id: str, mode: GameMode, similarity_engine, players: List[str] = None):
+    def __init__(self, game_id: str, mode: GameMode, similarity_engine, players: List[str] = None,
+                 target_word: Optional[str] = None, puzzle=None):
         self.game_id = game_id
         self.mode = mode
         self.similarity_engine = similarity_engine
         self.players = players or ["player"]
+        # Общая головоломка (daily.DailyPuzzle): слово и результаты общие для всех игр дня
+        self.puzzle = puzzle
         
-        # Выбираем простое слово
-        popular_words = get_popular_words()
-        available_popular = [w for w in popular_words if w in similarity_engine.word_database]
+        if puzzle is not None:
+            target_word = puzzle.target_word
         
-        if available_popular:
-            self.target_word = random.choice(available_popular)
-            print(f"✓ Игра #{game_id}: загадано ПРОСТОЕ слово '{self.target_word}'")
+        if target_word:
+            self.target_word = target_word
         else:
-            all_words = similarity_engine.get_all_words()
-            simple_words = [w for w in all_words if 4 <= len(w) <= 7]
-            
-            if simple_words:
-                self.target_word = random.choice(simple_words)
-                print(f"✓ Игра #{game_id}: загадано слово '{self.target_word}'")
-            else:
-                self.target_word = random.choice(all_words) if all_words else "ошибка"
-                print(f"⚠️ Игра #{game_id}: загадано '{self.target_word}'")
+            self.target_word = self._choose_target(game_id, similarity_engine)
         
         self.attempts: Dict[str, int] = {p: 0 for p in self.players}
         self.history: Dict[str, List[Dict]] = {p: [] for p in self.players}
+        self.hints: Dict[str, List[str]] = {p: [] for p in self.players}
         self.winner: Optional[str] = None
         self.start_time = datetime.now()
+        self.last_activity = self.start_time
+    
+    @classmethod
+    def restore(cls, state: Dict, similarity_engine, puzzle=None) -> "GameSession":
+        """Восстанавливает игру из журнала session_store без пересчета попыток"""
+        if puzzle is not None and puzzle.target_word != state["target"]:
+            puzzle = None
+        
+        game = cls(
+            game_id=state["game_id"],
+            mode=GameMode(state["mode"]),
+            similarity_engine=similarity_engine,
+            players=state["players"],
+            target_word=state["target"],
+            puzzle=puzzle
+        )
+        
+        for move in state["moves"]:
+            player = move["player"]
+            if player not in game.players:
+                continue
+            if move["kind"] == "hint":
+                game.hints[player].append(move["word"])
+                continue
+            
+            game.attempts[player] += 1
+            if move["rank"] == 0:
+                game.winner = game.winner or player
+            else:
+                game.history[player].append({
+                    "word": move["word"],
+                    "similarity": round(move["similarity"], 4),
+                    "rank": move["rank"],
+                    "attempt": game.attempts[player]
+                })
+        
+        game.winner = state.get("winner") or game.winner
+        return game
     
+    def snapshot(self, player_id: str) -> Dict:
+        """Состояние игры для игрока (сообщение game_resumed)"""
+        return {
+            "game_id": self.game_id,
+            "mode": self.mode.value,
+            "attempts": self.attempts.get(player_id, 0),
+            "history": sorted(self.history.get(player_id, []), key=lambda x: x["rank"]),
+            "hints": list(self.hints.get(player_id, [])),
+            "opponent": self.get_opponent(player_id),
+            "winner": self.winner
+        }
+    
+    @staticmethod
+    def _choose_target(game_id: str, similarity_engine) -> str:
+        """Выбираем простое слово"""
+        popular_words = get_popular_words()
+        available_popular = [w for w in popular_words if w in similarity_engine.word_database]
+        
+        # Без целей, которые бот в самоигре решает слишком долго (simulate.py)
+        difficulty = getattr(similarity_engine, 'target_difficulty', None)
+        if difficulty is not None:
+            available_popular = difficulty.playable(available_popular)
+        
+        if available_popular:
+            target_word = random.choice(available_popular)
+            logger.debug(f"✓ Игра #{game_id}: загадано ПРОСТОЕ слово '{target_word}'")
+            return target_word
+        
+        all_words = similarity_engine.get_all_words()
+        simple_words = [w for w in all_words if 4 <= len(w) <= 7]
+        
+        if simple_words:
+            target_word = random.choice(simple_words)
+            logger.debug(f"✓ Игра #{game_id}: загадано слово '{target_word}'")
+        else:
+            target_word = random.choice(all_words) if all_words else "ошибка"
+            logger.warning(f"⚠️ Игра #{game_id}: загадано '{target_word}'")
+        return target_word
+    
+    @timed("make_guess")
+    @profiled("make_guess")
     def make_guess(self, player_id: str, word: str) -> Dict:
         """Обрабатывает попытку (РАЗРЕШЕНЫ ПОВТОРЫ между игроками)"""
+        self.last_activity = datetime.now()
         word = word.lower().strip()
         
         # Валидация слова
@@ -50,9 +130,13 @@ class GameSession:
         if not validation["valid"]:
             return {
                 "error": validation.get("message", "Неверное слово"),
+                "suggestions": validation.get("suggestions", []),
                 "is_correct": False
             }
         
+        # Дальше работаем с формой из словаря (ё → е, словоформа → лемма)
+        word = validation["word"]
+        
         if player_id not in self.players:
             return {"error": "Игрок не найден"}
         
@@ -65,8 +149,11 @@ class GameSession:
             }
         
         self.attempts[player_id] += 1
-        similarity = self.similarity_engine.get_similarity(word, self.target_word)
-        rank = self.similarity_engine.get_rank(word, self.target_word)
+        if self.puzzle is not None:
+            similarity, rank = self.puzzle.score(word)
+        else:
+            similarity = self.similarity_engine.get_similarity(word, self.target_word)
+            rank = self.similarity_engine.get_rank(word, self.target_word)
         
         is_correct = rank == 0
         
@@ -111,6 +198,44 @@ class GameSession:
             "target_word": self.target_word if is_correct else None
         }
     
+    def take_hint(self, player_id: str, hint_engine, band: str) -> Dict:
+        """Выдает подсказку, не повторяя введенные и уже подсказанные слова"""
+        if player_id not in self.players:
+            return {"available": False, "message": "Игрок не найден"}
+        if self.winner:
+            return {"available": False, "message": "Игра уже завершена"}
+        self.last_activity = datetime.now()
+        
+        exclude = [g['word'] for g in self.history[player_id]] + self.hints[player_id]
+        hint = hint_engine.get_hint(self.target_word, band, exclude)
+        if hint.get("available"):
+            self.hints[player_id].append(hint["word"])
+            hint["hints_used"] = len(self.hints[player_id])
+        return hint
+    
+    def get_opponents(self, player_id: str) -> List[str]:
+        """Все соперники игрока (лобби на N игроков)"""
+        if self.mode != GameMode.MULTIPLAYER:
+            return []
+        return [p for p in self.players if p != player_id]
+    
+    def scoreboard(self) -> Dict:
+        """Открытое состояние игры для зрителей: без загаданного слова до конца"""
+        return {
+            "game_id": self.game_id,
+            "mode": self.mode.value,
+            "players": [
+                {
+                    "player": p,
+                    "attempts": self.attempts[p],
+                    "best_rank": min((g["rank"] for g in self.history[p]), default=None)
+                }
+                for p in self.players
+            ],
+            "winner": self.winner,
+            "target_word": self.target_word if self.winner else None
+        }
+    
     def get_opponent(self, player_id: str) -> Optional[str]:
         """Возвращает соперника"""
         if self.mode != GameMode.MULTIPLAYER or len(self.players) < 2:
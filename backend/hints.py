@@ -0,0 +1,158 @@
+"""
+Подсказки на основе заранее вычисленных соседей загаданного слова
+
+Список соседей target считается один раз (при старте игры или прогреве
+популярных слов) и хранится в LRU-кэше. Запрос подсказки только читает
+кэш и выбирает лучшее слово зоны, без most_similar и полной сортировки.
+prepare() работает в пуле потоков, поэтому кэши меняются под cache_lock.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from logger import get_logger
+from metrics import timed, CacheStats
+
+logger = get_logger("hints")
+
+# Позиции в списке соседей (включительно) для каждой зоны подсказки
+HINT_BANDS = {
+    "close": (1, 10),
+    "medium": (11, 50),
+    "far": (51, 100),
+}
+DEFAULT_BAND = "medium"
+
+NEIGHBOR_COUNT = 100
+CACHE_SIZE = 4096
+LEARNED_TOP_N = 30
+LEARNED_TTL_SECONDS = 30.0
+LEARNED_WEIGHT = 0.3
+
+
+def learned_band(strength: float) -> str:
+    """Зона для слова, известного только из выученных ассоциаций"""
+    if strength >= 0.6:
+        return "close"
+    if strength >= 0.3:
+        return "medium"
+    return "far"
+
+
+class HintEngine:
+    def __init__(self, similarity_engine, neighbor_count=NEIGHBOR_COUNT, cache_size=CACHE_SIZE):
+        self.similarity_engine = similarity_engine
+        self.neighbor_count = neighbor_count
+        self.cache_size = cache_size
+        self._neighbors = OrderedDict()
+        self._learned = {}
+        self._stats = CacheStats("hints")
+        self.cache_lock = threading.Lock()
+
+    def prepare(self, target_word: str) -> int:
+        """Вычисляет и кэширует соседей target (вызывается вне горячего пути)"""
+        target_word = self.similarity_engine.normalize_word(target_word)
+        cached = self._neighbors.get(target_word)
+        if cached is not None:
+            return len(cached)
+
+        neighbors = tuple(
+            (word, float(score))
+            for word, score in self.similarity_engine.get_synonyms(target_word, top_n=self.neighbor_count)
+            if word != target_word
+        )
+        with self.cache_lock:
+            self._neighbors[target_word] = neighbors
+            if len(self._neighbors) > self.cache_size:
+                self._neighbors.popitem(last=False)
+        return len(neighbors)
+
+    def precompute(self, targets) -> int:
+        """Прогревает кэш для списка слов (например, популярных)"""
+        count = 0
+        for target in targets:
+            try:
+                self.prepare(target)
+                count += 1
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось подготовить подсказки для '{target}': {e}")
+        logger.info(f"💡 Подсказки подготовлены для {count} слов")
+        return count
+
+    def caches(self) -> list:
+        """Кэши соседей и выученных ассоциаций (для учета и вытеснения памяти)"""
+        return [self._neighbors, self._learned]
+
+    def is_prepared(self, target_word: str) -> bool:
+        return self.similarity_engine.normalize_word(target_word) in self._neighbors
+
+    def _learned_top(self, target_word: str) -> list:
+        """Топ выученных ассоциаций, пересчитывается не чаще раза в TTL"""
+        ai_system = getattr(self.similarity_engine, 'ai_system', None)
+        if not ai_system:
+            return []
+
+        now = time.monotonic()
+        cached = self._learned.get(target_word)
+        if cached and now - cached[0] < LEARNED_TTL_SECONDS:
+            return cached[1]
+
+        top = ai_system.get_best_associations(target_word, top_n=LEARNED_TOP_N)
+        with self.cache_lock:
+            self._learned[target_word] = (now, top)
+            if len(self._learned) > self.cache_size:
+                self._learned.pop(next(iter(self._learned)))
+        return top
+
+    @timed("get_hint")
+    def get_hint(self, target_word: str, band: str = DEFAULT_BAND, exclude=()) -> dict:
+        """Возвращает слово из выбранной зоны близости к target.
+
+        exclude — слова, которые игрок уже вводил или получал подсказкой.
+        """
+        target_word = self.similarity_engine.normalize_word(target_word)
+        # band приходит из сокета как есть: список или словарь не должен ронять соединение
+        if not isinstance(band, str) or band not in HINT_BANDS:
+            band = DEFAULT_BAND
+
+        with self.cache_lock:
+            neighbors = self._neighbors.get(target_word)
+            if neighbors is not None:
+                self._neighbors.move_to_end(target_word)
+        if neighbors is None:
+            self._stats.miss()
+            return {"available": False, "message": "Подсказки для этого слова еще готовятся"}
+        self._stats.hit()
+
+        excluded = set(exclude)
+        excluded.add(target_word)
+        learned = dict(self._learned_top(target_word))
+
+        low, high = HINT_BANDS[band]
+        # Если соседей меньше, чем NEIGHBOR_COUNT, зоны сжимаются пропорционально
+        if len(neighbors) < high:
+            factor = len(neighbors) / self.neighbor_count
+            low = max(1, int(low * factor))
+            high = max(low, int(high * factor))
+
+        candidates = [
+            (score + LEARNED_WEIGHT * learned.get(word, 0.0), word, position)
+            for position, (word, score) in enumerate(neighbors[low - 1:high], start=low)
+            if word not in excluded
+        ]
+        known = {word for _, word, _ in candidates}
+        candidates.extend(
+            (LEARNED_WEIGHT * strength, word, None)
+            for word, strength in learned.items()
+            if word not in excluded and word not in known and learned_band(strength) == band
+        )
+
+        if not candidates:
+            return {"available": False, "message": "В этой зоне подсказок не осталось"}
+
+        # position бывает None (выученное слово), сравниваем только силу и слово
+        _, word, _ = max(candidates, key=lambda candidate: candidate[:2])
+        # Позиция в списке соседей не совпадает с рангом, который игрок увидит
+        # за эту же попытку; get_rank берет соседей target из кэша синонимов
+        rank = self.similarity_engine.get_rank(word, target_word)
+        return {"available": True, "word": word, "band": band, "rank": rank}
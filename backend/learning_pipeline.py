@@ -0,0 +1,284 @@
+"""
+Пакетное обучение AILearningSystem вне горячего пути
+
+learn_from_guess / learn_from_game только кладут событие в ограниченную
+очередь. Единственный поток-агрегатор раз в PUBLISH_INTERVAL забирает
+накопившееся, применяет попытки по одной и той же паре (цель, слово)
+к одной копии словаря связей и публикует новый неизменяемый снимок.
+
+Снимок строится копированием при записи: меняются только словари
+затронутых слов, остальные переходят из прошлого снимка как есть.
+Читатели берут self.snapshot одним чтением атрибута и работают с ним
+без блокировок: опубликованные словари больше никто не меняет.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Mapping
+
+import metrics
+from logger import get_logger
+
+logger = get_logger("learning")
+
+PUBLISH_INTERVAL = 0.5
+# Очередь событий ограничена: при отставании агрегатора события теряются, а не копятся
+MAX_PENDING = 100_000
+LEARNING_RATE = 0.1
+MAX_LEARNED_STRENGTH = 0.95
+# Обратная связь (слово → цель) слабее прямой
+REVERSE_WEIGHT = 0.8
+CATEGORY_SIMILARITY = 0.5
+SAVE_EVERY_GAMES = 10
+PATHS_KEPT = 1000
+
+GUESS = "guess"
+GAME = "game"
+PRUNE = "prune"
+FLUSH = "flush"
+
+EVENTS_DROPPED = metrics.counter(
+    "wordweave_learning_dropped_total", "События обучения, отброшенные из-за полной очереди"
+)
+EVENTS_COALESCED = metrics.counter(
+    "wordweave_learning_coalesced_total", "Попытки, слитые с другими по той же паре слов"
+)
+BATCH_SIZE = metrics.histogram(
+    "wordweave_learning_batch_events",
+    "Событий обучения в одной пачке агрегатора",
+    buckets=(1, 5, 10, 50, 100, 500, 1000, 5000, 10000),
+)
+
+EMPTY = MappingProxyType({})
+
+
+def learned_strength(current: float, rank: int, is_correct: bool) -> float:
+    """Новая сила связи после одной попытки"""
+    if is_correct:
+        return 1.0
+    rank_factor = 1.0 / (1 + math.log10(rank + 1))
+    return min(current + LEARNING_RATE * rank_factor, MAX_LEARNED_STRENGTH)
+
+
+class LearnedSnapshot:
+    """Неизменяемое состояние обучения на момент публикации"""
+
+    __slots__ = ("associations", "categories", "categories_by_word", "version", "published_at")
+
+    def __init__(self, associations: Mapping[str, Mapping[str, float]],
+                 categories: Mapping[str, FrozenSet[str]],
+                 categories_by_word: Mapping[str, FrozenSet[str]], version: int = 0):
+        self.associations = associations
+        self.categories = categories
+        self.categories_by_word = categories_by_word
+        self.version = version
+        self.published_at = time.time()
+
+    @classmethod
+    def build(cls, associations: dict, categories: dict) -> "LearnedSnapshot":
+        """Снимок из обычных словарей (загрузка данных с диска)"""
+        frozen = {key: frozenset(words) for key, words in categories.items()}
+        by_word: Dict[str, set] = {}
+        for key, words in frozen.items():
+            for word in words:
+                by_word.setdefault(word, set()).add(key)
+        return cls(
+            MappingProxyType({word: MappingProxyType(dict(links)) for word, links in associations.items()}),
+            MappingProxyType(frozen),
+            MappingProxyType({word: frozenset(keys) for word, keys in by_word.items()}),
+        )
+
+    def link_count(self) -> int:
+        return sum(len(links) for links in self.associations.values())
+
+
+class LearningPipeline:
+    def __init__(self, ai_system, interval: float = PUBLISH_INTERVAL, max_pending: int = MAX_PENDING):
+        self.ai_system = ai_system
+        self.interval = interval
+        self.max_pending = max_pending
+        self.snapshot = LearnedSnapshot.build({}, {})
+        self._pending = deque()
+        self._stop = threading.Event()
+        self.submitted = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.batches = 0
+        self._thread = threading.Thread(target=self._loop, name="learning", daemon=True)
+        self._thread.start()
+
+    def submit(self, event: tuple) -> bool:
+        """Горячий путь: событие в очередь, без обработки"""
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            EVENTS_DROPPED.inc()
+            return False
+        self._pending.append(event)
+        self.submitted += 1
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Ждет, пока все поставленные события попадут в снимок"""
+        done = threading.Event()
+        self._pending.append((FLUSH, done))
+        return done.wait(timeout)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=10)
+
+    # ========== АГРЕГАТОР (поток learning) ==========
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self._drain()
+        self._drain()
+
+    def _drain(self):
+        pending = self._pending
+        count = len(pending)
+        if not count:
+            return
+        events = [pending.popleft() for _ in range(count)]
+        waiters = [event[1] for event in events if event[0] == FLUSH]
+        try:
+            self._apply(events)
+        except Exception as e:
+            logger.exception(f"❌ Ошибка пакета обучения: {e}")
+        finally:
+            for waiter in waiters:
+                waiter.set()
+
+    def _apply(self, events: list):
+        ai = self.ai_system
+        previous = self.snapshot
+        old_links = previous.associations
+        changed: Dict[str, dict] = {}
+
+        def links(word: str) -> dict:
+            # Копия словаря слова делается один раз на пачку
+            current = changed.get(word)
+            if current is None:
+                current = dict(old_links.get(word, EMPTY))
+                changed[word] = current
+            return current
+
+        guesses = 0
+        pairs = set()
+        games = []
+        keep_fraction = None
+        for event in events:
+            kind = event[0]
+            if kind == GUESS:
+                _, guess, target, rank, is_correct = event
+                forward = links(target)
+                strength = learned_strength(forward.get(guess, 0), rank, is_correct)
+                forward[guess] = strength
+                links(guess)[target] = strength * REVERSE_WEIGHT
+                guesses += 1
+                pairs.add((target, guess))
+            elif kind == GAME:
+                games.append(event)
+            elif kind == PRUNE:
+                keep_fraction = event[1] if keep_fraction is None else min(keep_fraction, event[1])
+
+        if not guesses and not games and keep_fraction is None:
+            return
+
+        associations = previous.associations
+        if changed:
+            merged = dict(associations)
+            merged.update((word, MappingProxyType(current)) for word, current in changed.items())
+            associations = merged
+        if keep_fraction is not None:
+            associations = self._pruned(associations, keep_fraction)
+        elif changed:
+            associations = MappingProxyType(associations)
+
+        categories, categories_by_word = previous.categories, previous.categories_by_word
+        if games:
+            categories, categories_by_word = self._apply_games(games, categories, categories_by_word)
+
+        self.snapshot = LearnedSnapshot(associations, categories, categories_by_word, previous.version + 1)
+        self.batches += 1
+        self.coalesced += guesses - len(pairs)
+        if guesses > len(pairs):
+            EVENTS_COALESCED.inc(guesses - len(pairs))
+        BATCH_SIZE.observe(len(events))
+
+        games_before = ai.games_played
+        ai.total_guesses += guesses
+        ai.games_played += len(games)
+        if ai.games_played // SAVE_EVERY_GAMES > games_before // SAVE_EVERY_GAMES:
+            ai.save_data()
+
+    def _apply_games(self, games: list, categories, categories_by_word):
+        """Пути решенных игр и категории из попыток с похожестью выше CATEGORY_SIMILARITY"""
+        ai = self.ai_system
+        new_categories = {}
+        new_by_word = {}
+        for _, target, guesses, related, attempts, won, timestamp in games:
+            if not (won and guesses):
+                continue
+            ai.successful_paths.append({
+                'target': target,
+                'guesses': guesses,
+                'attempts': attempts,
+                'timestamp': timestamp
+            })
+            if not related:
+                continue
+
+            words = new_categories.get(target) or categories.get(target, frozenset())
+            words = frozenset(words | set(related) | {target})
+            new_categories[target] = words
+            for word in words:
+                keys = new_by_word.get(word) or categories_by_word.get(word, frozenset())
+                if target not in keys:
+                    new_by_word[word] = keys | {target}
+
+        if len(ai.successful_paths) > 2 * PATHS_KEPT:
+            del ai.successful_paths[:-PATHS_KEPT]
+        if not new_categories:
+            return categories, categories_by_word
+
+        merged_categories = dict(categories)
+        merged_categories.update(new_categories)
+        merged_by_word = dict(categories_by_word)
+        merged_by_word.update(new_by_word)
+        return MappingProxyType(merged_categories), MappingProxyType(merged_by_word)
+
+    @staticmethod
+    def _pruned(associations, keep_fraction: float):
+        """Оставляет долю самых сильных связей (бюджет памяти)"""
+        strengths = sorted(
+            (strength for links in associations.values() for strength in links.values()),
+            reverse=True
+        )
+        keep = int(len(strengths) * keep_fraction)
+        if keep >= len(strengths):
+            return MappingProxyType(dict(associations))
+        threshold = strengths[keep - 1] if keep else float('inf')
+
+        pruned = {}
+        for word, links in associations.items():
+            kept = {other: strength for other, strength in links.items() if strength >= threshold}
+            if kept:
+                pruned[word] = MappingProxyType(kept)
+        logger.info(f"🧹 AI связи: оставлено ~{keep} из {len(strengths)}")
+        return MappingProxyType(pruned)
+
+    def stats(self) -> dict:
+        snapshot = self.snapshot
+        return {
+            "pending": len(self._pending),
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "snapshot_version": snapshot.version,
+            "snapshot_age": round(time.time() - snapshot.published_at, 3),
+        }
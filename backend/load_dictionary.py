@@ -9,6 +9,9 @@ import requests
 import json
 import re
 from typing import List, Set
+from morphology import build_lemma_index, save_lemma_index
+from popular_words import get_popular_words
+from spelling import DEFAULT_INDEX_DIR, build_spelling_arrays, save_spelling_index
 
 def download_all_russian_words() -> Set[str]:
     """Загружает базу всех русских слов (1.5M)"""
@@ -147,6 +150,18 @@ def main():
     save_database(word_db, 'word_database.json')
     create_compact_version(word_db, 'words_compact.json')
     
+    # Шаг 5: Таблица правил словоформ → лемм для validate_word
+    print("🔤 Создание индекса лемм...")
+    lemma_index = build_lemma_index(final_words)
+    save_lemma_index(lemma_index, 'lemma_index.json')
+    print(f"✓ Индекс лемм: {len(lemma_index['rules'])} правил")
+    
+    # Шаг 6: Индекс удалений для подсказок «возможно, вы имели в виду»
+    print("🔤 Создание индекса опечаток...")
+    spelling = build_spelling_arrays(word_db, get_popular_words())
+    save_spelling_index(spelling, DEFAULT_INDEX_DIR)
+    print(f"✓ Индекс опечаток: {len(spelling['hashes'])} записей")
+    
     print("\n" + "=" * 60)
     print("✅ ГОТОВО!")
     print("=" * 60)
@@ -154,6 +169,8 @@ def main():
     print(f"   - Всего слов: {len(word_db)}")
     print(f"   - Файл базы: word_database.json")
     print(f"   - Компактный: words_compact.json")
+    print(f"   - Индекс лемм: lemma_index.json")
+    print(f"   - Индекс опечаток: {DEFAULT_INDEX_DIR}/")
     print("=" * 60)
 
 if __name__ == "__main__":
@@ -0,0 +1,47 @@
+"""
+Логирование WORDWEAVE
+
+Записи складываются в очередь и пишутся в stdout отдельным потоком
+(QueueHandler + QueueListener), поэтому вызов логгера на горячем пути
+не блокирует event loop на синхронной записи в консоль.
+Уровень задается переменной окружения WORDWEAVE_LOG_LEVEL (по умолчанию INFO).
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+_listener = None
+
+
+def setup_logging(level=None):
+    """Настраивает корневой логгер wordweave (повторный вызов ничего не делает)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    level = level or os.environ.get("WORDWEAVE_LOG_LEVEL", "INFO")
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(
+        "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+    ))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger("wordweave")
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Возвращает логгер внутри иерархии wordweave"""
+    setup_logging()
+    return logging.getLogger(f"wordweave.{name}")
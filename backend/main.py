@@ -1,11 +1,37 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+import asyncio
+import hmac
 import json
+import os
+import time
 import uuid
-from typing import Dict
+from datetime import timedelta
+from typing import Dict, List, Optional, Union
+from pydantic import BaseModel
 from game_logic import GameSession, GameMode
 from word_similarity import WordSimilarityEngine
 from ai_learning import AILearningSystem
+from logger import get_logger
+from startup import StartupStages
+from association_graph import DEFAULT_GRAPH_PATH, load_or_build
+from autocomplete import PrefixIndex, DEFAULT_LIMIT
+from popular_words import get_popular_words
+from daily import seconds_until_next_day, today_utc
+from session_store import PURGE_INTERVAL as SESSION_PURGE_INTERVAL, SessionStore
+from event_log import EventLog, summarize as summarize_events
+from connection_manager import ConnectionManager
+from broadcast import ChannelRegistry
+from profiling import PROFILER, SORT_KEYS
+from model_registry import ModelRegistry, MODEL_PATH
+from memory_report import (
+    CHECK_INTERVAL as MEMORY_CHECK_INTERVAL, DEFAULT_SAMPLE, MAX_REPORT_SAMPLE, MemoryAccountant,
+    entries_to_remove, fraction_to_keep, parse_budgets, shrink_mapping
+)
+import metrics
+
+logger = get_logger("server")
 
 app = FastAPI(title="WORDWEAVE API")
 
@@ -17,87 +43,353 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-print("🚀 Запуск сервера WORDWEAVE...")
-print("=" * 60)
-
-# Инициализация AI системы обучения
-try:
-    ai_system = AILearningSystem(data_file='ai_learning_data.json')
-    print("✓ AI система инициализирована")
-except Exception as e:
-    print(f"⚠️ Ошибка инициализации AI: {e}")
-    ai_system = None
-
-# Инициализация движка похожести с AI
-try:
-    similarity_engine = WordSimilarityEngine(
-        database_path='word_database.json',
-        ai_system=ai_system
+logger.info("🚀 Запуск сервера WORDWEAVE...")
+
+# Сервер начинает слушать порт сразу, тяжелые компоненты грузятся в фоне
+# (см. initialize_components). До готовности /readyz отвечает 503.
+GUESS_WAIT_TIMEOUT = float(os.environ.get("WORDWEAVE_GUESS_WAIT_TIMEOUT", "10"))
+# Эндпоинты /admin требуют заголовок X-Admin-Token; без токена они закрыты
+ADMIN_TOKEN = os.environ.get("WORDWEAVE_ADMIN_TOKEN")
+# Законченные игры держатся в памяти для resume/spectate, брошенные — дольше
+FINISHED_GAME_TTL = 120
+IDLE_GAME_TTL = float(os.environ.get("WORDWEAVE_IDLE_GAME_TTL", "7200"))
+# За сколько секунд до полуночи UTC готовить головоломку следующего дня
+DAILY_PREPARE_LEAD = 600
+
+startup_stages = StartupStages(["ai", "database", "model", "graph", "autocomplete"])
+ai_system = None
+similarity_engine = WordSimilarityEngine(
+    database_path='word_database.json',
+    ai_system=None,
+    model_path=MODEL_PATH,
+    load=False
+)
+# Игры закрепляются за версией модели; similarity_engine — первая версия
+model_registry = ModelRegistry(similarity_engine)
+prefix_index = None
+
+def word_id(word: str):
+    """id слова в базе текущей версии (журнал попыток хранит id, а не строки)"""
+    info = model_registry.current.engine.word_database.get(word)
+    return info.get('id') if isinstance(info, dict) else None
+
+# Журнал сессий и журнал попыток открываются в startup_event: импорт main
+# не создает sessions.db и папку events
+session_store = None
+event_log = None
+
+def load_ai_system():
+    return AILearningSystem(data_file='ai_learning_data.json')
+
+async def initialize_components():
+    """Параллельно загружает AI данные, словарь и Word2Vec модель, затем граф ассоциаций"""
+    global ai_system, prefix_index
+    
+    ai, _, _ = await asyncio.gather(
+        startup_stages.run("ai", load_ai_system),
+        startup_stages.run("database", similarity_engine.load_database, similarity_engine.database_path),
+        startup_stages.run("model", similarity_engine.load_model),
     )
-    print("✓ Движок похожести инициализирован")
-except Exception as e:
-    print(f"❌ Ошибка инициализации движка: {e}")
-    import sys
-    sys.exit(1)
+    
+    # load_model не бросает исключений: без модели работает запасная оценка
+    if similarity_engine.model is None:
+        startup_stages.degrade("model", "Word2Vec модель не загружена")
+    
+    if ai:
+        ai_system = ai
+        similarity_engine.ai_system = ai
+        logger.info("✓ AI система инициализирована")
+        try:
+            logger.info(f"🧠 AI Статистика: {ai.get_stats()}")
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось получить статистику AI: {e}")
+    
+    # Граф включает выученные категории, поэтому строится после AI данных
+    graph, prefix_index = await asyncio.gather(
+        startup_stages.run("graph", load_or_build, DEFAULT_GRAPH_PATH, ai_system),
+        startup_stages.run(
+            "autocomplete", PrefixIndex.build,
+            similarity_engine.word_database, get_popular_words()
+        ),
+    )
+    similarity_engine.association_graph = graph
+    
+    if startup_stages.is_ready():
+        logger.info("✅ Все компоненты загружены, сервер готов")
+        await warm_up_model(model_registry.current)
 
-print("=" * 60)
+async def warm_up_model(model):
+    """Головоломка дня и подсказки для популярных слов на версии модели"""
+    await asyncio.to_thread(lambda: model.daily.get().warm_up())
+    await asyncio.to_thread(model.hints.precompute, get_popular_words())
 
-# Показываем статистику AI если доступна
-if ai_system:
-    try:
-        ai_stats = ai_system.get_stats()
-        print(f"🧠 AI Статистика:")
-        for key, value in ai_stats.items():
-            print(f"   - {key}: {value}")
-    except Exception as e:
-        print(f"⚠️ Не удалось получить статистику AI: {e}")
+async def daily_puzzle(model):
+    """Головоломка дня; при смене даты она строится в пуле потоков"""
+    puzzle = model.daily.peek()
+    if puzzle is not None:
+        return puzzle
+    return await asyncio.to_thread(model.daily.get)
+
+async def prepare_next_daily():
+    """Заранее строит и прогревает головоломку следующего дня до полуночи"""
+    while True:
+        await asyncio.sleep(max(0, seconds_until_next_day() - DAILY_PREPARE_LEAD))
+        if startup_stages.is_ready():
+            tomorrow = today_utc() + timedelta(days=1)
+            try:
+                await asyncio.to_thread(model_registry.current.daily.prepare, tomorrow)
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось подготовить головоломку на {tomorrow}: {e}")
+        # Следующая подготовка — уже после смены даты
+        await asyncio.sleep(seconds_until_next_day() + 1)
 
-print("=" * 60)
+def prepare_hints(game: GameSession):
+    """Считает соседей загаданного слова в фоне, пока игрок делает первые ходы"""
+    hints = model_registry.version_of(game.game_id).hints
+    if not hints.is_prepared(game.target_word):
+        asyncio.get_running_loop().run_in_executor(None, hints.prepare, game.target_word)
+
+async def wait_until_ready(client_id: str, *stages) -> bool:
+    """Держит запрос до готовности нужных этапов, иначе отвечает ошибкой"""
+    if await startup_stages.wait_ready(*stages, timeout=GUESS_WAIT_TIMEOUT):
+        return True
+    await manager.send_personal_message({
+        'type': 'error',
+        'message': 'Сервер еще загружается, попробуйте через несколько секунд'
+    }, client_id)
+    return False
 
 active_games: Dict[str, GameSession] = {}
 waiting_players: Dict[str, WebSocket] = {}
 
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
+metrics.ACTIVE_GAMES.set_function(lambda: len(active_games))
+metrics.WAITING_PLAYERS.set_function(lambda: len(waiting_players))
+metrics.ACTIVE_SOCKETS.set_function(lambda: len(manager.active_connections))
+
+manager = ConnectionManager()
+
+def forget_waiting_player(client_id: str, websocket: WebSocket):
+    """Закрытое соединение не должно оставаться в очереди мультиплеера"""
+    if waiting_players.get(client_id) is websocket:
+        del waiting_players[client_id]
+
+channels = ChannelRegistry(manager)
+
+def leave_channels(client_id: str, websocket: WebSocket):
+    """Отключившийся клиент перестает смотреть игры и покидает лобби"""
+    for lobby in channels.drop_client(client_id):
+        asyncio.create_task(manager.broadcast({'type': 'lobby_update', **lobby.info()}, lobby.players))
+
+manager.on_close(forget_waiting_player)
+manager.on_close(leave_channels)
+
+KNOWN_ACTIONS = {
+    'start_solo', 'start_multiplayer', 'start_daily', 'guess', 'hint', 'complete', 'resume', 'pong',
+    'create_lobby', 'join_lobby', 'spectate'
+}
+
+def register_game(game: GameSession):
+    active_games[game.game_id] = game
+    session_store.record_game(game)
+    prepare_hints(game)
+
+def retire_game(game_id: str):
+    """Убирает игру из памяти и открепляет ее от версии модели"""
+    active_games.pop(game_id, None)
+    channels.close(game_id)
+    model_registry.release(game_id)
+
+async def evict_idle_games():
+    """Периодически выгружает законченные и брошенные игры и чистит журнал сессий"""
+    last_purge = time.time()
+    while True:
+        await asyncio.sleep(60)
+        now = time.time()
+        for game_id, game in list(active_games.items()):
+            idle = now - game.last_activity.timestamp()
+            if (game.winner and idle > FINISHED_GAME_TTL) or idle > IDLE_GAME_TTL:
+                retire_game(game_id)
+        if now - last_purge >= SESSION_PURGE_INTERVAL:
+            session_store.purge()
+            last_purge = now
+
+def evict_games_for_memory(current: int, budget: int) -> int:
+    """Выгружает законченные, затем самые давно неактивные игры.
+
+    Незаконченная игра восстановится из session_store при следующем ходе.
+    """
+    remove = entries_to_remove(len(active_games), current, budget)
+    victims = sorted(
+        active_games.values(),
+        key=lambda game: (game.winner is None, game.last_activity)
+    )[:remove]
+    for game in victims:
+        retire_game(game.game_id)
+    return len(victims)
+
+def shrink_caches(owners):
+    """Функция вытеснения для LRU-кэшей всех версий модели.
+
+    Кэши меняются и из пула потоков, поэтому ужимаются под cache_lock владельца.
+    """
+    def evict(current: int, budget: int) -> int:
+        removed = 0
+        for owner in owners():
+            with owner.cache_lock:
+                removed += sum(shrink_mapping(cache, current, budget) for cache in owner.caches())
+        return removed
+    return evict
+
+def prune_ai(current: int, budget: int) -> int:
+    return ai_system.prune_associations(fraction_to_keep(current, budget)) if ai_system else 0
+
+def register_memory_components(memory: MemoryAccountant):
+    versions = lambda: list(model_registry.versions.values())
+    current = lambda: model_registry.current.engine
+    memory.register(
+        "model", lambda: [v.engine.model for v in versions()],
+        description="Word2Vec: словарь ключей (матрица — mapped)"
+    )
+    memory.register("word_database", lambda: [current().word_database], description="База слов")
+    memory.register("lemma_index", lambda: [current().lemma_index])
+    memory.register("spelling_index", lambda: [current().spelling_index])
+    memory.register("association_graph", lambda: [current().association_graph])
+    memory.register("autocomplete", lambda: [prefix_index])
+    engines = lambda: [v.engine for v in versions()]
+    hints = lambda: [v.hints for v in versions()]
+    memory.register(
+        "synonyms_cache", lambda: [c for e in engines() for c in e.caches()],
+        evict=shrink_caches(engines), description="LRU синонимов по версиям модели"
+    )
+    memory.register(
+        "hints_cache", lambda: [c for h in hints() for c in h.caches()],
+        evict=shrink_caches(hints), description="Соседи загаданных слов для подсказок"
+    )
+    memory.register(
+        "daily_scores", lambda: [c for v in versions() for c in v.daily.caches()],
+        description="Таблицы результатов головоломки дня"
+    )
+    memory.register(
+        "ai", lambda: ai_system.learned_data() if ai_system else [],
+        evict=prune_ai, description="Выученные ассоциации (слабые вытесняются первыми)"
+    )
+    memory.register(
+        "active_games",
+        # Только состояние игр: движок и головоломка учтены в своих компонентах
+        lambda: [list(active_games), [(g.history, g.attempts, g.hints) for g in active_games.values()]],
+        evict=evict_games_for_memory,
+        description="Игры в памяти (вытесненные восстанавливаются из журнала)"
+    )
+
+memory = MemoryAccountant(parse_budgets(os.environ.get("WORDWEAVE_MEMORY_BUDGETS", "")))
+register_memory_components(memory)
+for unknown in set(memory.budgets) - set(memory.components):
+    logger.warning(f"⚠️ Бюджет памяти для неизвестного компонента: {unknown}")
+
+async def enforce_memory_budgets():
+    """Периодически ужимает компоненты сверх бюджета"""
+    while True:
+        await asyncio.sleep(MEMORY_CHECK_INTERVAL)
+        if memory.budgets and startup_stages.is_ready():
+            memory.enforce()
+
+async def find_game(game_id, client_id: str):
+    """Игра из памяти, либо восстановленная из журнала после перезапуска"""
+    if not isinstance(game_id, str):
+        return None
+    game = active_games.get(game_id)
+    if game is not None:
+        return game if client_id in game.players else None
     
-    async def connect(self, websocket: WebSocket, client_id: str):
-        await websocket.accept()
-        self.active_connections[client_id] = websocket
-        print(f"✓ Подключен: {client_id}")
+    state = await asyncio.to_thread(session_store.load_game, game_id)
+    if not state or state["finished"] or client_id not in state["players"]:
+        return None
     
-    def disconnect(self, client_id: str):
-        if client_id in self.active_connections:
-            del self.active_connections[client_id]
-            print(f"✗ Отключен: {client_id}")
+    model = model_registry.acquire(game_id)
+    puzzle = await daily_puzzle(model) if state["puzzle_date"] else None
+    game = active_games.setdefault(
+        game_id, GameSession.restore(state, model.engine, puzzle)
+    )
+    if game.mode == GameMode.MULTIPLAYER:
+        channels.open(game)
+    prepare_hints(game)
+    logger.info(f"♻️ Игра {game_id} восстановлена из журнала")
+    return game
+
+async def start_multiplayer_game(players: List[str]):
+    """Игра на всех игроков пары или лобби; события идут через канал игры"""
+    game_id = str(uuid.uuid4())
+    game = GameSession(
+        game_id=game_id,
+        mode=GameMode.MULTIPLAYER,
+        similarity_engine=model_registry.acquire(game_id).engine,
+        players=players
+    )
+    register_game(game)
+    channels.open(game)
     
-    async def send_personal_message(self, message: dict, client_id: str):
-        if client_id in self.active_connections:
-            await self.active_connections[client_id].send_text(json.dumps(message))
+    for player in players:
+        opponents = game.get_opponents(player)
+        await manager.send_personal_message({
+            'type': 'game_started',
+            'game_id': game.game_id,
+            'mode': 'multiplayer',
+            'opponent': opponents[0],
+            'opponents': opponents
+        }, player)
+    return game
 
-manager = ConnectionManager()
+def complete_prefix(prefix, limit=DEFAULT_LIMIT) -> list:
+    """Автодополнение; до построения индекса возвращает пустой список"""
+    if prefix_index is None or not isinstance(prefix, str):
+        return []
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError, OverflowError):
+        limit = DEFAULT_LIMIT
+    return prefix_index.complete(prefix, limit)
 
 @app.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
-    await manager.connect(websocket, client_id)
+    connection = await manager.connect(websocket, client_id)
+    if connection is None:
+        return
     
     try:
         while True:
-            data = await websocket.receive_text()
-            message = json.loads(data)
-            action = message.get('action')
+            data = await manager.receive(connection)
+            try:
+                message = json.loads(data)
+                action = message.get('action')
+            except (ValueError, AttributeError):
+                message, action = {}, None
+            # Поля сообщения приходят как есть: список или словарь вместо строки
+            # не должны ронять соединение на поиске по словарю
+            if not isinstance(action, str):
+                action = None
+            
+            metrics.WS_MESSAGES.labels(action if action in KNOWN_ACTIONS else 'unknown').inc()
+            logger.debug(f"📨 {client_id}: {action}")
+            
+            if not manager.allow(connection, action):
+                continue
             
-            print(f"📨 {client_id}: {action}")
+            if action == 'pong':
+                continue
+            
+            if action in ('start_solo', 'start_multiplayer', 'start_daily', 'guess', 'hint', 'resume', 'join_lobby'):
+                if not await wait_until_ready(client_id, "database", "model"):
+                    continue
             
             if action == 'start_solo':
                 game_id = str(uuid.uuid4())
                 game = GameSession(
                     game_id=game_id,
                     mode=GameMode.SOLO,
-                    similarity_engine=similarity_engine,
+                    similarity_engine=model_registry.acquire(game_id).engine,
                     players=[client_id]
                 )
-                active_games[game_id] = game
+                register_game(game)
                 
                 await manager.send_personal_message({
                     'type': 'game_started',
@@ -105,33 +397,32 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                     'mode': 'solo'
                 }, client_id)
             
+            elif action == 'start_daily':
+                game_id = str(uuid.uuid4())
+                model = model_registry.acquire(game_id)
+                puzzle = await daily_puzzle(model)
+                game = GameSession(
+                    game_id=game_id,
+                    mode=GameMode.DAILY,
+                    similarity_engine=model.engine,
+                    players=[client_id],
+                    puzzle=puzzle
+                )
+                register_game(game)
+                
+                await manager.send_personal_message({
+                    'type': 'game_started',
+                    'game_id': game_id,
+                    'mode': 'daily',
+                    'date': puzzle.date.isoformat(),
+                    'number': puzzle.number
+                }, client_id)
+            
             elif action == 'start_multiplayer':
-                if waiting_players:
-                    opponent_id = list(waiting_players.keys())[0]
-                    opponent_ws = waiting_players.pop(opponent_id)
-                    
-                    game_id = str(uuid.uuid4())
-                    game = GameSession(
-                        game_id=game_id,
-                        mode=GameMode.MULTIPLAYER,
-                        similarity_engine=similarity_engine,
-                        players=[client_id, opponent_id]
-                    )
-                    active_games[game_id] = game
-                    
-                    await manager.send_personal_message({
-                        'type': 'game_started',
-                        'game_id': game_id,
-                        'mode': 'multiplayer',
-                        'opponent': opponent_id
-                    }, client_id)
-                    
-                    await manager.send_personal_message({
-                        'type': 'game_started',
-                        'game_id': game_id,
-                        'mode': 'multiplayer',
-                        'opponent': client_id
-                    }, opponent_id)
+                opponent_id = next((p for p in waiting_players if p != client_id), None)
+                if opponent_id is not None:
+                    waiting_players.pop(opponent_id)
+                    await start_multiplayer_game([client_id, opponent_id])
                 else:
                     waiting_players[client_id] = websocket
                     await manager.send_personal_message({
@@ -142,33 +433,122 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                 game_id = message.get('game_id')
                 word = message.get('word')
                 
-                if game_id in active_games:
-                    game = active_games[game_id]
+                game = await find_game(game_id, client_id)
+                if game is not None and not isinstance(word, str):
+                    await manager.send_personal_message({
+                        'type': 'guess_result',
+                        'error': 'Неверное слово',
+                        'is_correct': False
+                    }, client_id)
+                elif game is not None:
                     result = game.make_guess(client_id, word)
                     
+                    if 'error' not in result:
+                        session_store.record_guess(
+                            game_id, client_id, result['word'], result['similarity'], result['rank']
+                        )
+                        event_log.log_guess(
+                            game_id, client_id, game.target_word, game.mode.value,
+                            result['word'], result['rank'], result['similarity'], result['attempts']
+                        )
+                        if result.get('is_correct') and game.winner == client_id:
+                            session_store.record_finish(game_id, client_id)
+                    
                     await manager.send_personal_message({
                         'type': 'guess_result',
                         **result
                     }, client_id)
                     
-                    if game.mode == GameMode.MULTIPLAYER:
-                        opponent = game.get_opponent(client_id)
-                        if opponent:
-                            await manager.send_personal_message({
-                                'type': 'opponent_guess',
-                                'attempts': game.attempts[client_id],
-                                'last_word': word
-                            }, opponent)
-                    
-                    if result.get('is_correct'):
-                        if game.mode == GameMode.MULTIPLAYER:
-                            opponent = game.get_opponent(client_id)
-                            if opponent:
-                                await manager.send_personal_message({
-                                    'type': 'game_over',
-                                    'winner': client_id,
-                                    'word': game.target_word
-                                }, opponent)
+                    # Соперники и зрители получают одно закодированное сообщение
+                    channel = channels.get(game_id)
+                    if channel is not None and 'error' not in result:
+                        await channel.publish({
+                            'type': 'opponent_guess',
+                            'player': client_id,
+                            'attempts': game.attempts[client_id],
+                            'last_word': word
+                        }, exclude=client_id)
+                        
+                        if result.get('is_correct') and game.winner == client_id:
+                            await channel.publish({
+                                'type': 'game_over',
+                                'winner': client_id,
+                                'word': game.target_word
+                            }, exclude=client_id)
+                            channels.close(game_id)
+                else:
+                    await manager.send_personal_message({
+                        'type': 'error',
+                        'message': 'Игра не найдена'
+                    }, client_id)
+    
+            elif action == 'complete':
+                prefix = message.get('prefix', '')
+                await manager.send_personal_message({
+                    'type': 'completions',
+                    'prefix': prefix,
+                    'words': complete_prefix(prefix, message.get('limit', DEFAULT_LIMIT))
+                }, client_id)
+            
+            elif action == 'create_lobby':
+                lobby = channels.create_lobby(client_id, message.get('size'))
+                await manager.send_personal_message({
+                    'type': 'lobby_update',
+                    **lobby.info()
+                }, client_id)
+            
+            elif action == 'join_lobby':
+                lobby = channels.join_lobby(message.get('lobby_id'), client_id)
+                if lobby is None:
+                    await manager.send_personal_message({
+                        'type': 'error',
+                        'message': 'Лобби не найдено или уже заполнено'
+                    }, client_id)
+                else:
+                    await manager.broadcast({'type': 'lobby_update', **lobby.info()}, lobby.players)
+                    if lobby.is_full:
+                        await start_multiplayer_game(lobby.players)
+            
+            elif action == 'spectate':
+                game_id = message.get('game_id')
+                game = active_games.get(game_id) if isinstance(game_id, str) else None
+                if game is not None and (game.winner or channels.open(game).add_spectator(client_id)):
+                    await manager.send_personal_message({
+                        'type': 'spectating',
+                        **game.scoreboard()
+                    }, client_id)
+                else:
+                    await manager.send_personal_message({
+                        'type': 'error',
+                        'message': 'Игра не найдена'
+                    }, client_id)
+            
+            elif action == 'resume':
+                game = await find_game(message.get('game_id'), client_id)
+                if game is not None and not game.winner:
+                    await manager.send_personal_message({
+                        'type': 'game_resumed',
+                        **game.snapshot(client_id)
+                    }, client_id)
+                else:
+                    await manager.send_personal_message({
+                        'type': 'resume_failed',
+                        'game_id': message.get('game_id')
+                    }, client_id)
+            
+            elif action == 'hint':
+                game_id = message.get('game_id')
+                
+                game = await find_game(game_id, client_id)
+                if game is not None:
+                    hints = model_registry.version_of(game_id).hints
+                    hint = game.take_hint(client_id, hints, message.get('band', 'medium'))
+                    if hint.get('available'):
+                        session_store.record_hint(game_id, client_id, hint['word'])
+                    await manager.send_personal_message({
+                        'type': 'hint',
+                        **hint
+                    }, client_id)
                 else:
                     await manager.send_personal_message({
                         'type': 'error',
@@ -176,17 +556,40 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                     }, client_id)
     
     except WebSocketDisconnect:
-        manager.disconnect(client_id)
-        if client_id in waiting_players:
-            del waiting_players[client_id]
+        pass
+    finally:
+        manager.disconnect(connection)
+
+@app.on_event("startup")
+async def startup_event():
+    """Запускает фоновую загрузку, не блокируя прием соединений"""
+    global session_store, event_log
+    session_store = SessionStore()
+    event_log = EventLog(word_id=word_id)
+    app.state.init_task = asyncio.create_task(initialize_components())
+    app.state.evict_task = asyncio.create_task(evict_idle_games())
+    app.state.memory_task = asyncio.create_task(enforce_memory_budgets())
+    app.state.daily_task = asyncio.create_task(prepare_next_daily())
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: процесс жив и обрабатывает запросы"""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: все компоненты загружены"""
+    report = startup_stages.report()
+    report["model_loaded"] = model_registry.current.engine.model is not None
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
 
 @app.get("/")
 async def root():
     stats = {
         "app": "WORDWEAVE",
         "version": "2.0",
-        "words_count": len(similarity_engine.get_all_words()),
-        "status": "running"
+        "words_count": len(model_registry.current.engine.get_all_words()),
+        "status": "running" if startup_stages.is_ready() else "starting"
     }
     
     if ai_system:
@@ -197,14 +600,132 @@ async def root():
     
     return stats
 
+def daily_cache_headers() -> dict:
+    """Ответы по головоломке дня одинаковы для всех до полуночи UTC"""
+    return {"Cache-Control": f"public, max-age={seconds_until_next_day()}"}
+
+@app.get("/api/daily")
+async def daily_info():
+    """Номер и дата текущей головоломки"""
+    if not startup_stages.is_ready("database"):
+        return JSONResponse({"error": "Сервер еще загружается"}, status_code=503)
+    return (await daily_puzzle(model_registry.current)).info()
+
+@app.get("/api/daily/score")
+async def daily_score(word: str):
+    """Оценка слова для головоломки дня без сессии и сокета"""
+    if not startup_stages.is_ready("database", "model"):
+        return JSONResponse({"error": "Сервер еще загружается"}, status_code=503)
+    
+    puzzle = await daily_puzzle(model_registry.current)
+    validation = model_registry.current.engine.validate_word(word)
+    if not validation["valid"]:
+        return JSONResponse(
+            {
+                "error": validation.get("message", "Неверное слово"),
+                "suggestions": validation.get("suggestions", [])
+            },
+            status_code=404,
+            headers=daily_cache_headers()
+        )
+    
+    guess = validation["word"]
+    similarity, rank = puzzle.score(guess)
+    return JSONResponse({
+        "date": puzzle.date.isoformat(),
+        "number": puzzle.number,
+        "word": guess,
+        "similarity": similarity,
+        "rank": rank,
+        "is_correct": rank == 0
+    }, headers=daily_cache_headers())
+
+class ScoreRequest(BaseModel):
+    target_id: Union[int, str]
+    guesses: List[str]
+
+class ScoreBatch(BaseModel):
+    requests: List[ScoreRequest]
+
+MAX_SCORE_GUESSES = 5000
+
+def score_requests(requests: List[ScoreRequest]) -> list:
+    """Оценивает пачку запросов; target_id — id слова в базе или 'daily'"""
+    results = []
+    for request in requests:
+        if request.target_id == "daily":
+            puzzle = model_registry.current.daily.get()
+            target_word = puzzle.target_word
+        else:
+            puzzle = None
+            try:
+                target_word = model_registry.current.engine.get_word_by_id(int(request.target_id))
+            except (TypeError, ValueError):
+                target_word = None
+        
+        if target_word is None:
+            results.append({"target_id": request.target_id, "error": "Неизвестный target_id"})
+            continue
+        
+        scores = [None] * len(request.guesses)
+        valid_positions, valid_words = [], []
+        for position, guess in enumerate(request.guesses):
+            validation = model_registry.current.engine.validate_word(guess, suggest=False)
+            if validation["valid"]:
+                valid_positions.append(position)
+                valid_words.append(validation["word"])
+            else:
+                scores[position] = {"word": guess, "valid": False}
+        
+        if puzzle is not None:
+            evaluated = [puzzle.score(word) for word in valid_words]
+        else:
+            evaluated = model_registry.current.engine.score_batch(valid_words, target_word)
+        
+        for position, word, (similarity, rank) in zip(valid_positions, valid_words, evaluated):
+            scores[position] = {
+                "word": word,
+                "valid": True,
+                "similarity": round(similarity, 4),
+                "rank": rank
+            }
+        results.append({"target_id": request.target_id, "scores": scores})
+    return results
+
+@app.post("/api/score")
+async def score(batch: ScoreBatch):
+    """Пакетная оценка попыток без игровой сессии"""
+    if not startup_stages.is_ready("database", "model"):
+        return JSONResponse({"error": "Сервер еще загружается"}, status_code=503)
+    
+    total = sum(len(r.guesses) for r in batch.requests)
+    if total > MAX_SCORE_GUESSES:
+        return JSONResponse(
+            {"error": f"Не больше {MAX_SCORE_GUESSES} слов за запрос"},
+            status_code=413
+        )
+    
+    # Пачка считается в пуле потоков, чтобы не блокировать event loop
+    return {"results": await asyncio.to_thread(score_requests, batch.requests)}
+
+@app.get("/api/complete")
+async def complete(prefix: str = "", limit: int = DEFAULT_LIMIT):
+    """Автодополнение слова по префиксу"""
+    return {"prefix": prefix, "words": complete_prefix(prefix, limit)}
+
 @app.get("/api/stats")
 async def get_stats():
     stats = {
-        "total_words": len(similarity_engine.get_all_words()),
+        "total_words": len(model_registry.current.engine.get_all_words()),
         "active_games": len(active_games),
-        "waiting_players": len(waiting_players)
+        "waiting_players": len(waiting_players),
+        **channels.stats()
     }
     
+    difficulty = model_registry.current.engine.target_difficulty
+    if difficulty is not None:
+        stats["target_difficulty"] = difficulty.stats()
+    
     if ai_system:
         try:
             stats["ai"] = ai_system.get_stats()
@@ -213,17 +734,171 @@ async def get_stats():
     
     return stats
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Метрики в текстовом формате Prometheus"""
+    return PlainTextResponse(
+        metrics.render_metrics(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+def require_admin(token):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Администрирование выключено: задайте WORDWEAVE_ADMIN_TOKEN")
+    if not isinstance(token, str) or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Нужен X-Admin-Token")
+
+class ProfileSettings(BaseModel):
+    rate: float
+
+class ModelSwap(BaseModel):
+    model_path: str
+
+async def swap_model(model_path: str):
+    try:
+        model = await asyncio.to_thread(model_registry.load, model_path, True)
+    except Exception as e:
+        logger.error(f"❌ Замена модели не удалась: {e}")
+        return
+    await warm_up_model(model)
+
+@app.get("/admin/models")
+async def models_report(x_admin_token: str = Header(None)):
+    """Загруженные версии модели и число игр на каждой"""
+    require_admin(x_admin_token)
+    return model_registry.stats()
+
+@app.post("/admin/models", status_code=202)
+async def models_swap(swap: ModelSwap, x_admin_token: str = Header(None)):
+    """Грузит модель в фоне; новые игры пойдут на нее, начатые доиграют на старой"""
+    require_admin(x_admin_token)
+    if not startup_stages.is_ready():
+        raise HTTPException(status_code=503, detail="Сервер еще загружается")
+    try:
+        model_registry.reserve(swap.model_path)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Файл модели не найден")
+    asyncio.create_task(swap_model(swap.model_path))
+    return {"loading": swap.model_path, "current": model_registry.current.version}
+
+@app.get("/admin/profile")
+async def profile_report(limit: int = 20, sort: str = "tottime",
+                         x_admin_token: str = Header(None)):
+    """Статус профилирования и самые горячие функции make_guess"""
+    require_admin(x_admin_token)
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort: одно из {', '.join(SORT_KEYS)}")
+    return PROFILER.report(limit, sort)
+
+@app.post("/admin/profile")
+async def profile_configure(settings: ProfileSettings, x_admin_token: str = Header(None)):
+    """Включает выборочное профилирование (rate — доля вызовов, 0 — выключить)"""
+    require_admin(x_admin_token)
+    PROFILER.set_rate(settings.rate)
+    return {"enabled": PROFILER.enabled, "rate": PROFILER.rate}
+
+@app.delete("/admin/profile")
+async def profile_reset(x_admin_token: str = Header(None)):
+    require_admin(x_admin_token)
+    PROFILER.reset()
+    return {"reset": True}
+
+@app.get("/admin/profile/pstats")
+async def profile_pstats(x_admin_token: str = Header(None)):
+    """Накопленный профиль в формате pstats"""
+    require_admin(x_admin_token)
+    return Response(
+        PROFILER.dump_pstats(),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": 'attachment; filename="wordweave.pstats"'}
+    )
+
+@app.get("/admin/profile/collapsed", response_class=PlainTextResponse)
+async def profile_collapsed(x_admin_token: str = Header(None)):
+    """Collapsed stacks для flamegraph.pl или speedscope"""
+    require_admin(x_admin_token)
+    return PlainTextResponse(PROFILER.collapsed())
+
+@app.get("/admin/connections")
+async def connections(x_admin_token: str = Header(None)):
+    """Открытые соединения: счетчики сообщений, лимиты и очереди по клиентам.
+
+    Ответ содержит client_id, по которому можно занять чужую игру, поэтому
+    эндпоинт только для администратора.
+    """
+    require_admin(x_admin_token)
+    return manager.stats()
+
+@app.get("/admin/events")
+async def events_report(x_admin_token: str = Header(None)):
+    """Состояние журнала попыток и сводка по всем сегментам"""
+    require_admin(x_admin_token)
+    summary = await asyncio.to_thread(summarize_events, event_log.directory)
+    return {**event_log.stats(), "summary": summary}
+
+class MemoryBudgets(BaseModel):
+    # None снимает бюджет компонента
+    budgets: Dict[str, Optional[Union[str, int]]]
+
+class TracemallocSettings(BaseModel):
+    enabled: bool
+    frames: int = 1
+
+@app.get("/admin/memory")
+async def memory_report(sample: int = DEFAULT_SAMPLE, x_admin_token: str = Header(None)):
+    """Оценка памяти по компонентам, бюджеты и RSS процесса (обход — в потоке)"""
+    require_admin(x_admin_token)
+    return await asyncio.to_thread(memory.report, max(1, min(sample, MAX_REPORT_SAMPLE)))
+
+@app.post("/admin/memory/budgets")
+async def memory_budgets(settings: MemoryBudgets, x_admin_token: str = Header(None)):
+    """Задает бюджеты (\"64MB\", байты или null) и сразу применяет их"""
+    require_admin(x_admin_token)
+    for name, size in settings.budgets.items():
+        try:
+            memory.set_budget(name, size)
+        except KeyError:
+            raise HTTPException(status_code=400, detail=f"Неизвестный компонент: {name}")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return {"budgets": memory.budgets, "evicted": memory.enforce()}
+
+@app.post("/admin/memory/tracemalloc")
+async def memory_tracing(settings: TracemallocSettings, x_admin_token: str = Header(None)):
+    """Включает или выключает tracemalloc (замедляет все аллокации)"""
+    require_admin(x_admin_token)
+    if settings.enabled:
+        memory.start_tracing(settings.frames)
+    else:
+        memory.stop_tracing()
+    return {"tracing": settings.enabled}
+
+@app.get("/admin/memory/snapshot")
+async def memory_snapshot(limit: int = 20, group_by: str = "lineno",
+                          x_admin_token: str = Header(None)):
+    """Топ мест выделения памяти и прирост с прошлого снимка"""
+    require_admin(x_admin_token)
+    if group_by not in ("lineno", "filename", "traceback"):
+        raise HTTPException(status_code=400, detail="group_by: lineno, filename или traceback")
+    return await asyncio.to_thread(memory.snapshot, limit, group_by)
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Сохраняем AI данные при остановке"""
-    print("💾 Сохранение AI данных...")
+    logger.info("💾 Сохранение AI данных...")
     if ai_system:
         try:
+            ai_system.close()
             ai_system.save_data()
-            print("✓ AI данные сохранены")
         except Exception as e:
-            print(f"⚠️ Ошибка сохранения: {e}")
-    print("✓ Сервер остановлен")
+            logger.error(f"⚠️ Ошибка сохранения: {e}")
+    if session_store:
+        session_store.close()
+    if event_log:
+        event_log.close()
+    logger.info("✓ Сервер остановлен")
 
 if __name__ == "__main__":
     import uvicorn
@@ -232,14 +907,7 @@ if __name__ == "__main__":
     print("=" * 60)
     print("🌐 Backend:  http://localhost:8000")
     print("🎮 Frontend: http://localhost:5173")
-    print("📊 Слов в базе:", len(similarity_engine.get_all_words()))
-    
-    if ai_system:
-        try:
-            print("🧠 AI игр сыграно:", ai_system.games_played)
-        except:
-            print("🧠 AI: новая система")
-    
+    print("🩺 Готовность: http://localhost:8000/readyz")
     print("=" * 60 + "\n")
     
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,325 @@
+"""
+Учет памяти по компонентам и бюджеты
+
+Размер компонента оценивается обходом его объектов: sys.getsizeof плюс
+содержимое контейнеров. У больших словарей и списков измеряются первые
+sample элементов, а результат масштабируется на всю длину, поэтому
+отчет по базе в сотни тысяч слов стоит миллисекунды. Массивы numpy,
+открытые через mmap, считаются отдельно (mapped): их страницы лежат
+в page cache и общие для всех воркеров хоста.
+
+Бюджеты задаются WORDWEAVE_MEMORY_BUDGETS="synonyms_cache=64MB,ai=256MB"
+или через POST /admin/memory/budgets. Компонент сверх бюджета ужимается
+своей функцией вытеснения до LOW_WATERMARK бюджета.
+
+tracemalloc включается по запросу (замедляет аллокации): снимки
+показывают топ мест выделения и прирост с прошлого снимка.
+"""
+
+import gc
+import math
+import mmap
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from collections.abc import Mapping
+from itertools import islice
+from types import MappingProxyType
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+import metrics
+from logger import get_logger
+
+logger = get_logger("memory")
+
+DEFAULT_SAMPLE = 200
+# Выборки вложены (словарь словарей), так что время растет примерно как sample²
+MAX_REPORT_SAMPLE = 500
+MAX_DEPTH = 8
+# Вытеснение ужимает компонент до этой доли бюджета, чтобы не срабатывать на каждой проверке
+LOW_WATERMARK = 0.9
+EVICTION_ROUNDS = 3
+CHECK_INTERVAL = float(os.environ.get("WORDWEAVE_MEMORY_CHECK_INTERVAL", "60"))
+SIZE_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+COMPONENT_BYTES = metrics.gauge(
+    "wordweave_memory_component_bytes", "Оценка памяти компонента", ["component"]
+)
+EVICTIONS = metrics.counter(
+    "wordweave_memory_evictions_total", "Записи, вытесненные по бюджету памяти", ["component"]
+)
+
+
+def parse_size(text) -> int:
+    """'64MB' → байты (также KB, GB и просто число)"""
+    if isinstance(text, (int, float)):
+        return int(text)
+    text = str(text).strip().upper()
+    number = text.rstrip("KMGB")
+    unit = text[len(number):]
+    if unit not in SIZE_UNITS:
+        raise ValueError(f"Неизвестная единица: {text}")
+    return int(float(number) * SIZE_UNITS[unit])
+
+
+def parse_budgets(text: str) -> Dict[str, int]:
+    """'a=64MB,b=1GB' → {'a': ..., 'b': ...}"""
+    budgets = {}
+    for part in (text or "").split(","):
+        if "=" in part:
+            name, size = part.split("=", 1)
+            budgets[name.strip()] = parse_size(size)
+    return budgets
+
+
+def rss_bytes() -> int:
+    """Текущий RSS процесса (Linux), иначе пиковый"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _is_mapped(array: np.ndarray) -> bool:
+    base = array
+    while base is not None:
+        if isinstance(base, mmap.mmap):
+            return True
+        base = getattr(base, "base", None)
+    return False
+
+
+class _Sizer:
+    """Оценка размера графа объектов; общие объекты считаются один раз"""
+
+    def __init__(self, sample: int = DEFAULT_SAMPLE):
+        self.sample = max(1, sample)
+        self.mapped = 0
+        self._seen = set()
+
+    def size(self, obj, depth: int = 0) -> int:
+        if id(obj) in self._seen:
+            return 0
+        self._seen.add(id(obj))
+
+        if isinstance(obj, np.ndarray):
+            # getsizeof включает данные только у массива-владельца
+            if obj.flags.owndata:
+                return sys.getsizeof(obj)
+            if _is_mapped(obj):
+                self.mapped += obj.nbytes
+                return sys.getsizeof(obj)
+            return sys.getsizeof(obj) + obj.nbytes
+
+        size = sys.getsizeof(obj)
+        if depth >= MAX_DEPTH or isinstance(obj, (str, bytes, int, float, bool, type(None))):
+            return size
+
+        try:
+            if isinstance(obj, MappingProxyType):
+                # Прокси только для чтения: память занимает словарь под ним
+                return size + sum(self.size(target, depth) for target in gc.get_referents(obj))
+            if isinstance(obj, (dict, Mapping)):
+                size += self._sampled(obj.items(), len(obj), depth, pairs=True)
+            elif isinstance(obj, (list, tuple, set, frozenset)) or type(obj).__name__ == "deque":
+                size += self._sampled(obj, len(obj), depth)
+            elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+                size += self.size(vars(obj), depth + 1)
+        except RuntimeError:
+            # Контейнер изменился во время обхода: оценка по тому, что успели
+            pass
+        return size
+
+    def _sampled(self, items, count: int, depth: int, pairs: bool = False) -> int:
+        if not count:
+            return 0
+        measured = 0
+        taken = 0
+        for item in islice(items, self.sample):
+            if pairs:
+                measured += self.size(item[0], depth + 1) + self.size(item[1], depth + 1)
+            else:
+                measured += self.size(item, depth + 1)
+            taken += 1
+        return int(measured * count / taken) if taken else 0
+
+
+def estimate(objects, sample: int = DEFAULT_SAMPLE) -> dict:
+    """Оценка для списка корневых объектов компонента"""
+    sizer = _Sizer(sample)
+    heap = sum(sizer.size(obj) for obj in objects if obj is not None)
+    return {"bytes": heap, "mapped": sizer.mapped}
+
+
+def fraction_to_keep(current: int, budget: int) -> float:
+    """Доля записей, которую нужно оставить, чтобы уложиться в LOW_WATERMARK бюджета"""
+    if current <= 0:
+        return 1.0
+    return max(0.0, min(1.0, budget * LOW_WATERMARK / current))
+
+
+def entries_to_remove(count: int, current: int, budget: int) -> int:
+    return count - int(math.floor(count * fraction_to_keep(current, budget)))
+
+
+def shrink_mapping(mapping: dict, current: int, budget: int) -> int:
+    """Удаляет самые старые записи (порядок вставки / LRU), пока оценка не уложится в бюджет"""
+    remove = entries_to_remove(len(mapping), current, budget)
+    try:
+        for key in list(islice(mapping, remove)):
+            mapping.pop(key, None)
+    except RuntimeError:
+        return 0
+    return remove
+
+
+class Component:
+    def __init__(self, name: str, objects: Callable[[], list],
+                 evict: Optional[Callable[[int, int], int]] = None, description: str = ""):
+        self.name = name
+        self.objects = objects
+        self.evict = evict
+        self.description = description
+
+
+class MemoryAccountant:
+    def __init__(self, budgets: Optional[Dict[str, int]] = None):
+        self.components: Dict[str, Component] = {}
+        self.budgets: Dict[str, int] = dict(budgets or {})
+        self.evicted: Dict[str, int] = {}
+        self.last_check = None
+        self._snapshot = None
+
+    def register(self, name: str, objects: Callable[[], list], evict=None, description: str = ""):
+        """objects() — корневые объекты компонента; evict(текущий, бюджет) → вытеснено записей"""
+        self.components[name] = Component(name, objects, evict, description)
+
+    def set_budget(self, name: str, size):
+        if name not in self.components:
+            raise KeyError(name)
+        if size is None:
+            self.budgets.pop(name, None)
+        else:
+            self.budgets[name] = parse_size(size)
+
+    def measure(self, name: str, sample: int = DEFAULT_SAMPLE) -> dict:
+        component = self.components[name]
+        try:
+            result = estimate(component.objects(), sample)
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось оценить {name}: {e}")
+            result = {"bytes": 0, "mapped": 0, "error": str(e)}
+        COMPONENT_BYTES.labels(name).set(result["bytes"])
+        return result
+
+    def report(self, sample: int = DEFAULT_SAMPLE) -> dict:
+        components = {}
+        for name, component in self.components.items():
+            started = time.perf_counter()
+            entry = self.measure(name, sample)
+            budget = self.budgets.get(name)
+            entry.update({
+                "description": component.description,
+                "budget": budget,
+                "over_budget": budget is not None and entry["bytes"] > budget,
+                "evictable": component.evict is not None,
+                "evicted": self.evicted.get(name, 0),
+                "estimate_ms": round((time.perf_counter() - started) * 1000, 2),
+            })
+            components[name] = entry
+
+        return {
+            "rss_bytes": rss_bytes(),
+            "estimated_bytes": sum(c["bytes"] for c in components.values()),
+            "mapped_bytes": sum(c["mapped"] for c in components.values()),
+            "components": components,
+            "last_check": self.last_check,
+            "tracemalloc": tracemalloc.is_tracing(),
+        }
+
+    def enforce(self) -> Dict[str, int]:
+        """Вытесняет записи из компонентов сверх бюджета"""
+        self.last_check = time.time()
+        evicted = {}
+        for name, budget in list(self.budgets.items()):
+            component = self.components.get(name)
+            if component is None or component.evict is None:
+                continue
+            current = self.measure(name)["bytes"]
+            if current <= budget:
+                continue
+            removed = 0
+            measured = current
+            # Оценка после вытеснения может остаться выше бюджета (записи разного размера)
+            for _ in range(EVICTION_ROUNDS):
+                try:
+                    step = component.evict(measured, budget)
+                except Exception as e:
+                    logger.error(f"❌ Ошибка вытеснения {name}: {e}")
+                    break
+                removed += step
+                measured = self.measure(name)["bytes"]
+                if not step or measured <= budget:
+                    break
+            if removed:
+                evicted[name] = removed
+                self.evicted[name] = self.evicted.get(name, 0) + removed
+                EVICTIONS.labels(name).inc(removed)
+                logger.info(
+                    f"🧹 {name}: {current / 2**20:.1f} МБ > бюджета {budget / 2**20:.1f} МБ, "
+                    f"вытеснено {removed}"
+                )
+        return evicted
+
+    # ========== TRACEMALLOC ==========
+
+    def start_tracing(self, frames: int = 1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(max(1, frames))
+            self._snapshot = None
+            logger.info(f"🔬 tracemalloc включен ({frames} кадров)")
+
+    def stop_tracing(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self._snapshot = None
+            logger.info("🔬 tracemalloc выключен")
+
+    def snapshot(self, limit: int = 20, group_by: str = "lineno") -> dict:
+        """Топ мест выделения; size_diff — прирост с прошлого снимка"""
+        if not tracemalloc.is_tracing():
+            return {"tracing": False, "top": []}
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        previous, self._snapshot = self._snapshot, snapshot
+        if previous is not None:
+            stats = snapshot.compare_to(previous, group_by)
+        else:
+            stats = snapshot.statistics(group_by)
+
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": True,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "compared": previous is not None,
+            "top": [
+                {
+                    "location": str(stat.traceback),
+                    "size": stat.size,
+                    "count": stat.count,
+                    "size_diff": getattr(stat, "size_diff", None),
+                }
+                for stat in stats[:max(1, limit)]
+            ],
+        }
+
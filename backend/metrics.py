@@ -0,0 +1,369 @@
+"""
+Метрики WORDWEAVE в формате Prometheus
+
+Счетчики, гистограммы задержек и gauge-метрики без внешних зависимостей.
+Все метрики регистрируются в глобальном реестре REGISTRY и отдаются
+эндпоинтом /metrics через render_metrics().
+"""
+
+import bisect
+import threading
+import time
+import weakref
+from functools import wraps
+
+# Границы бакетов в секундах: от 10 мкс до 10 с
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = [f'{k}="{v}"' for k, v in labels]
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+
+    def labels(self, *values, **kwargs):
+        """Возвращает дочернюю метрику для набора меток"""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._new_child()
+                    self._children[key] = child
+        return child
+
+    def _default_child(self):
+        return self.labels()
+
+    def samples(self):
+        for key, child in list(self._children.items()):
+            labels = list(zip(self.labelnames, key))
+            yield from child.samples(self.name, labels)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount=1.0):
+        self.value += amount
+
+    def samples(self, name, labels):
+        yield name, labels, self.value
+
+
+class Counter(_Metric):
+    """Монотонно растущий счетчик"""
+
+    metric_type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1.0):
+        self._default_child().inc(amount)
+
+
+class _GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+        self._function = None
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1.0):
+        self.value += amount
+
+    def dec(self, amount=1.0):
+        self.value -= amount
+
+    def set_function(self, function):
+        """Значение вычисляется при каждом запросе /metrics"""
+        self._function = function
+
+    def get(self):
+        if self._function is not None:
+            try:
+                return float(self._function())
+            except Exception:
+                return float("nan")
+        return self.value
+
+    def samples(self, name, labels):
+        yield name, labels, self.get()
+
+
+class Gauge(_Metric):
+    """Значение, которое может расти и уменьшаться"""
+
+    metric_type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._default_child().set(value)
+
+    def inc(self, amount=1.0):
+        self._default_child().inc(amount)
+
+    def dec(self, amount=1.0):
+        self._default_child().dec(amount)
+
+    def set_function(self, function):
+        self._default_child().set_function(function)
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield name + "_bucket", labels + [("le", _format_value(bound))], cumulative
+        cumulative += self.counts[-1]
+        yield name + "_bucket", labels + [("le", "+Inf")], cumulative
+        yield name + "_sum", labels, self.sum
+        yield name + "_count", labels, cumulative
+
+
+class Histogram(_Metric):
+    """Гистограмма задержек с фиксированными бакетами"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default_child().observe(value)
+
+    def time(self):
+        return _Timer(self._default_child())
+
+
+class _Timer:
+    """Контекстный менеджер, записывающий длительность блока в гистограмму"""
+
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def render(self):
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name, documentation, labelnames=()):
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name, documentation, labelnames=()):
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def render_metrics() -> str:
+    """Текст для эндпоинта /metrics"""
+    return REGISTRY.render()
+
+
+# ========== МЕТРИКИ ГОРЯЧЕГО ПУТИ ==========
+
+CALLS = counter(
+    "wordweave_calls_total",
+    "Количество вызовов инструментированных функций",
+    ["function"],
+)
+ERRORS = counter(
+    "wordweave_errors_total",
+    "Количество исключений в инструментированных функциях",
+    ["function"],
+)
+LATENCY = histogram(
+    "wordweave_latency_seconds",
+    "Длительность инструментированных функций",
+    ["function"],
+)
+
+ACTIVE_GAMES = gauge("wordweave_active_games", "Количество активных игр")
+ACTIVE_SOCKETS = gauge("wordweave_active_sockets", "Количество открытых WebSocket")
+WAITING_PLAYERS = gauge("wordweave_waiting_players", "Игроки в очереди мультиплеера")
+CACHE_HIT_RATIO = gauge(
+    "wordweave_cache_hit_ratio",
+    "Доля попаданий в кэш",
+    ["cache"],
+)
+WS_MESSAGES = counter(
+    "wordweave_ws_messages_total",
+    "Входящие WebSocket сообщения по действиям",
+    ["action"],
+)
+WS_RATE_LIMITED = counter(
+    "wordweave_ws_rate_limited_total",
+    "Сообщения, отброшенные ограничением частоты",
+)
+WS_DISCONNECTS = counter(
+    "wordweave_ws_disconnects_total",
+    "Закрытые WebSocket по причинам",
+    ["reason"],
+)
+WS_SEND_QUEUE = histogram(
+    "wordweave_ws_send_queue_depth",
+    "Длина очереди исходящих сообщений в момент постановки",
+    buckets=(0, 1, 2, 4, 8, 16, 32, 64, 128),
+)
+WS_BROADCAST_RECIPIENTS = histogram(
+    "wordweave_ws_broadcast_recipients",
+    "Число получателей одной рассылки по игре",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+
+
+def timed(function_name):
+    """Декоратор: считает вызовы, ошибки и задержку функции"""
+
+    def decorator(func):
+        calls = CALLS.labels(function_name)
+        errors = ERRORS.labels(function_name)
+        latency = LATENCY.labels(function_name)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                latency.observe(time.perf_counter() - start)
+                calls.inc()
+
+        return wrapper
+
+    return decorator
+
+
+# Живые CacheStats по имени кэша: у каждой версии модели свои кэши,
+# а gauge показывает общую долю попаданий по всем загруженным версиям
+_CACHE_STATS = {}
+_CACHE_STATS_LOCK = threading.Lock()
+
+
+def _combined_hit_ratio(instances) -> float:
+    hits = misses = 0
+    for stats in list(instances):
+        hits += stats.hits
+        misses += stats.misses
+    total = hits + misses
+    return hits / total if total else 0.0
+
+
+class CacheStats:
+    """Счетчик попаданий/промахов кэша, публикуемый как gauge.
+
+    Экземпляры с одним именем (кэши разных версий модели) суммируются;
+    выгруженная версия выпадает из суммы вместе со своим объектом.
+    """
+
+    __slots__ = ("hits", "misses", "__weakref__")
+
+    def __init__(self, cache_name):
+        self.hits = 0
+        self.misses = 0
+        with _CACHE_STATS_LOCK:
+            instances = _CACHE_STATS.get(cache_name)
+            if instances is None:
+                instances = _CACHE_STATS[cache_name] = weakref.WeakSet()
+                CACHE_HIT_RATIO.labels(cache_name).set_function(
+                    lambda: _combined_hit_ratio(instances)
+                )
+            instances.add(self)
+
+    def hit(self):
+        self.hits += 1
+
+    def miss(self):
+        self.misses += 1
+
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -0,0 +1,156 @@
+"""
+Реестр версий Word2Vec модели для замены без перезапуска
+
+Версия — это движок похожести со своей моделью и всем, что от нее
+зависит: кэш синонимов и индексов строк, подсказки (HintEngine) и
+таблица головоломки дня. Новая модель грузится в фоне, после чего
+новые игры получают новую версию, а начатые доигрывают на своей.
+Старая версия выгружается, когда из нее уходит последняя игра.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional, Set
+
+import metrics
+from daily import DailyPuzzleManager
+from hints import HintEngine
+from logger import get_logger
+from word_similarity import DEFAULT_MODEL_PATH
+
+logger = get_logger("models")
+
+MODEL_PATH = os.environ.get("WORDWEAVE_MODEL_PATH", DEFAULT_MODEL_PATH)
+
+LOADED_VERSIONS = metrics.gauge("wordweave_model_versions", "Загруженные версии модели")
+
+
+class ModelVersion:
+    """Движок одной модели и кэши, посчитанные на ней"""
+
+    def __init__(self, version: str, engine):
+        self.version = version
+        self.engine = engine
+        self.hints = HintEngine(engine)
+        self.daily = DailyPuzzleManager(engine)
+        self.games: Set[str] = set()
+        self.loaded_at = time.time()
+
+    def info(self) -> dict:
+        return {
+            "version": self.version,
+            "model_path": self.engine.model_path,
+            "games": len(self.games),
+            "loaded_at": self.loaded_at,
+        }
+
+
+class ModelRegistry:
+    def __init__(self, engine):
+        self._lock = threading.Lock()
+        self._counter = 0
+        self.versions: Dict[str, ModelVersion] = {}
+        self._by_game: Dict[str, ModelVersion] = {}
+        self.current = self._register(engine)
+        self.loading: Optional[str] = None
+        self.last_error: Optional[str] = None
+        LOADED_VERSIONS.set_function(lambda: len(self.versions))
+
+    def _register(self, engine) -> ModelVersion:
+        self._counter += 1
+        version = ModelVersion(f"{engine.model_name}@{self._counter}", engine)
+        self.versions[version.version] = version
+        return version
+
+    # ========== ИГРЫ ==========
+
+    def acquire(self, game_id: str) -> ModelVersion:
+        """Закрепляет игру за текущей версией"""
+        with self._lock:
+            version = self._by_game.get(game_id)
+            if version is None:
+                version = self.current
+                version.games.add(game_id)
+                self._by_game[game_id] = version
+            return version
+
+    def version_of(self, game_id: str) -> ModelVersion:
+        return self._by_game.get(game_id) or self.current
+
+    def release(self, game_id: str):
+        """Игра закончилась; версия без игр, кроме текущей, выгружается"""
+        with self._lock:
+            version = self._by_game.pop(game_id, None)
+            if version is None:
+                return
+            version.games.discard(game_id)
+            retire = version is not self.current and not version.games
+            if retire:
+                del self.versions[version.version]
+        if retire:
+            self._unload(version)
+
+    # ========== ЗАМЕНА МОДЕЛИ ==========
+
+    def reserve(self, model_path: str):
+        """Отмечает начало загрузки; вторую замену отклоняет, пока идет первая"""
+        with self._lock:
+            if self.loading:
+                raise RuntimeError(f"Уже загружается {self.loading}")
+            if not os.path.exists(model_path):
+                raise FileNotFoundError(model_path)
+            self.loading = model_path
+            self.last_error = None
+
+    def load(self, model_path: str, reserved: bool = False) -> ModelVersion:
+        """Грузит модель (долго, вызывать в потоке) и делает ее текущей
+
+        reserved=True — загрузку уже отметил reserve (обработчик запроса).
+        """
+        if not reserved:
+            self.reserve(model_path)
+
+        try:
+            engine = self.current.engine.with_model(model_path)
+            if engine.model is None:
+                raise RuntimeError(f"Не удалось загрузить модель {model_path}")
+        except Exception as e:
+            with self._lock:
+                self.loading = None
+                self.last_error = str(e)
+            raise
+
+        with self._lock:
+            previous = self.current
+            # Выученные данные могли появиться после загрузки: берем актуальные
+            engine.ai_system = previous.engine.ai_system
+            engine.association_graph = previous.engine.association_graph
+            self.current = current = self._register(engine)
+            # loading снимается вместе со сменой версии: новая замена не начнется
+            # раньше, чем эта станет текущей
+            self.loading = None
+            retire = not previous.games
+            if retire:
+                del self.versions[previous.version]
+
+        logger.info(f"🔁 Новые игры идут на модель {current.version}")
+        if retire:
+            self._unload(previous)
+        else:
+            logger.info(f"⏳ {previous.version} выгрузится после {len(previous.games)} игр")
+        return current
+
+    @staticmethod
+    def _unload(version: ModelVersion):
+        version.engine.unload_model()
+        logger.info(f"🗑️ Модель {version.version} выгружена")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "current": self.current.version,
+                "loading": self.loading,
+                "last_error": self.last_error,
+                "versions": [v.info() for v in self.versions.values()],
+            }
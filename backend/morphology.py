@@ -0,0 +1,148 @@
+"""
+Легкая лемматизация существительных для validate_word
+
+Таблица суффиксных правил строится офлайн по словарю (load_dictionary.py
+или `python morphology.py`) и хранится в lemma_index.json. На сервере
+никакая морфологическая библиотека не загружается: для слова перебираются
+его окончания (от длинного к короткому) и проверяются кандидаты-леммы.
+"""
+
+import json
+import os
+import sys
+
+DEFAULT_INDEX_PATH = "lemma_index.json"
+
+# Правило применяется, только если лемм с таким окончанием в словаре не меньше
+MIN_SUPPORT = 20
+
+# Окончание леммы → окончания словоформ (падежи ед. и мн. числа)
+PARADIGMS = {
+    "": ["а", "у", "ом", "ем", "е", "ы", "и", "ов", "ев", "ей", "ам", "ами", "ах", "ям", "ями", "ях"],
+    "а": ["ы", "и", "е", "у", "ой", "ою", "ей", "ам", "ами", "ах", "ям", "ями", "ях", ""],
+    "я": ["и", "е", "ю", "ей", "ею", "ям", "ями", "ях", "ь", ""],
+    "ия": ["ии", "ию", "ией", "ий", "иям", "иями", "иях"],
+    "ь": ["и", "ю", "ью", "ей", "ям", "ями", "ях", "я", "е", "ем"],
+    "й": ["я", "ю", "ем", "е", "и", "ев", "ям", "ями", "ях"],
+    "о": ["а", "у", "ом", "е", "ам", "ами", "ах", ""],
+    "е": ["я", "ю", "ем", "ей", "ям", "ями", "ях"],
+    "ие": ["ия", "ию", "ием", "ии", "ий", "иям", "иями", "иях"],
+    # Беглая гласная: кусок → куска, отец → отца, звонок → звонки
+    "ок": ["ка", "ку", "ком", "ке", "ки", "ков", "кам", "ками", "ках"],
+    "ек": ["ка", "ку", "ком", "ке", "ки", "ков", "кам", "ками", "ках"],
+    "ец": ["ца", "цу", "цом", "цем", "це", "цы", "цов", "цев", "цам", "цами", "цах"],
+}
+
+# Формы, которые не выводятся суффиксами
+IRREGULAR = {
+    "люди": "человек", "людей": "человек", "людям": "человек", "людьми": "человек", "людях": "человек",
+    "дети": "ребенок", "детей": "ребенок", "детям": "ребенок", "детьми": "ребенок", "детях": "ребенок",
+    "матери": "мать", "матерью": "мать", "дочери": "дочь", "дочерью": "дочь",
+    "времени": "время", "временем": "время", "имени": "имя", "именем": "имя",
+    "котята": "котенок", "котят": "котенок", "котятам": "котенок", "котятами": "котенок",
+    "глаза": "глаз", "уши": "ухо", "ушей": "ухо", "ушами": "ухо",
+    "деревья": "дерево", "деревьев": "дерево", "листья": "лист", "друзья": "друг", "друзей": "друг",
+}
+
+
+def _normalize(word: str) -> str:
+    return word.lower().strip().replace('ё', 'е')
+
+
+def build_lemma_index(words) -> dict:
+    """Строит таблицу правил по списку лемм.
+
+    Для каждого окончания словоформы хранится список окончаний леммы,
+    отсортированный по числу лемм словаря, к которым правило применимо.
+    """
+    words = [_normalize(w) for w in words]
+
+    support = {}
+    for lemma_suffix in PARADIGMS:
+        if lemma_suffix:
+            support[lemma_suffix] = sum(1 for w in words if w.endswith(lemma_suffix))
+        else:
+            vowels_and_signs = set("аеиоуыэюяйь")
+            support[lemma_suffix] = sum(1 for w in words if w and w[-1] not in vowels_and_signs)
+
+    candidates = {}
+    for lemma_suffix, surface_suffixes in PARADIGMS.items():
+        if support[lemma_suffix] < MIN_SUPPORT:
+            continue
+        for surface_suffix in surface_suffixes:
+            candidates.setdefault(surface_suffix, []).append((support[lemma_suffix], lemma_suffix))
+
+    rules = {
+        surface: [lemma_suffix for _, lemma_suffix in sorted(options, reverse=True)]
+        for surface, options in candidates.items()
+    }
+    word_set = set(words)
+    irregular = {form: lemma for form, lemma in IRREGULAR.items() if lemma in word_set}
+
+    return {
+        "rules": rules,
+        "irregular": irregular,
+        "max_suffix": max((len(s) for s in rules), default=0),
+    }
+
+
+def save_lemma_index(index: dict, filename: str = DEFAULT_INDEX_PATH):
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+
+
+class LemmaIndex:
+    def __init__(self, index: dict):
+        self.rules = {suffix: tuple(options) for suffix, options in index.get("rules", {}).items()}
+        self.irregular = index.get("irregular", {})
+        self.max_suffix = index.get("max_suffix", 0)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX_PATH) -> "LemmaIndex":
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def load_or_build(cls, path: str, words) -> "LemmaIndex":
+        """Файл из сборки словаря, либо таблица по уже загруженным словам"""
+        if os.path.exists(path):
+            return cls.load(path)
+        return cls(build_lemma_index(words))
+
+    def lemmatize(self, word: str, vocabulary) -> str:
+        """Возвращает лемму из vocabulary для словоформы word или None.
+
+        Проверяется не больше max_suffix + 1 окончаний, каждое дает
+        несколько кандидатов — время O(len(word)).
+        """
+        lemma = self.irregular.get(word)
+        if lemma is not None:
+            return lemma
+
+        rules = self.rules
+        length = len(word)
+        for suffix_length in range(min(self.max_suffix, length - 2), -1, -1):
+            stem = word[:length - suffix_length]
+            suffix = word[length - suffix_length:]
+            for lemma_suffix in rules.get(suffix, ()):
+                candidate = stem + lemma_suffix
+                if candidate != word and candidate in vocabulary:
+                    return candidate
+        return None
+
+
+def main():
+    """Строит lemma_index.json по word_database.json или words_compact.json"""
+    source = sys.argv[1] if len(sys.argv) > 1 else 'word_database.json'
+    if not os.path.exists(source):
+        source = 'words_compact.json'
+    with open(source, 'r', encoding='utf-8') as f:
+        words = list(json.load(f))
+
+    index = build_lemma_index(words)
+    save_lemma_index(index)
+    print(f"✓ Индекс лемм: {len(index['rules'])} правил, {len(index['irregular'])} исключений")
+
+
+if __name__ == "__main__":
+    main()
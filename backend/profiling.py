@@ -0,0 +1,171 @@
+"""
+Выборочное профилирование горячего пути
+
+Доля вызовов (WORDWEAVE_PROFILE_RATE или POST /admin/profile) выполняется
+под cProfile, результаты копятся в одном pstats.Stats. Отдаются:
+- топ функций по собственному или накопленному времени;
+- дамп pstats (открывается `python -m pstats` или snakeviz);
+- collapsed stacks для flamegraph.pl / speedscope. cProfile хранит
+  только ребра вызовов, поэтому стеки восстанавливаются по графу:
+  время вызываемой функции делится между путями пропорционально ребрам.
+
+Когда профилирование выключено, обертка стоит одной проверки атрибута.
+"""
+
+import cProfile
+import marshal
+import os
+import pstats
+import random
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from logger import get_logger
+
+logger = get_logger("profiling")
+
+DEFAULT_RATE = float(os.environ.get("WORDWEAVE_PROFILE_RATE", "0"))
+MAX_DEPTH = 64
+SORT_KEYS = ("tottime", "cumtime", "ncalls")
+
+
+def _label(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+class Profiler:
+    def __init__(self, rate: float = DEFAULT_RATE):
+        self.rate = 0.0
+        self._stats = None
+        self._lock = threading.Lock()
+        self.samples = Counter()
+        self.started_at = None
+        self.set_rate(rate)
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def set_rate(self, rate: float):
+        rate = max(0.0, min(float(rate), 1.0))
+        if rate and not self.rate:
+            self.started_at = time.time()
+            logger.info(f"🔬 Профилирование включено: доля вызовов {rate}")
+        elif not rate and self.rate:
+            logger.info("🔬 Профилирование выключено")
+        self.rate = rate
+
+    def reset(self):
+        with self._lock:
+            self._stats = None
+            self.samples.clear()
+            self.started_at = time.time() if self.rate else None
+
+    def call(self, name: str, func, *args, **kwargs):
+        """Выполняет func под cProfile; параллельный вызов идет без профиля"""
+        if not self._lock.acquire(blocking=False):
+            return func(*args, **kwargs)
+        try:
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(func, *args, **kwargs)
+            finally:
+                if self._stats is None:
+                    self._stats = pstats.Stats(profile)
+                else:
+                    self._stats.add(profile)
+                self.samples[name] += 1
+        finally:
+            self._lock.release()
+
+    def _raw(self) -> dict:
+        with self._lock:
+            return dict(self._stats.stats) if self._stats is not None else {}
+
+    # ========== ОТЧЕТЫ ==========
+
+    def hotspots(self, limit: int = 20, sort: str = "tottime") -> list:
+        """Топ функций: вызовы, собственное и накопленное время"""
+        column = {"ncalls": 1, "tottime": 2, "cumtime": 3}.get(sort, 2)
+        rows = sorted(self._raw().items(), key=lambda item: item[1][column], reverse=True)
+        return [
+            {
+                "function": _label(func),
+                "ncalls": nc,
+                "tottime": round(tt, 6),
+                "cumtime": round(ct, 6),
+                "percall_ms": round(ct / nc * 1000, 4) if nc else 0.0,
+            }
+            for func, (cc, nc, tt, ct, callers) in rows[:max(1, limit)]
+        ]
+
+    def dump_pstats(self) -> bytes:
+        """Тот же формат, что пишет pstats.Stats.dump_stats"""
+        return marshal.dumps(self._raw())
+
+    def collapsed(self) -> str:
+        """Стеки в формате «a;b;c микросекунды» для flamegraph"""
+        stats = self._raw()
+        children = {}
+        for func, (cc, nc, tt, ct, callers) in stats.items():
+            for caller, edge in callers.items():
+                children.setdefault(caller, []).append((func, edge[3]))
+
+        folded = Counter()
+
+        def walk(func, path, on_path, share):
+            tt = stats[func][2]
+            own = int(tt * share * 1e6)
+            if own:
+                folded[";".join(path)] += own
+            if len(path) >= MAX_DEPTH:
+                return
+            for callee, edge_cumtime in children.get(func, ()):
+                callee_cumtime = stats[callee][3]
+                if callee in on_path or not callee_cumtime:
+                    continue
+                callee_share = share * min(1.0, edge_cumtime / callee_cumtime)
+                if callee_share * callee_cumtime < 1e-6:
+                    continue
+                on_path.add(callee)
+                walk(callee, path + [_label(callee)], on_path, callee_share)
+                on_path.discard(callee)
+
+        for root, values in stats.items():
+            if not values[4]:
+                walk(root, [_label(root)], {root}, 1.0)
+
+        return "".join(f"{stack} {value}\n" for stack, value in folded.most_common())
+
+    def report(self, limit: int = 20, sort: str = "tottime") -> dict:
+        return {
+            "enabled": self.enabled,
+            "rate": self.rate,
+            "started_at": self.started_at,
+            "samples": dict(self.samples),
+            "hotspots": self.hotspots(limit, sort),
+        }
+
+
+PROFILER = Profiler()
+
+
+def profiled(name: str):
+    """Декоратор: с вероятностью PROFILER.rate вызов идет под cProfile"""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            rate = PROFILER.rate
+            if rate and random.random() < rate:
+                return PROFILER.call(name, func, *args, **kwargs)
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,218 @@
+"""
+Хранилище игровых сессий для восстановления после перезапуска
+
+Каждая игра — строка в таблице games плюс журнал попыток и подсказок
+(только добавление) в таблице moves. Запись идет из отдельного потока
+пачками, так что обработчик попытки только кладет событие в очередь.
+После рестарта игра лениво восстанавливается из журнала при первом
+обращении клиента. Игры старше RETENTION_SECONDS удаляются при старте
+и затем по purge() (сервер вызывает его раз в PURGE_INTERVAL).
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from logger import get_logger
+
+logger = get_logger("sessions")
+
+DEFAULT_DB_PATH = os.environ.get("WORDWEAVE_SESSION_DB", "sessions.db")
+BATCH_SIZE = 500
+# Незавершенные игры старше этого срока не восстанавливаются и удаляются
+RETENTION_SECONDS = 7 * 24 * 3600
+PURGE_INTERVAL = 3600
+# Маркер в очереди записи: удалить устаревшие игры
+PURGE = "purge"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT PRIMARY KEY,
+    mode TEXT NOT NULL,
+    target TEXT NOT NULL,
+    players TEXT NOT NULL,
+    puzzle_date TEXT,
+    created REAL NOT NULL,
+    finished INTEGER NOT NULL DEFAULT 0,
+    winner TEXT
+);
+CREATE TABLE IF NOT EXISTS moves (
+    game_id TEXT NOT NULL,
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    player TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    word TEXT NOT NULL,
+    similarity REAL,
+    rank INTEGER
+);
+CREATE INDEX IF NOT EXISTS moves_by_game ON moves (game_id, seq);
+CREATE INDEX IF NOT EXISTS games_by_created ON games (created);
+"""
+
+
+class SessionStore:
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._queue = queue.SimpleQueue()
+        self._read_lock = threading.Lock()
+        self._reader = None
+        # Сколько записей поставлено и сколько обработано потоком записи
+        self._queued = 0
+        self._written = 0
+        self.purged = 0
+        self._thread = threading.Thread(target=self._writer_loop, name="session-store", daemon=True)
+        self._ready = threading.Event()
+        self._thread.start()
+        self._ready.wait()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ========== ЗАПИСЬ (поток session-store) ==========
+
+    def _writer_loop(self):
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        self._purge(conn)
+        self._ready.set()
+
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            purge = PURGE in batch
+            waiters = [entry for entry in batch if isinstance(entry, threading.Event)]
+            writes = [entry for entry in batch if isinstance(entry, tuple)]
+            try:
+                for sql, params in writes:
+                    conn.execute(sql, params)
+                conn.commit()
+            except Exception as e:
+                logger.error(f"❌ Ошибка записи сессий: {e}")
+                conn.rollback()
+            # Записи пачки считаются обработанными и при ошибке: ждать их бесполезно
+            self._written += len(writes)
+            if purge:
+                self._purge(conn)
+            for waiter in waiters:
+                waiter.set()
+
+            if stop:
+                conn.close()
+                return
+
+    def _purge(self, conn: sqlite3.Connection):
+        cutoff = time.time() - RETENTION_SECONDS
+        try:
+            conn.execute(
+                "DELETE FROM moves WHERE game_id IN (SELECT game_id FROM games WHERE created < ?)",
+                (cutoff,)
+            )
+            removed = conn.execute("DELETE FROM games WHERE created < ?", (cutoff,)).rowcount
+            conn.commit()
+        except Exception as e:
+            logger.error(f"❌ Ошибка очистки сессий: {e}")
+            conn.rollback()
+            return
+        if removed:
+            self.purged += removed
+            logger.info(f"🧹 Удалено устаревших игр: {removed}")
+
+    def _put(self, sql: str, params: tuple):
+        self._queued += 1
+        self._queue.put((sql, params))
+
+    def purge(self):
+        """Удаляет игры старше RETENTION_SECONDS (в потоке записи)"""
+        self._queue.put(PURGE)
+
+    def record_game(self, game):
+        """Новая игра: целевое слово, игроки и дата головоломки (для daily)"""
+        puzzle = getattr(game, 'puzzle', None)
+        self._put(
+            "INSERT OR REPLACE INTO games (game_id, mode, target, players, puzzle_date, created) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (game.game_id, game.mode.value, game.target_word, json.dumps(game.players),
+             puzzle.date.isoformat() if puzzle is not None else None, time.time())
+        )
+
+    def record_guess(self, game_id: str, player: str, word: str, similarity: float, rank: int):
+        self._put(
+            "INSERT INTO moves (game_id, player, kind, word, similarity, rank) VALUES (?, ?, 'guess', ?, ?, ?)",
+            (game_id, player, word, similarity, rank)
+        )
+
+    def record_hint(self, game_id: str, player: str, word: str):
+        self._put(
+            "INSERT INTO moves (game_id, player, kind, word) VALUES (?, ?, 'hint', ?)",
+            (game_id, player, word)
+        )
+
+    def record_finish(self, game_id: str, winner: str):
+        self._put("UPDATE games SET finished = 1, winner = ? WHERE game_id = ?", (winner, game_id))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Ждет, пока все поставленные в очередь записи окажутся в базе"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        self.flush()
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    # ========== ЧТЕНИЕ ==========
+
+    def _query(self, sql: str, params: tuple) -> list:
+        with self._read_lock:
+            if self._reader is None:
+                self._reader = self._connect()
+            return self._reader.execute(sql, params).fetchall()
+
+    def load_game(self, game_id: str):
+        """Состояние игры и журнал ходов, либо None"""
+        # Ждем запись, только если в очереди что-то есть: поиск неизвестного
+        # id при пустой очереди не должен стоять в очереди к потоку записи
+        if self._written < self._queued:
+            self.flush()
+        rows = self._query(
+            "SELECT mode, target, players, puzzle_date, created, finished, winner FROM games WHERE game_id = ?",
+            (game_id,)
+        )
+        if not rows:
+            return None
+        mode, target, players, puzzle_date, created, finished, winner = rows[0]
+        if created < time.time() - RETENTION_SECONDS:
+            return None
+
+        moves = self._query(
+            "SELECT player, kind, word, similarity, rank FROM moves WHERE game_id = ? ORDER BY seq",
+            (game_id,)
+        )
+        return {
+            "game_id": game_id,
+            "mode": mode,
+            "target": target,
+            "players": json.loads(players),
+            "puzzle_date": puzzle_date,
+            "created": created,
+            "finished": bool(finished),
+            "winner": winner,
+            "moves": [
+                {"player": p, "kind": k, "word": w, "similarity": s, "rank": r}
+                for p, k, w, s, r in moves
+            ],
+        }
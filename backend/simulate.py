@@ -0,0 +1,286 @@
+"""
+Самоигра ботов для оценки сложности загаданных слов (офлайн)
+
+Жадный бот играет обычные GameSession против WordSimilarityEngine: берет
+лучшее по рангу слово из своих попыток и пробует его ближайших соседей
+по модели, а если соседи кончились или все далеко — случайное слово.
+Игры раскладываются по процессам (ProcessPoolExecutor); каждый процесс
+открывает сконвертированную модель через mmap, так что страницы матрицы
+общие для всех воркеров в page cache.
+
+    python simulate.py [--games 20] [--workers 4] [--targets кот,дом] [--output target_difficulty.json]
+
+Результат — target_difficulty.json рядом с базой: по каждой цели доля
+решенных игр, медиана и p90 попыток, распределение рангов попыток.
+Сервер подхватывает его при загрузке модели (difficulty.TargetDifficulty).
+Заодно печатается пропускная способность make_guess (benchmarks/selfplay.py).
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ai_learning import AILearningSystem
+from association_graph import DEFAULT_GRAPH_PATH, load_or_build
+from difficulty import DIFFICULTY_PATH
+from game_logic import GameMode, GameSession
+from logger import get_logger
+from model_registry import MODEL_PATH
+from popular_words import get_popular_words
+from vector_backend import VECTORS_SUFFIX, VectorModel
+from word_similarity import WordSimilarityEngine
+
+logger = get_logger("simulate")
+
+BOT = "bot"
+DEFAULT_GAMES = 20
+MAX_ATTEMPTS = 150
+NEIGHBORS = 20
+# Пока лучшая попытка дальше этого ранга, бот через раз пробует случайное слово
+JUMP_RANK = 1000
+# Границы зон ранга, как в сообщениях клиента
+RANK_BANDS = ((100, "very_close"), (500, "close"), (1000, "medium"))
+FAR_BAND = "far"
+
+
+class ReadOnlyAI(AILearningSystem):
+    """Выученные ассоциации игроков без обучения на играх ботов"""
+
+    def learn_from_guess(self, *args, **kwargs):
+        pass
+
+    def learn_from_game(self, *args, **kwargs):
+        pass
+
+
+def rank_band(rank: int) -> str:
+    for limit, name in RANK_BANDS:
+        if rank < limit:
+            return name
+    return FAR_BAND
+
+
+# ========== БОТ ==========
+
+def next_guess(engine, guessed: dict, rng: random.Random, vocabulary: list) -> str:
+    """Ближайший непопробованный сосед лучших попыток или случайное слово"""
+    ordered = sorted(guessed.items(), key=lambda item: item[1])
+    if ordered and (ordered[0][1] < JUMP_RANK or rng.random() < 0.5):
+        for word, _ in ordered:
+            for neighbor, _ in engine.get_synonyms(word, top_n=NEIGHBORS):
+                if neighbor not in guessed:
+                    return neighbor
+
+    while True:
+        word = rng.choice(vocabulary)
+        if word not in guessed:
+            return word
+
+
+def play_game(engine, target: str, seed: int, openers: list, vocabulary: list,
+              max_attempts: int = MAX_ATTEMPTS) -> dict:
+    """Одна игра бота; возвращает число попыток, ранги и время каждой попытки"""
+    rng = random.Random(seed)
+    game = GameSession(f"sim-{seed}", GameMode.SOLO, engine, players=[BOT], target_word=target)
+    guessed = {}
+    ranks = []
+    latencies = []
+    solved = False
+
+    word = rng.choice([w for w in openers if w != target] or vocabulary)
+    perf = time.perf_counter_ns
+    while len(ranks) < max_attempts and len(guessed) < 2 * max_attempts:
+        start = perf()
+        result = game.make_guess(BOT, word)
+        latencies.append(perf() - start)
+
+        if 'error' in result:
+            guessed[word] = float('inf')
+        else:
+            guessed[result['word']] = result['rank']
+            guessed.setdefault(word, result['rank'])
+            ranks.append(result['rank'])
+            if result['is_correct']:
+                solved = True
+                break
+        word = next_guess(engine, guessed, rng, vocabulary)
+
+    return {
+        "target": target,
+        "solved": solved,
+        "attempts": len(ranks),
+        "ranks": ranks,
+        "latencies_ns": latencies,
+    }
+
+
+# ========== ПРОЦЕССЫ ==========
+
+_worker = {}
+
+
+def init_worker(data_dir: str, model_path: str, max_attempts: int):
+    """Загружает движок один раз на процесс (модель — через mmap)"""
+    import logging
+    logging.getLogger("wordweave").setLevel(logging.WARNING)
+
+    ai_system = ReadOnlyAI(data_file=os.path.join(data_dir, 'ai_learning_data.json'))
+    engine = WordSimilarityEngine(
+        database_path=os.path.join(data_dir, 'word_database.json'),
+        ai_system=ai_system,
+        model_path=model_path
+    )
+    engine.association_graph = load_or_build(os.path.join(data_dir, DEFAULT_GRAPH_PATH), ai_system)
+
+    vocabulary = engine.get_all_words()
+    openers = [w for w in get_popular_words() if w in engine.word_database] or vocabulary
+    _worker.update(engine=engine, vocabulary=vocabulary, openers=openers, max_attempts=max_attempts)
+
+
+def play_target(task) -> list:
+    target, seeds = task
+    return [
+        play_game(
+            _worker["engine"], target, seed,
+            _worker["openers"], _worker["vocabulary"], _worker["max_attempts"]
+        )
+        for seed in seeds
+    ]
+
+
+def ensure_converted(model_path: str):
+    """Воркеры делят модель только через mmap .npy: конвертируем .bin один раз"""
+    base_path = VectorModel.converted_path(model_path)
+    if os.path.exists(base_path + VECTORS_SUFFIX) or not os.path.exists(model_path):
+        return
+    logger.info(f"📦 Конвертация {model_path} для общего mmap...")
+    VectorModel.load_word2vec_format(model_path).save(base_path)
+
+
+def run_simulation(data_dir: str, model_path: str, targets: list, games: int,
+                   workers: int, max_attempts: int = MAX_ATTEMPTS, seed: int = 1):
+    """Играет games игр на каждую цель; возвращает записи игр и время в секундах"""
+    ensure_converted(model_path)
+    tasks = [
+        (target, [seed * 1_000_003 + index * 7919 + game for game in range(games)])
+        for index, target in enumerate(targets)
+    ]
+
+    records = []
+    started = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(data_dir, model_path, max_attempts)
+    ) as pool:
+        for done, target_records in enumerate(pool.map(play_target, tasks), 1):
+            records.extend(target_records)
+            if done % 50 == 0:
+                logger.info(f"🤖 {done}/{len(tasks)} целей")
+    return records, time.perf_counter() - started
+
+
+# ========== СТАТИСТИКА ==========
+
+def _percentile(ordered: list, fraction: float):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize_target(records: list, max_attempts: int) -> dict:
+    """Нерешенная игра считается за max_attempts попыток"""
+    attempts = sorted(r["attempts"] if r["solved"] else max_attempts for r in records)
+    solved = sum(1 for r in records if r["solved"])
+
+    bands = {name: 0 for _, name in RANK_BANDS}
+    bands[FAR_BAND] = 0
+    for record in records:
+        for rank in record["ranks"]:
+            if rank:
+                bands[rank_band(rank)] += 1
+    total = sum(bands.values()) or 1
+
+    return {
+        "games": len(records),
+        "solve_rate": round(solved / len(records), 3),
+        "median_attempts": statistics.median(attempts),
+        "p90_attempts": _percentile(attempts, 0.9),
+        "rank_bands": {name: round(count / total, 3) for name, count in bands.items()},
+    }
+
+
+def summarize_targets(records: list, max_attempts: int) -> dict:
+    by_target = {}
+    for record in records:
+        by_target.setdefault(record["target"], []).append(record)
+    return {
+        target: summarize_target(target_records, max_attempts)
+        for target, target_records in sorted(by_target.items())
+    }
+
+
+def save_difficulty(path: str, model_name: str, targets: dict, games: int, max_attempts: int):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "model": model_name,
+            "generated_at": time.time(),
+            "games_per_target": games,
+            "max_attempts": max_attempts,
+            "targets": targets,
+        }, f, ensure_ascii=False, indent=1)
+
+
+def main():
+    from difficulty import TargetDifficulty
+    from benchmarks.baseline import summarize
+
+    parser = argparse.ArgumentParser(description="Самоигра ботов: сложность загаданных слов")
+    parser.add_argument('--data-dir', default='.', help="папка с word_database.json")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--targets', help="слова через запятую (по умолчанию популярные слова)")
+    parser.add_argument('--games', type=int, default=DEFAULT_GAMES, help="игр на одну цель")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help=f"по умолчанию <data-dir>/{DIFFICULTY_PATH}")
+    args = parser.parse_args()
+
+    with open(os.path.join(args.data_dir, 'word_database.json'), 'r', encoding='utf-8') as f:
+        database = json.load(f)
+    if args.targets:
+        targets = [w.strip() for w in args.targets.split(',') if w.strip()]
+    else:
+        targets = sorted(w for w in get_popular_words() if w in database)
+    targets = [w for w in targets if w in database]
+    del database
+
+    model_path = args.model if os.path.isabs(args.model) else os.path.join(args.data_dir, args.model)
+    records, elapsed = run_simulation(
+        args.data_dir, model_path, targets, args.games, args.workers, args.max_attempts, args.seed
+    )
+
+    stats = summarize_targets(records, args.max_attempts)
+    output = args.output or os.path.join(args.data_dir, DIFFICULTY_PATH)
+    model_name = os.path.splitext(os.path.basename(model_path))[0]
+    save_difficulty(output, model_name, stats, args.games, args.max_attempts)
+
+    latencies = [ns for record in records for ns in record["latencies_ns"]]
+    throughput = summarize(latencies)
+    hardest = sorted(stats.items(), key=lambda item: -item[1]["median_attempts"])[:10]
+    too_hard = TargetDifficulty(stats).stats()["too_hard"]
+
+    print(f"✓ {len(records)} игр, {len(latencies)} попыток за {elapsed:.1f} с "
+          f"({len(latencies) / elapsed:.0f} попыток/с, {args.workers} процессов)")
+    print(f"   make_guess: p50 {throughput['p50_us']} мкс, p99 {throughput['p99_us']} мкс")
+    print(f"   Слишком сложных целей: {too_hard} из {len(stats)}")
+    for target, target_stats in hardest:
+        print(f"   {target:<16} медиана {target_stats['median_attempts']:>6} "
+              f"решено {target_stats['solve_rate']:.0%}")
+    print(f"→ {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Исправление опечаток в отклоненных попытках (в стиле SymSpell)
+
+Для каждого слова словаря заранее перечисляются все удаления до
+MAX_DISTANCE букв из его первых PREFIX_LENGTH символов. Хранится
+отсортированный массив crc32 этих строк и параллельный массив id слов.
+Поиск генерирует удаления для введенного слова (несколько десятков строк),
+находит диапазоны searchsorted и отсеивает кандидатов по длине и
+гистограмме букв (векторно, по массивам индекса). Оставшиеся проверяются
+проверкой расстояния Дамерау–Левенштейна (OSA) за линейное время: сначала
+расстояние 1 и, только если таких слов меньше limit, расстояние 2.
+
+Индекс строится офлайн (load_dictionary.py или `python spelling.py`)
+в папку spelling_index/, на сервере массивы открываются через mmap.
+Если индекса нет или он собран по другому списку слов, сервер строит его
+в фоновом потоке (на полном словаре это десятки секунд) и до готовности
+отвечает без подсказок, не задерживая загрузку базы.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+from zlib import crc32
+
+import numpy as np
+
+from logger import get_logger
+
+logger = get_logger("spelling")
+
+DEFAULT_INDEX_DIR = "spelling_index"
+# within_one / within_two рассчитаны именно на расстояние 2
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 7
+MIN_WORD_LENGTH = 3
+LETTER_BINS = 32
+ARRAY_NAMES = ('hashes', 'ids', 'scores', 'lengths', 'letters')
+DEFAULT_LIMIT = 5
+POPULAR_BONUS = 1000.0
+
+
+def _normalize(word: str) -> str:
+    return word.lower().strip().replace('ё', 'е')
+
+
+def deletes(word: str, max_distance: int = MAX_DISTANCE) -> set:
+    """Само слово и все строки, получаемые удалением до max_distance букв"""
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for item in frontier:
+            if len(item) <= 1:
+                continue
+            for i in range(len(item)):
+                next_frontier.add(item[:i] + item[i + 1:])
+        next_frontier -= result
+        result |= next_frontier
+        frontier = next_frontier
+    return result
+
+
+def _hash(text: str) -> int:
+    return crc32(text.encode('utf-8'))
+
+
+def letter_histogram(word: str) -> np.ndarray:
+    """Счетчики букв по 32 корзинам (а–я ложатся каждая в свою).
+
+    Правка меняет сумму модулей разностей гистограмм не больше чем на 2,
+    так что при расстоянии d она не превосходит 2·d.
+    """
+    histogram = np.zeros(LETTER_BINS, dtype=np.int16)
+    for char in word:
+        histogram[ord(char) & (LETTER_BINS - 1)] += 1
+    return histogram
+
+
+def within_two(a: str, b: str) -> bool:
+    """Расстояние OSA между разными словами не больше 2 (за O(длины)).
+
+    После общего начала первая несовпадающая позиция покрывается одной
+    правкой (замена, удаление, вставка или перестановка соседних букв),
+    а остаток должен быть на расстоянии не больше 1.
+    """
+    if abs(len(a) - len(b)) > 2:
+        return False
+    i = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        i += 1
+    a, b = a[i:], b[i:]
+    rests = [(a[1:], b[1:]), (a[1:], b), (a, b[1:])]
+    if a[1:2] == b[:1] and a[:1] == b[1:2]:
+        rests.append((a[2:], b[2:]))
+    return any(x == y or within_one(x, y) for x, y in rests)
+
+
+def within_one(a: str, b: str) -> bool:
+    """Расстояние OSA между разными словами не больше 1 (за O(длины))"""
+    if len(a) < len(b):
+        a, b = b, a
+    if len(a) - len(b) > 1:
+        return False
+    i = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        i += 1
+    if len(a) != len(b):
+        return a[i + 1:] == b[i:]
+    return a[i + 1:] == b[i + 1:] or (
+        a[i + 1:i + 2] == b[i:i + 1] and a[i:i + 1] == b[i + 1:i + 2] and a[i + 2:] == b[i + 2:]
+    )
+
+
+def words_digest(words) -> str:
+    """Хэш отсортированного списка слов: индекс устарел, если хэши различаются"""
+    digest = hashlib.sha1()
+    for word in words:
+        digest.update(word.encode('utf-8'))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def build_spelling_arrays(word_database: dict, popular=()) -> dict:
+    """Массивы индекса: хэши удалений, id слов, слова и их вес для ранжирования"""
+    words = sorted(word_database)
+    popular = set(popular)
+
+    scores = np.array(
+        [
+            word_database[w].get('frequency', 0) + word_database[w].get('times_guessed', 0)
+            + (POPULAR_BONUS if w in popular else 0.0)
+            if isinstance(word_database[w], dict) else 0.0
+            for w in words
+        ],
+        dtype=np.float32
+    )
+
+    lengths = np.array([min(len(w), 255) for w in words], dtype=np.uint8)
+    letters = np.zeros((len(words), LETTER_BINS), dtype=np.uint8)
+    hashes = []
+    ids = []
+    for word_id, word in enumerate(words):
+        for char in word:
+            letters[word_id, ord(char) & (LETTER_BINS - 1)] += 1
+        for variant in deletes(word[:PREFIX_LENGTH]):
+            hashes.append(_hash(variant))
+            ids.append(word_id)
+
+    # Одно слово может дать один и тот же хэш несколько раз — убираем повторы
+    keys = (np.array(hashes, dtype=np.uint64) << np.uint64(32)) | np.array(ids, dtype=np.uint64)
+    keys = np.unique(keys)
+    return {
+        'hashes': (keys >> np.uint64(32)).astype(np.uint32),
+        'ids': (keys & np.uint64(0xFFFFFFFF)).astype(np.int32),
+        'scores': scores,
+        'lengths': lengths,
+        'letters': letters,
+        'words': words,
+    }
+
+
+def save_spelling_index(arrays: dict, directory: str = DEFAULT_INDEX_DIR):
+    os.makedirs(directory, exist_ok=True)
+    for name in ARRAY_NAMES:
+        np.save(os.path.join(directory, f"{name}.npy"), arrays[name])
+    with open(os.path.join(directory, 'words.txt'), 'w', encoding='utf-8') as f:
+        f.write("\n".join(arrays['words']))
+        f.write("\n")
+
+
+class SpellingIndex:
+    def __init__(self, arrays: dict = None):
+        """Без arrays индекс пустой (ready=False), пока его не заполнит _set_arrays"""
+        self.ready = False
+        self.words = []
+        if arrays is not None:
+            self._set_arrays(arrays)
+
+    def _set_arrays(self, arrays: dict):
+        self.hashes = arrays['hashes']
+        self.ids = arrays['ids']
+        self.scores = arrays['scores']
+        self.lengths = arrays['lengths']
+        self.letters = arrays['letters']
+        self.words = arrays['words']
+        # Флаг последним: suggest читает массивы только после него
+        self.ready = True
+
+    @classmethod
+    def load(cls, directory: str = DEFAULT_INDEX_DIR) -> "SpellingIndex":
+        # view(np.ndarray): срезы обычных массивов дешевле срезов np.memmap
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r').view(np.ndarray)
+            for name in ARRAY_NAMES
+        }
+        with open(os.path.join(directory, 'words.txt'), 'r', encoding='utf-8') as f:
+            arrays['words'] = f.read().split("\n")[:-1]
+        return cls(arrays)
+
+    @classmethod
+    def load_or_build(cls, directory: str, word_database: dict, popular=(),
+                      background: bool = True) -> "SpellingIndex":
+        """Индекс из сборки словаря, либо построенный по загруженной базе.
+
+        При background=True построение идет в потоке: возвращается пустой
+        индекс, который заполнится (и сохранится в directory) по готовности.
+        """
+        words = sorted(word_database)
+        if all(os.path.exists(os.path.join(directory, f"{name}.npy")) for name in ARRAY_NAMES):
+            index = cls.load(directory)
+            if words_digest(index.words) == words_digest(words):
+                return index
+            logger.warning("⚠️ Индекс опечаток собран по другому списку слов, строим заново")
+
+        # Снимок базы: поток не должен видеть ее изменения
+        database = {word: word_database[word] for word in words}
+        if not background:
+            logger.info("🔤 Построение индекса опечаток в памяти...")
+            return cls(build_spelling_arrays(database, popular))
+
+        index = cls()
+        thread = threading.Thread(
+            target=index._build, args=(directory, database, tuple(popular)),
+            name="spelling-index", daemon=True
+        )
+        thread.start()
+        return index
+
+    def _build(self, directory: str, word_database: dict, popular):
+        logger.info("🔤 Построение индекса опечаток в фоне, подсказки появятся по готовности...")
+        try:
+            arrays = build_spelling_arrays(word_database, popular)
+        except Exception as e:
+            logger.error(f"❌ Ошибка построения индекса опечаток: {e}")
+            return
+        self._set_arrays(arrays)
+        logger.info(f"✓ Индекс опечаток готов: {self.stats()}")
+        # Пишем во временную папку и подменяем целиком: другой процесс не
+        # должен открыть наполовину записанный индекс
+        temporary = f"{directory}.tmp{os.getpid()}"
+        try:
+            save_spelling_index(arrays, temporary)
+            if os.path.isdir(directory):
+                shutil.rmtree(directory)
+            os.replace(temporary, directory)
+        except OSError as e:
+            logger.warning(f"⚠️ Не удалось сохранить индекс опечаток: {e}")
+            shutil.rmtree(temporary, ignore_errors=True)
+
+    def suggest(self, word: str, limit: int = DEFAULT_LIMIT) -> list:
+        """До limit слов словаря на расстоянии ≤ MAX_DISTANCE: ближе и популярнее первыми"""
+        if not self.ready:
+            return []
+        word = _normalize(word)
+        if len(word) < MIN_WORD_LENGTH:
+            return []
+
+        queries = np.fromiter(
+            (_hash(variant) for variant in deletes(word[:PREFIX_LENGTH])), dtype=np.uint32
+        )
+        starts = np.searchsorted(self.hashes, queries, side='left')
+        ends = np.searchsorted(self.hashes, queries, side='right')
+
+        ranges = [self.ids[s:e] for s, e in zip(starts.tolist(), ends.tolist()) if e > s]
+        if not ranges:
+            return []
+        candidates = np.unique(np.concatenate(ranges))
+
+        # Векторные фильтры: длина и гистограмма букв
+        candidates = candidates[np.abs(self.lengths[candidates].astype(np.int16) - len(word)) <= MAX_DISTANCE]
+        letter_diff = np.abs(self.letters[candidates].astype(np.int16) - letter_histogram(word)).sum(axis=1)
+        candidates = candidates[letter_diff <= 2 * MAX_DISTANCE]
+        letter_diff = letter_diff[letter_diff <= 2 * MAX_DISTANCE]
+        if not len(candidates):
+            return []
+
+        words = self.words
+        scores = self.scores[candidates].tolist()
+        candidates = candidates.tolist()
+        found = []
+        checked = set()
+        for position in np.flatnonzero(letter_diff <= 2).tolist():
+            candidate = words[candidates[position]]
+            if candidate != word and within_one(word, candidate):
+                found.append((1, -scores[position], candidate))
+                checked.add(position)
+
+        # Слов на расстоянии 1 достаточно — расстояние 2 уже не попадет в ответ
+        if len(found) < limit:
+            for position, candidate_id in enumerate(candidates):
+                candidate = words[candidate_id]
+                if position in checked or candidate == word:
+                    continue
+                if within_two(word, candidate):
+                    found.append((2, -scores[position], candidate))
+
+        found.sort()
+        return [candidate for _, _, candidate in found[:limit]]
+
+    def stats(self) -> dict:
+        if not self.ready:
+            return {"ready": False}
+        return {"ready": True, "words": len(self.words), "entries": int(len(self.hashes))}
+
+
+def main():
+    """Строит spelling_index/ по word_database.json"""
+    from popular_words import get_popular_words
+
+    source = sys.argv[1] if len(sys.argv) > 1 else 'word_database.json'
+    directory = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_INDEX_DIR
+    with open(source, 'r', encoding='utf-8') as f:
+        word_database = json.load(f)
+
+    arrays = build_spelling_arrays(word_database, get_popular_words())
+    save_spelling_index(arrays, directory)
+    print(f"✓ Индекс опечаток: {len(arrays['words'])} слов, {len(arrays['hashes'])} записей → {directory}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Поэтапная инициализация сервера
+
+Тяжелые компоненты (AI данные, словарь, Word2Vec модель) загружаются
+в фоновых потоках уже после того, как сервер начал принимать соединения.
+Каждый этап имеет свой статус, по которому работает /readyz.
+Этап, который завершился, но без части данных (например, без модели),
+помечается как degraded: сервер работает, но /readyz об этом сообщает.
+"""
+
+import asyncio
+import time
+from logger import get_logger
+
+logger = get_logger("startup")
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+DEGRADED = "degraded"
+USABLE = (READY, DEGRADED)
+
+
+class StartupStages:
+    """Статусы этапов загрузки и ожидание готовности"""
+
+    def __init__(self, names):
+        self.stages = {
+            name: {"status": PENDING, "error": None, "seconds": None}
+            for name in names
+        }
+        self._events = {name: asyncio.Event() for name in names}
+        self.started_at = time.monotonic()
+
+    async def run(self, name, func, *args):
+        """Выполняет func в отдельном потоке и записывает результат этапа"""
+        stage = self.stages[name]
+        stage["status"] = LOADING
+        start = time.monotonic()
+        try:
+            result = await asyncio.to_thread(func, *args)
+            stage["status"] = READY
+            return result
+        except Exception as e:
+            stage["status"] = FAILED
+            stage["error"] = str(e)
+            logger.error(f"❌ Этап '{name}' не загрузился: {e}")
+            return None
+        finally:
+            stage["seconds"] = round(time.monotonic() - start, 3)
+            self._events[name].set()
+            logger.info(f"⏱️ Этап '{name}': {stage['status']} за {stage['seconds']} с")
+
+    def degrade(self, name, reason):
+        """Помечает загруженный этап как работающий без части данных"""
+        stage = self.stages[name]
+        if stage["status"] == READY:
+            stage["status"] = DEGRADED
+            stage["error"] = reason
+            logger.warning(f"⚠️ Этап '{name}' работает в деградированном режиме: {reason}")
+
+    def is_ready(self, *names) -> bool:
+        """Готовы ли указанные этапы (по умолчанию все); degraded тоже считается готовым"""
+        names = names or tuple(self.stages)
+        return all(self.stages[n]["status"] in USABLE for n in names)
+
+    def degraded(self) -> list:
+        return [n for n, stage in self.stages.items() if stage["status"] == DEGRADED]
+
+    async def wait_ready(self, *names, timeout: float = 0) -> bool:
+        """Ждет завершения этапов не дольше timeout секунд"""
+        names = names or tuple(self.stages)
+        if self.is_ready(*names):
+            return True
+        if timeout <= 0:
+            return False
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(self._events[n].wait() for n in names)),
+                timeout
+            )
+        except asyncio.TimeoutError:
+            return False
+        return self.is_ready(*names)
+
+    def report(self) -> dict:
+        return {
+            "ready": self.is_ready(),
+            "degraded": self.degraded(),
+            "uptime_seconds": round(time.monotonic() - self.started_at, 3),
+            "stages": self.stages,
+        }
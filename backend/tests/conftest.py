@@ -0,0 +1,11 @@
+"""
+Модули бэкенда лежат плоско в backend/ и импортируются по имени,
+как при запуске сервера из этой папки
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
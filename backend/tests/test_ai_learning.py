@@ -0,0 +1,47 @@
+import pytest
+
+from ai_learning import AILearningSystem
+from memory_report import estimate
+
+
+@pytest.fixture
+def ai_system(tmp_path):
+    system = AILearningSystem(data_file=str(tmp_path / "ai_learning_data.json"))
+    yield system
+    system.close()
+
+
+def learn(ai_system, count):
+    for i in range(count):
+        ai_system.learn_from_guess(f"слово{i}", f"цель{i % 50}", 0.5, i + 1, False)
+    assert ai_system.flush()
+
+
+def test_memory_estimate_grows_with_learned_links(ai_system):
+    empty = estimate(ai_system.learned_data())["bytes"]
+
+    learn(ai_system, 1000)
+    small = estimate(ai_system.learned_data())["bytes"]
+    learn(ai_system, 4000)
+    large = estimate(ai_system.learned_data())["bytes"]
+
+    assert empty < small < large
+    # Снимок из прокси весит столько же, сколько те же данные в обычных словарях
+    plain = {word: dict(links) for word, links in ai_system.word_associations.items()}
+    assert large >= 0.8 * estimate([plain])["bytes"]
+
+
+def test_save_and_load_roundtrip(ai_system, tmp_path):
+    learn(ai_system, 200)
+    ai_system.learn_from_game("цель1", [{"word": "слово1", "similarity": 0.7}], 1, True)
+    assert ai_system.flush()
+    ai_system.save_data()
+
+    loaded = AILearningSystem(data_file=ai_system.data_file)
+    try:
+        assert loaded.word_associations == ai_system.word_associations
+        assert loaded.word_categories == ai_system.word_categories
+        assert loaded.games_played == 1
+        assert loaded.get_learned_similarity("слово1", "цель1") == ai_system.get_learned_similarity("слово1", "цель1")
+    finally:
+        loaded.close()
@@ -0,0 +1,38 @@
+import itertools
+
+import pytest
+
+from association_graph import (
+    CURATED_WEIGHT, HOP2_DECAY, HOP2_MAX_PER_WORD, LEARNED_WEIGHT, AssociationGraph
+)
+
+LEAVES = [f"лист{i}" for i in range(HOP2_MAX_PER_WORD + 40)]
+# Два центра: у листьев больше HOP2_MAX_PER_WORD 2-шаговых соседей, и
+# ограничение оставляет у разных листьев разные подмножества
+CURATED = {"центр": LEAVES, "кошка": ["собака", "мышь"]}
+LEARNED = {"узел": LEAVES[::3]}
+
+
+@pytest.fixture(scope="module")
+def graph():
+    return AssociationGraph.build(CURATED, LEARNED)
+
+
+def test_direct_and_two_hop_strength(graph):
+    assert graph.strength("кошка", "собака") == CURATED_WEIGHT
+    assert graph.strength("лист0", "узел") == pytest.approx(LEARNED_WEIGHT)
+    assert graph.strength("собака", "мышь") == pytest.approx(CURATED_WEIGHT ** 2 * HOP2_DECAY)
+    assert graph.strength("кошка", "лист0") == 0.0
+    assert graph.strength("кошка", "нет такого") == 0.0
+
+
+def test_strength_is_symmetric(graph):
+    for a, b in itertools.combinations(graph.vocab, 2):
+        assert graph.strength(a, b) == graph.strength(b, a), (a, b)
+
+
+def test_two_hop_rows_keep_capped_neighbors(graph):
+    # После симметризации строка не короче ограничения
+    reach = [graph.strength("лист0", leaf) for leaf in LEAVES[1:]]
+    assert sum(1 for s in reach if s) >= HOP2_MAX_PER_WORD
+    assert graph.strength("лист0", "лист3") == pytest.approx(CURATED_WEIGHT * HOP2_DECAY)
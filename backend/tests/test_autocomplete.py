@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from autocomplete import DENSE_RANGE, LENGTH_PENALTY, MAX_LIMIT, POPULAR_BONUS, PrefixIndex
+
+LETTERS = "абвгдекмнопрст"
+POPULAR = ("кот", "мама", "дом")
+
+
+def make_database(count=3000, seed=3):
+    rng = random.Random(seed)
+    words = set(POPULAR)
+    while len(words) < count:
+        words.add("".join(rng.choice(LETTERS) for _ in range(rng.randint(2, 8))))
+    return {
+        word: {"word": word, "frequency": rng.choice([0, 0, 0, 1, 5, 20]), "times_guessed": rng.randint(0, 3)}
+        for word in words
+    }
+
+
+def reference(database, prefix, limit):
+    """Перебор всех слов с тем же порядком, что у PrefixIndex.build"""
+    def weight(word):
+        info = database[word]
+        bonus = POPULAR_BONUS if word in POPULAR else 0.0
+        return info["frequency"] + info["times_guessed"] - LENGTH_PENALTY * len(word) + bonus
+
+    matching = sorted((w for w in database if w.startswith(prefix)), key=lambda w: (-weight(w), w))
+    return matching[:limit]
+
+
+@pytest.fixture(scope="module")
+def database():
+    return make_database()
+
+
+@pytest.fixture(scope="module")
+def index(database):
+    return PrefixIndex.build(database, POPULAR)
+
+
+def test_dense_and_sparse_prefixes_match_brute_force(index, database):
+    prefixes = {word[:n] for word in database for n in (1, 2, 3)}
+    dense = [p for p in prefixes if p in index._top]
+    sparse = [p for p in prefixes if p not in index._top]
+    assert dense and sparse
+
+    for prefix in sorted(prefixes):
+        for limit in (1, 5, MAX_LIMIT):
+            assert index.complete(prefix, limit) == reference(database, prefix, limit), prefix
+
+
+def test_only_large_ranges_are_precomputed(index, database):
+    for prefix in index._top:
+        assert sum(1 for w in database if w.startswith(prefix)) > DENSE_RANGE
+
+
+def test_popular_words_come_first(index):
+    assert index.complete("к", 1) == ["кот"]
+    assert index.complete("ма")[0] == "мама"
+
+
+def test_prefix_normalization_and_limits(index, database):
+    assert index.complete("  КО ") == index.complete("ко")
+    assert index.complete("дё") == index.complete("де")
+    assert index.complete("") == []
+    assert index.complete("яя") == []
+    assert len(index.complete("к", 0)) == 1
+    assert len(index.complete("к", 1000)) == MAX_LIMIT
+
+
+def test_unsorted_database(database):
+    shuffled = list(database.items())
+    random.Random(1).shuffle(shuffled)
+    index = PrefixIndex.build(dict(shuffled), POPULAR)
+    assert index.complete("ко", MAX_LIMIT) == reference(database, "ко", MAX_LIMIT)
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+import broadcast
+from broadcast import MAX_LOBBY_SIZE, MIN_LOBBY_SIZE, BroadcastChannel, ChannelRegistry
+
+
+class FakeManager:
+    """Запоминает рассылки вместо отправки в сокеты"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def broadcast(self, message, client_ids):
+        self.sent.append((message, list(client_ids)))
+        return len(client_ids)
+
+
+class FakeGame:
+    def __init__(self, game_id, players):
+        self.game_id = game_id
+        self.players = players
+
+
+def publish(channel, message, exclude=None):
+    return asyncio.run(channel.publish(message, exclude))
+
+
+def test_publish_reaches_players_and_spectators_once():
+    manager = FakeManager()
+    channel = BroadcastChannel("g1", manager, ["p1", "p2"])
+    channel.add_spectator("s1")
+    channel.add_spectator("s1")
+    # Игрок, подписавшийся как зритель, не получает сообщение дважды
+    channel.add_spectator("p2")
+
+    assert publish(channel, {"type": "guess"}, exclude="p1") == 2
+    message, recipients = manager.sent[0]
+    assert message == {"type": "guess"}
+    assert sorted(recipients) == ["p2", "s1"]
+
+
+def test_publish_without_recipients_skips_manager():
+    manager = FakeManager()
+    channel = BroadcastChannel("g1", manager, ["p1"])
+    assert publish(channel, {"type": "guess"}, exclude="p1") == 0
+    assert manager.sent == []
+
+
+def test_spectator_limit(monkeypatch):
+    monkeypatch.setattr(broadcast, "MAX_SPECTATORS", 2)
+    channel = BroadcastChannel("g1", FakeManager())
+    assert channel.add_spectator("s1")
+    assert channel.add_spectator("s2")
+    assert not channel.add_spectator("s3")
+    assert channel.add_spectator("s2")
+    channel.remove("s1")
+    assert channel.add_spectator("s3")
+
+
+def test_registry_reuses_channels():
+    registry = ChannelRegistry(FakeManager())
+    game = FakeGame("g1", ["p1", "p2"])
+    channel = registry.open(game)
+    assert registry.open(game) is channel
+    assert registry.get("g1") is channel
+    registry.close("g1")
+    assert registry.get("g1") is None
+
+
+@pytest.mark.parametrize("size, expected", [
+    (4, 4),
+    ("3", 3),
+    (1, MIN_LOBBY_SIZE),
+    (100, MAX_LOBBY_SIZE),
+    ("много", MIN_LOBBY_SIZE),
+    (None, MIN_LOBBY_SIZE),
+    (float("inf"), MIN_LOBBY_SIZE),
+])
+def test_lobby_size_is_clamped(size, expected):
+    registry = ChannelRegistry(FakeManager())
+    assert registry.create_lobby("host", size).size == expected
+
+
+def test_lobby_fills_and_closes():
+    registry = ChannelRegistry(FakeManager())
+    lobby = registry.create_lobby("host", 3)
+
+    assert registry.join_lobby(lobby.lobby_id, "p1") is lobby
+    assert registry.join_lobby(lobby.lobby_id, "p1") is lobby
+    assert lobby.players == ["host", "p1"]
+    assert not lobby.is_full
+
+    assert registry.join_lobby(lobby.lobby_id, "p2") is lobby
+    assert lobby.is_full
+    # Заполненное лобби больше не принимает игроков
+    assert lobby.lobby_id not in registry.lobbies
+    assert registry.join_lobby(lobby.lobby_id, "p3") is None
+
+
+@pytest.mark.parametrize("lobby_id", [None, 123, ["abc"], {"id": "abc"}, "missing"])
+def test_join_unknown_lobby(lobby_id):
+    registry = ChannelRegistry(FakeManager())
+    registry.create_lobby("host", 2)
+    assert registry.join_lobby(lobby_id, "p1") is None
+
+
+def test_player_waits_in_one_lobby():
+    registry = ChannelRegistry(FakeManager())
+    first = registry.create_lobby("a", 4)
+    second = registry.create_lobby("b", 4)
+    registry.join_lobby(first.lobby_id, "p1")
+    registry.join_lobby(second.lobby_id, "p1")
+    assert first.players == ["a"]
+    assert second.players == ["b", "p1"]
+
+    # Новое лобби хоста закрывает его прежнее пустое лобби
+    registry.create_lobby("a", 2)
+    assert first.lobby_id not in registry.lobbies
+
+
+def test_drop_client():
+    registry = ChannelRegistry(FakeManager())
+    channel = registry.open(FakeGame("g1", ["p1", "p2"]))
+    channel.add_spectator("s1")
+    lobby = registry.create_lobby("s1", 3)
+    registry.join_lobby(lobby.lobby_id, "p3")
+
+    changed = registry.drop_client("s1")
+    assert changed == [lobby]
+    assert lobby.players == ["p3"]
+    assert "s1" not in channel.spectators
+    assert registry.stats() == {"channels": 1, "spectators": 0, "lobbies": 1}
+
+    assert registry.drop_client("p3") == []
+    assert registry.stats()["lobbies"] == 0
@@ -0,0 +1,161 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import WebSocketDisconnect
+
+import connection_manager
+from connection_manager import CLOSE_POLICY, ConnectionManager, TokenBucket
+
+
+class FakeWebSocket:
+    """Сокет в памяти; answer_pings=True — клиент отвечает pong, как App.jsx"""
+
+    def __init__(self, answer_pings=True, host="127.0.0.1"):
+        self.answer_pings = answer_pings
+        self.client = SimpleNamespace(host=host)
+        self.headers = {}
+        self.incoming = asyncio.Queue()
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+        if self.answer_pings and self.sent[-1].get("type") == "ping":
+            self.incoming.put_nowait(json.dumps({"action": "pong"}))
+
+    async def receive_text(self):
+        return await self.incoming.get()
+
+    def pings(self):
+        return sum(1 for message in self.sent if message.get("type") == "ping")
+
+
+@pytest.fixture
+def fast_heartbeat(monkeypatch):
+    monkeypatch.setattr(connection_manager, "HEARTBEAT_INTERVAL", 0.3)
+    monkeypatch.setattr(connection_manager, "HEARTBEAT_TIMEOUT", 0.9)
+
+
+async def serve(manager, websocket, client_id, seconds, outbound_every=None):
+    """Цикл приема, как в main.websocket_endpoint, плюс поток сообщений клиенту"""
+    connection = await manager.connect(websocket, client_id)
+
+    async def receive_loop():
+        try:
+            while True:
+                await manager.receive(connection)
+        except WebSocketDisconnect:
+            pass
+
+    receiver = asyncio.create_task(receive_loop())
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + seconds
+    while loop.time() < deadline and not receiver.done():
+        if outbound_every:
+            await manager.send_personal_message({"type": "guess_result"}, client_id)
+        await asyncio.sleep(outbound_every or 0.05)
+    alive = manager.is_connected(client_id)
+    receiver.cancel()
+    manager.disconnect(connection)
+    return alive
+
+
+def test_busy_outbound_connection_is_pinged_and_survives(fast_heartbeat):
+    manager = ConnectionManager()
+    websocket = FakeWebSocket()
+    assert asyncio.run(serve(manager, websocket, "spectator", 2.0, outbound_every=0.1))
+    assert websocket.pings() >= 3
+    assert sum(1 for m in websocket.sent if m["type"] == "guess_result") >= 10
+
+
+def test_idle_connection_that_answers_survives(fast_heartbeat):
+    manager = ConnectionManager()
+    websocket = FakeWebSocket()
+    assert asyncio.run(serve(manager, websocket, "idle", 1.5))
+    assert websocket.pings() >= 3
+
+
+def test_silent_client_is_disconnected(fast_heartbeat):
+    manager = ConnectionManager()
+    websocket = FakeWebSocket(answer_pings=False)
+    assert not asyncio.run(serve(manager, websocket, "silent", 1.5, outbound_every=0.1))
+    # Пинги шли, пока соединение не закрыли по HEARTBEAT_TIMEOUT
+    assert websocket.pings() >= 2
+
+
+def test_token_bucket_refills():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.consume() and bucket.consume()
+    assert not bucket.consume()
+    assert 0 < bucket.retry_after() <= 0.1
+    bucket.updated -= 0.1
+    assert bucket.consume()
+
+
+async def flood(manager, websocket, frames, burst):
+    connection = await manager.connect(websocket, "flooder")
+    connection.bucket = TokenBucket(rate=0.01, capacity=burst)
+    results = [manager.allow(connection, "guess") for _ in range(frames)]
+    await asyncio.sleep(0.05)
+    return connection, results
+
+
+def test_every_rejected_frame_gets_rate_limited_reply():
+    manager = ConnectionManager()
+    websocket = FakeWebSocket()
+    connection, results = asyncio.run(flood(manager, websocket, 6, burst=3))
+
+    assert results == [True, True, True, False, False, False]
+    errors = [m for m in websocket.sent if m.get("error") == "rate_limited"]
+    assert len(errors) == 3
+    assert all(m["action"] == "guess" and m["retry_after"] > 0 for m in errors)
+    assert connection.rate_limited == 3
+
+
+def test_pong_is_free():
+    manager = ConnectionManager()
+
+    async def run():
+        connection = await manager.connect(FakeWebSocket(), "client")
+        connection.bucket = TokenBucket(rate=0.01, capacity=1)
+        return [manager.allow(connection, "pong") for _ in range(10)]
+
+    assert all(asyncio.run(run()))
+
+
+def test_sustained_flood_closes_connection(monkeypatch):
+    monkeypatch.setattr(connection_manager, "MAX_LIMITED_STREAK", 5)
+    manager = ConnectionManager()
+    websocket = FakeWebSocket()
+    connection, _ = asyncio.run(flood(manager, websocket, 10, burst=1))
+
+    assert connection.closed
+    assert not manager.is_connected("flooder")
+    assert websocket.closed_with == CLOSE_POLICY
+
+
+def test_reconnect_replaces_previous_socket():
+    manager = ConnectionManager()
+    closed = []
+    manager.on_close(lambda client_id, websocket: closed.append(websocket))
+
+    async def run():
+        first = FakeWebSocket()
+        await manager.connect(first, "player")
+        second = FakeWebSocket()
+        await manager.connect(second, "player")
+        await asyncio.sleep(0.01)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert closed == [first]
+    assert first.closed_with == connection_manager.CLOSE_REPLACED
+    assert manager.active_connections["player"].websocket is second
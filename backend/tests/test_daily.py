@@ -0,0 +1,79 @@
+from datetime import date, timedelta
+
+import pytest
+
+import daily
+from daily import DailyPuzzleManager
+from popular_words import get_popular_words
+
+
+class FakeEngine:
+    """Движок с похожестью по длине общего префикса"""
+
+    model_name = "fake"
+
+    def __init__(self):
+        self.word_database = {w: i for i, w in enumerate(list(get_popular_words())[:50])}
+        self.rank_calls = 0
+
+    def get_similarity(self, word, target):
+        common = 0
+        for a, b in zip(word, target):
+            if a != b:
+                break
+            common += 1
+        return common / max(len(word), len(target))
+
+    def get_rank(self, word, target):
+        self.rank_calls += 1
+        return 0 if word == target else len(word)
+
+    def get_synonyms(self, word, top_n=10):
+        return [(w, 0.5) for w in list(self.word_database)[:top_n] if w != word]
+
+    def scoring_fingerprint(self):
+        return "fake"
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(daily, "DAILY_CACHE_DIR", str(tmp_path))
+
+
+DAY = date(2026, 3, 14)
+
+
+def test_prepared_puzzle_becomes_current_at_rollover():
+    engine = FakeEngine()
+    manager = DailyPuzzleManager(engine)
+    today = manager.get(DAY)
+
+    tomorrow = manager.prepare(DAY + timedelta(days=1))
+    assert manager.get(DAY) is today
+    assert manager.peek(DAY + timedelta(days=1)) is None
+    assert len(manager.caches()) == 2
+
+    # Таблица посчитана заранее: в полночь get только подменяет головоломку
+    warmed = engine.rank_calls
+    assert warmed > 0
+    assert manager.get(DAY + timedelta(days=1)) is tomorrow
+    assert manager.peek(DAY + timedelta(days=1)) is tomorrow
+    tomorrow.score(next(iter(tomorrow._scores)))
+    assert engine.rank_calls == warmed
+    assert len(manager.caches()) == 1
+
+
+def test_get_builds_unprepared_day():
+    manager = DailyPuzzleManager(FakeEngine())
+    manager.prepare(DAY + timedelta(days=1))
+    puzzle = manager.get(DAY + timedelta(days=2))
+    assert puzzle.date == DAY + timedelta(days=2)
+    assert manager.peek(DAY + timedelta(days=2)) is puzzle
+
+
+def test_prepare_for_past_day_is_not_kept():
+    manager = DailyPuzzleManager(FakeEngine())
+    manager.get(DAY)
+    manager.prepare(DAY - timedelta(days=1))
+    assert len(manager.caches()) == 1
+    assert manager.get(DAY).date == DAY
@@ -0,0 +1,66 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import difficulty
+from difficulty import TargetDifficulty
+from game_logic import GameMode, GameSession
+from popular_words import get_popular_words
+
+TARGETS = {
+    "кошка": {"median_attempts": 20, "solve_rate": 1.0},
+    "собака": {"median_attempts": 200, "solve_rate": 0.9},
+    "дом": {"median_attempts": 30, "solve_rate": 0.2},
+}
+
+
+@pytest.fixture(autouse=True)
+def thresholds(monkeypatch):
+    monkeypatch.setattr(difficulty, "MAX_MEDIAN_ATTEMPTS", 80)
+    monkeypatch.setattr(difficulty, "MIN_SOLVE_RATE", 0.5)
+
+
+def test_too_hard_targets_are_filtered():
+    stats = TargetDifficulty(TARGETS, "model")
+    assert not stats.is_too_hard("кошка")
+    assert stats.is_too_hard("собака")
+    assert stats.is_too_hard("дом")
+    # Слова без статистики остаются в игре
+    assert not stats.is_too_hard("лес")
+    assert stats.playable(["кошка", "собака", "дом", "лес"]) == ["кошка", "лес"]
+    assert stats.stats() == {"model": "model", "targets": 3, "too_hard": 2}
+
+
+def test_all_hard_candidates_are_kept():
+    stats = TargetDifficulty(TARGETS)
+    assert stats.playable(["собака", "дом"]) == ["собака", "дом"]
+
+
+def test_load_checks_model(tmp_path):
+    path = tmp_path / difficulty.DIFFICULTY_PATH
+    path.write_text(json.dumps({"model": "a", "targets": TARGETS}), encoding="utf-8")
+
+    loaded = TargetDifficulty.load(str(path), "a")
+    assert loaded.get("кошка") == TARGETS["кошка"]
+    assert TargetDifficulty.load(str(path), "b") is None
+    assert TargetDifficulty.load(str(tmp_path / "missing.json"), "a") is None
+
+    path.write_text("{битый", encoding="utf-8")
+    assert TargetDifficulty.load(str(path), "a") is None
+
+
+def test_new_games_skip_hard_targets():
+    popular = list(get_popular_words())
+    playable = popular[0]
+    engine = SimpleNamespace(
+        word_database={w: {} for w in popular},
+        target_difficulty=TargetDifficulty({
+            w: {"median_attempts": 500, "solve_rate": 0.0} for w in popular[1:]
+        }),
+    )
+    targets = {
+        GameSession(f"g{i}", GameMode.SOLO, engine).target_word
+        for i in range(20)
+    }
+    assert targets == {playable}
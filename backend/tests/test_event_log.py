@@ -0,0 +1,146 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import event_log
+from event_log import UNKNOWN_WORD, EventLog, EventSegment, list_segments, read_segments, summarize
+
+WORD_IDS = {"кошка": 1, "собака": 2, "мышь": 3}
+
+
+def write_log(directory, guesses):
+    log = EventLog(str(directory), word_id=WORD_IDS.get)
+    for game_id, player, word, rank, similarity, attempt in guesses:
+        log.log_guess(game_id, player, "кошка", "solo", word, rank, similarity, attempt)
+    log.close()
+    return log
+
+
+GUESSES = [
+    ("g1", "p1", "собака", 12, 0.61, 1),
+    ("g1", "p1", "мышь", 40, 0.42, 2),
+    ("g1", "p1", "кошка", 0, 1.0, 3),
+    ("g2", "p2", "ёжик", 900, 0.1, 1),
+]
+
+
+def test_segment_round_trip(tmp_path):
+    log = write_log(tmp_path, GUESSES)
+    assert log.logged == len(GUESSES)
+
+    segments = list(read_segments(str(tmp_path)))
+    assert len(segments) == 1
+    segment = segments[0]
+    assert len(segment) == len(GUESSES)
+    assert segment["word"].tolist() == [2, 3, 1, UNKNOWN_WORD]
+    assert segment["rank"].tolist() == [12, 40, 0, 900]
+    assert segment["attempt"].tolist() == [1, 2, 3, 1]
+    assert segment["similarity"].tolist() == pytest.approx([0.61, 0.42, 1.0, 0.1], abs=1e-3)
+    assert segment["game"].tolist() == [0, 0, 0, 1]
+    assert [game["game_id"] for game in segment.games] == ["g1", "g2"]
+    assert segment.games[0]["target_id"] == 1
+
+    timestamps = segment.timestamps()
+    assert np.all(np.diff(timestamps) >= 0)
+    assert timestamps[0] >= segment.started
+
+
+def test_mmap_and_read_into_memory_agree(tmp_path):
+    write_log(tmp_path, GUESSES)
+    path = list_segments(str(tmp_path))[0]
+    mapped = EventSegment(path)
+    loaded = EventSegment(path, mmap=False)
+    for column in event_log.COLUMNS:
+        assert mapped[column].tolist() == loaded[column].tolist()
+
+
+def test_partially_written_segment(tmp_path):
+    write_log(tmp_path, GUESSES)
+    path = list_segments(str(tmp_path))[0]
+
+    # Запись оборвалась: одна колонка дописана целиком, другая наполовину,
+    # строка новой игры без перевода строки
+    with open(os.path.join(path, "time.bin"), "ab") as f:
+        f.write(np.array([5], dtype=event_log.COLUMNS["time"]).tobytes())
+    with open(os.path.join(path, "rank.bin"), "ab") as f:
+        f.write(b"\x01\x02")
+    with open(os.path.join(path, "games.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps({"game_id": "g3"}))
+
+    segment = EventSegment(path)
+    assert len(segment) == len(GUESSES)
+    assert all(len(segment[column]) == len(GUESSES) for column in event_log.COLUMNS)
+    assert [game["game_id"] for game in segment.games] == ["g1", "g2"]
+
+
+def test_empty_segment(tmp_path):
+    write_log(tmp_path, [])
+    assert list_segments(str(tmp_path)) == []
+
+    log = EventLog(str(tmp_path))
+    log.log_guess("g1", "p1", "кошка", "solo", "собака", 5, 0.5, 1)
+    log.flush()
+    log.close()
+    path = list_segments(str(tmp_path))[0]
+    for column in event_log.COLUMNS:
+        open(os.path.join(path, f"{column}.bin"), "wb").close()
+    segment = EventSegment(path)
+    assert len(segment) == 0
+    assert segment["rank"].dtype == event_log.COLUMNS["rank"]
+
+
+def test_segments_rotate_and_filter_by_time(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_log, "SEGMENT_EVENTS", 2)
+    # Поток записи не просыпается сам: пачки пишутся вызовом _drain в тесте
+    monkeypatch.setattr(event_log, "FLUSH_INTERVAL", 3600)
+    log = EventLog(str(tmp_path), word_id=WORD_IDS.get)
+    for game_id, player, word, rank, similarity, attempt in GUESSES:
+        log.log_guess(game_id, player, "кошка", "solo", word, rank, similarity, attempt)
+        log._drain()
+    log.close()
+
+    paths = list_segments(str(tmp_path))
+    assert len(paths) == 2
+    segments = list(read_segments(str(tmp_path)))
+    assert [len(s) for s in segments] == [2, 2]
+    # Игры нумеруются заново в каждом сегменте
+    assert [game["game_id"] for game in segments[1].games] == ["g1", "g2"]
+
+    first, second = segments[0].started, segments[1].started
+    assert [s.path for s in read_segments(str(tmp_path), since=second)] == [paths[1]]
+    assert [s.path for s in read_segments(str(tmp_path), since=first)] == paths
+    assert [s.path for s in read_segments(str(tmp_path), until=(first + second) / 2)] == [paths[0]]
+
+
+def test_expired_segments_are_removed(tmp_path):
+    old = tmp_path / "20000101-000000"
+    old.mkdir()
+    (old / "meta.json").write_text(json.dumps({"started": 946684800.0, "columns": {}}))
+    write_log(tmp_path, GUESSES[:1])
+
+    paths = list_segments(str(tmp_path))
+    assert len(paths) == 1
+    assert not old.exists()
+
+
+def test_summarize(tmp_path):
+    write_log(tmp_path, GUESSES)
+    summary = summarize(str(tmp_path))
+    assert summary["events"] == 4
+    assert summary["sessions"] == 2
+    assert summary["solved"] == 1
+    assert summary["median_attempts_to_solve"] == 3
+    assert summary["median_first_rank"] == (12 + 900) / 2
+    assert UNKNOWN_WORD not in summary["top_word_ids"]
+    assert set(summary["top_word_ids"]) == {1, 2, 3}
+
+
+def test_full_queue_drops_events(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_log, "MAX_PENDING", 2)
+    log = EventLog(str(tmp_path))
+    log.close()
+    for _ in range(3):
+        log.log_guess("g1", "p1", "кошка", "solo", "собака", 5, 0.5, 1)
+    assert log.dropped == 1
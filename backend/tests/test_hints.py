@@ -0,0 +1,42 @@
+from hints import HintEngine
+
+NEIGHBORS = [(f"сосед{i}", 0.9 - i * 0.005) for i in range(100)]
+RANKS = {word: 3 * i + 7 for i, (word, _) in enumerate(NEIGHBORS)}
+
+
+class FakeAI:
+    def get_best_associations(self, word, top_n=10):
+        return [("выученное", 0.9)]
+
+
+class FakeEngine:
+    """Ранг соседа отличается от его позиции в списке, как у настоящего get_rank"""
+
+    def __init__(self, ai_system=None):
+        self.ai_system = ai_system
+
+    def normalize_word(self, word):
+        return word.lower().strip()
+
+    def get_synonyms(self, word, top_n=10):
+        return NEIGHBORS[:top_n]
+
+    def get_rank(self, word, target):
+        return RANKS.get(word, 150)
+
+
+def test_hint_reports_rank_the_guess_would_get():
+    hints = HintEngine(FakeEngine())
+    hints.prepare("цель")
+    hint = hints.get_hint("цель", "medium")
+    assert hint["available"]
+    assert hint["word"] == "сосед10"
+    assert hint["rank"] == RANKS["сосед10"]
+
+
+def test_learned_hint_has_rank():
+    hints = HintEngine(FakeEngine(FakeAI()))
+    hints.prepare("цель")
+    hint = hints.get_hint("цель", "close", exclude=[w for w, _ in NEIGHBORS])
+    assert hint["word"] == "выученное"
+    assert hint["rank"] == 150
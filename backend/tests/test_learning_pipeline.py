@@ -0,0 +1,158 @@
+import pytest
+
+from learning_pipeline import (
+    GAME, GUESS, PRUNE, REVERSE_WEIGHT, SAVE_EVERY_GAMES, LearningPipeline, learned_strength
+)
+
+
+class FakeAI:
+    """Поля AILearningSystem, которые меняет агрегатор"""
+
+    def __init__(self):
+        self.games_played = 0
+        self.total_guesses = 0
+        self.successful_paths = []
+        self.saves = 0
+
+    def save_data(self):
+        self.saves += 1
+
+
+@pytest.fixture
+def pipeline():
+    # Агрегатор не просыпается сам: пачки применяются вызовом _drain в тесте
+    pipeline = LearningPipeline(FakeAI(), interval=3600)
+    yield pipeline
+    pipeline.close()
+
+
+def guess(word, target, rank=100, is_correct=False):
+    return (GUESS, word, target, rank, is_correct)
+
+
+def game(target, guesses, related, won=True):
+    return (GAME, target, guesses, related, len(guesses), won, "2026-01-01T00:00:00")
+
+
+def test_guesses_on_one_pair_are_coalesced(pipeline):
+    for rank in (500, 50, 5):
+        pipeline.submit(guess("собака", "кошка", rank))
+    pipeline.submit(guess("мышь", "кошка", 10))
+    pipeline._drain()
+
+    expected = 0.0
+    for rank in (500, 50, 5):
+        expected = learned_strength(expected, rank, False)
+
+    snapshot = pipeline.snapshot
+    assert snapshot.version == 1
+    assert snapshot.associations["кошка"]["собака"] == pytest.approx(expected)
+    assert snapshot.associations["собака"]["кошка"] == pytest.approx(expected * REVERSE_WEIGHT)
+    assert set(snapshot.associations["кошка"]) == {"собака", "мышь"}
+    assert pipeline.coalesced == 2
+    assert pipeline.batches == 1
+    assert pipeline.ai_system.total_guesses == 4
+
+
+def test_snapshot_is_copy_on_write(pipeline):
+    pipeline.submit(guess("собака", "кошка"))
+    pipeline.submit(guess("лист", "дерево"))
+    pipeline._drain()
+    before = pipeline.snapshot
+
+    pipeline.submit(guess("мышь", "кошка"))
+    pipeline._drain()
+    after = pipeline.snapshot
+
+    assert after.version == before.version + 1
+    # Прошлый снимок не меняется, незатронутые слова переходят как есть
+    assert "мышь" not in before.associations["кошка"]
+    assert "мышь" in after.associations["кошка"]
+    assert after.associations["дерево"] is before.associations["дерево"]
+    with pytest.raises(TypeError):
+        after.associations["кошка"]["мышь"] = 1.0
+
+
+def test_correct_guess_sets_full_strength(pipeline):
+    pipeline.submit(guess("собака", "кошка"))
+    pipeline.submit(guess("собака", "кошка", 0, True))
+    pipeline._drain()
+    assert pipeline.snapshot.associations["кошка"]["собака"] == 1.0
+
+
+def test_empty_batch_publishes_nothing(pipeline):
+    pipeline._drain()
+    pipeline.submit((PRUNE, 1.0))
+    pipeline._drain()
+    assert pipeline.snapshot.version == 1
+    assert pipeline.snapshot.link_count() == 0
+
+
+def test_prune_keeps_strongest_links(pipeline):
+    for rank in range(1, 21):
+        pipeline.submit(guess(f"слово{rank}", "цель", rank))
+    pipeline._drain()
+    total = pipeline.snapshot.link_count()
+    strongest = pipeline.snapshot.associations["цель"]["слово1"]
+
+    # Из нескольких запросов применяется самый строгий
+    pipeline.submit((PRUNE, 0.5))
+    pipeline.submit((PRUNE, 0.25))
+    pipeline._drain()
+
+    snapshot = pipeline.snapshot
+    assert snapshot.link_count() <= total // 4 + 1
+    assert snapshot.associations["цель"]["слово1"] == strongest
+    assert all(links for links in snapshot.associations.values())
+
+
+def test_prune_to_zero_removes_everything(pipeline):
+    pipeline.submit(guess("собака", "кошка"))
+    pipeline.submit((PRUNE, 0.0))
+    pipeline._drain()
+    assert dict(pipeline.snapshot.associations) == {}
+
+
+def test_games_build_categories(pipeline):
+    pipeline.submit(game("кошка", ["собака", "мышь"], ["собака"]))
+    pipeline.submit(game("кошка", ["хвост"], ["хвост"]))
+    pipeline.submit(game("дерево", ["лист"], ["лист"], won=False))
+    pipeline._drain()
+
+    snapshot = pipeline.snapshot
+    assert snapshot.categories["кошка"] == {"кошка", "собака", "хвост"}
+    assert "дерево" not in snapshot.categories
+    assert snapshot.categories_by_word["хвост"] == {"кошка"}
+    assert len(pipeline.ai_system.successful_paths) == 2
+    assert pipeline.ai_system.games_played == 3
+
+
+def test_saves_every_few_games(pipeline):
+    for i in range(SAVE_EVERY_GAMES - 1):
+        pipeline.submit(game(f"цель{i}", [], []))
+    pipeline._drain()
+    assert pipeline.ai_system.saves == 0
+
+    pipeline.submit(game("цель", [], []))
+    pipeline._drain()
+    assert pipeline.ai_system.saves == 1
+
+
+def test_full_queue_drops_events():
+    pipeline = LearningPipeline(FakeAI(), interval=3600, max_pending=3)
+    try:
+        results = [pipeline.submit(guess(f"слово{i}", "цель")) for i in range(5)]
+        assert results == [True, True, True, False, False]
+        assert pipeline.dropped == 2
+    finally:
+        pipeline.close()
+
+
+def test_flush_waits_for_aggregator():
+    pipeline = LearningPipeline(FakeAI(), interval=0.01)
+    try:
+        pipeline.submit(guess("собака", "кошка"))
+        assert pipeline.flush()
+        assert "собака" in pipeline.snapshot.associations["кошка"]
+    finally:
+        pipeline.close()
@@ -0,0 +1,137 @@
+from collections import OrderedDict
+from types import MappingProxyType
+
+import numpy as np
+import pytest
+
+from memory_report import (
+    LOW_WATERMARK, MemoryAccountant, estimate, fraction_to_keep, parse_budgets, parse_size,
+    shrink_mapping
+)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("64MB", 64 * 1024 ** 2),
+    ("64mb", 64 * 1024 ** 2),
+    (" 1.5KB ", 1536),
+    ("2GB", 2 * 1024 ** 3),
+    ("512B", 512),
+    ("1000", 1000),
+    (4096, 4096),
+    (1.5, 1),
+])
+def test_parse_size(text, expected):
+    assert parse_size(text) == expected
+
+
+@pytest.mark.parametrize("text", ["64TB", "MB", "много", "1.2.3KB"])
+def test_parse_size_rejects_garbage(text):
+    with pytest.raises(ValueError):
+        parse_size(text)
+
+
+def test_parse_budgets():
+    assert parse_budgets("synonyms_cache=64MB, ai = 1GB,,broken") == {
+        "synonyms_cache": 64 * 1024 ** 2,
+        "ai": 1024 ** 3,
+    }
+    assert parse_budgets("") == {}
+    assert parse_budgets(None) == {}
+    with pytest.raises(ValueError):
+        parse_budgets("ai=lots")
+
+
+def test_estimate_counts_shared_objects_once():
+    shared = ["слово" * 100 for _ in range(50)]
+    single = estimate([shared])["bytes"]
+    assert estimate([shared, shared, {"a": shared}])["bytes"] < 1.2 * single
+
+
+def test_estimate_scales_sampled_containers():
+    data = {f"слово{i}": [i] * 10 for i in range(5000)}
+    full = estimate([data], sample=len(data))["bytes"]
+    sampled = estimate([data], sample=100)["bytes"]
+    assert sampled == pytest.approx(full, rel=0.1)
+
+
+def test_estimate_sees_through_mapping_proxy():
+    data = {f"слово{i}": {"связь": 0.5} for i in range(1000)}
+    proxied = MappingProxyType({k: MappingProxyType(v) for k, v in data.items()})
+    assert estimate([proxied])["bytes"] >= 0.9 * estimate([data])["bytes"]
+
+
+def test_estimate_separates_mapped_arrays(tmp_path):
+    path = tmp_path / "array.npy"
+    np.save(path, np.zeros(100_000, dtype=np.float32))
+    mapped = np.load(path, mmap_mode="r")
+    owned = np.zeros(100_000, dtype=np.float32)
+
+    result = estimate([mapped, owned])
+    assert result["mapped"] == mapped.nbytes
+    assert owned.nbytes <= result["bytes"] < owned.nbytes + 10_000
+
+
+def test_fraction_to_keep():
+    assert fraction_to_keep(0, 100) == 1.0
+    assert fraction_to_keep(50, 100) == 1.0
+    assert fraction_to_keep(200, 100) == pytest.approx(LOW_WATERMARK / 2)
+    assert fraction_to_keep(100, 0) == 0.0
+
+
+def test_shrink_mapping_removes_oldest_entries():
+    cache = OrderedDict((i, i) for i in range(100))
+    removed = shrink_mapping(cache, current=200, budget=100)
+    assert removed == 100 - int(100 * LOW_WATERMARK / 2)
+    assert len(cache) == 100 - removed
+    assert next(iter(cache)) == removed
+    assert shrink_mapping(cache, current=10, budget=100) == 0
+
+
+def make_accountant(cache):
+    accountant = MemoryAccountant()
+    accountant.register(
+        "cache", lambda: [cache],
+        lambda current, budget: shrink_mapping(cache, current, budget),
+        "тестовый кэш"
+    )
+    accountant.register("fixed", lambda: [list(range(100))])
+    return accountant
+
+
+def test_enforce_evicts_until_within_budget():
+    cache = OrderedDict((f"ключ{i}", f"значение{i}" * 20) for i in range(2000))
+    accountant = make_accountant(cache)
+    size = accountant.measure("cache")["bytes"]
+
+    accountant.set_budget("cache", size // 4)
+    accountant.set_budget("fixed", 1)
+    evicted = accountant.enforce()
+
+    assert set(evicted) == {"cache"}
+    assert accountant.measure("cache")["bytes"] <= size // 4
+    assert accountant.evicted["cache"] == evicted["cache"] == 2000 - len(cache)
+
+    report = accountant.report()
+    assert report["components"]["cache"]["over_budget"] is False
+    assert report["components"]["fixed"]["over_budget"] is True
+    assert report["components"]["fixed"]["evictable"] is False
+    assert accountant.enforce() == {}
+
+
+def test_set_budget():
+    accountant = make_accountant({})
+    accountant.set_budget("cache", "1KB")
+    assert accountant.budgets == {"cache": 1024}
+    accountant.set_budget("cache", None)
+    assert accountant.budgets == {}
+    with pytest.raises(KeyError):
+        accountant.set_budget("missing", "1KB")
+
+
+def test_failing_evict_is_contained():
+    def evict(current, budget):
+        raise RuntimeError("boom")
+
+    accountant = MemoryAccountant({"broken": 1})
+    accountant.register("broken", lambda: [list(range(1000))], evict)
+    assert accountant.enforce() == {}
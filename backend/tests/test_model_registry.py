@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+
+from model_registry import ModelRegistry
+
+
+class FakeEngine:
+    """Движок без модели в памяти; with_model может ждать сигнала, как долгая загрузка"""
+
+    def __init__(self, model_path="base.bin", gate=None, fail=False):
+        self.model_path = model_path
+        self.model_name = model_path.rsplit("/", 1)[-1]
+        self.model = None if fail else object()
+        self.gate = gate
+        self.ai_system = None
+        self.association_graph = None
+        self.unloaded = False
+
+    def with_model(self, model_path):
+        if self.gate is not None:
+            self.gate.wait(5)
+        return FakeEngine(model_path, fail="broken" in model_path)
+
+    def unload_model(self):
+        self.unloaded = True
+
+
+@pytest.fixture
+def model_files(tmp_path):
+    paths = {}
+    for name in ("first.bin", "second.bin", "broken.bin"):
+        path = tmp_path / name
+        path.write_bytes(b"")
+        paths[name] = str(path)
+    return paths
+
+
+def test_second_swap_is_rejected_while_first_loads(model_files):
+    gate = threading.Event()
+    registry = ModelRegistry(FakeEngine(gate=gate))
+    results = {}
+
+    def swap(name):
+        try:
+            results[name] = registry.load(model_files[name]).engine.model_path
+        except RuntimeError as e:
+            results[name] = e
+
+    first = threading.Thread(target=swap, args=("first.bin",))
+    first.start()
+    while registry.stats()["loading"] is None:
+        time.sleep(0.01)
+
+    second = threading.Thread(target=swap, args=("second.bin",))
+    second.start()
+    second.join(5)
+    assert isinstance(results["second.bin"], RuntimeError)
+    assert registry.stats()["loading"] == model_files["first.bin"]
+
+    gate.set()
+    first.join(5)
+    assert results["first.bin"] == model_files["first.bin"]
+    stats = registry.stats()
+    assert stats["loading"] is None
+    assert stats["current"] == registry.current.version
+    assert registry.current.engine.model_path == model_files["first.bin"]
+
+    # После смены версии следующая замена снова разрешена
+    assert registry.load(model_files["second.bin"]).engine.model_path == model_files["second.bin"]
+
+
+def test_reserve_then_load(model_files):
+    registry = ModelRegistry(FakeEngine())
+    registry.reserve(model_files["first.bin"])
+    with pytest.raises(RuntimeError):
+        registry.reserve(model_files["second.bin"])
+    registry.load(model_files["first.bin"], reserved=True)
+    assert registry.loading is None
+    with pytest.raises(FileNotFoundError):
+        registry.reserve(model_files["first.bin"] + ".missing")
+    assert registry.loading is None
+
+
+def test_failed_load_records_error(model_files):
+    registry = ModelRegistry(FakeEngine())
+    base = registry.current
+    with pytest.raises(RuntimeError):
+        registry.load(model_files["broken.bin"])
+    stats = registry.stats()
+    assert stats["loading"] is None
+    assert "broken.bin" in stats["last_error"]
+    assert registry.current is base
+
+    registry.load(model_files["first.bin"])
+    assert registry.last_error is None
+
+
+def test_old_version_is_unloaded_after_last_game(model_files):
+    registry = ModelRegistry(FakeEngine())
+    old = registry.acquire("g1")
+    assert registry.acquire("g2") is old
+
+    new = registry.load(model_files["first.bin"])
+    assert registry.acquire("g3") is new
+    assert registry.version_of("g1") is old
+    assert set(registry.versions) == {old.version, new.version}
+
+    registry.release("g1")
+    assert not old.engine.unloaded
+    assert old.version in registry.versions
+
+    registry.release("g2")
+    assert old.engine.unloaded
+    assert set(registry.versions) == {new.version}
+
+    # Текущая версия не выгружается, даже когда на ней не осталось игр
+    registry.release("g3")
+    assert not new.engine.unloaded
+    registry.release("g3")
+
+
+def test_swap_without_games_unloads_previous_at_once(model_files):
+    registry = ModelRegistry(FakeEngine())
+    old = registry.current
+    registry.load(model_files["first.bin"])
+    assert old.engine.unloaded
+    assert list(registry.versions) == [registry.current.version]
@@ -0,0 +1,84 @@
+import pytest
+
+from morphology import MIN_SUPPORT, LemmaIndex, build_lemma_index, save_lemma_index
+
+# Словарь, в котором у каждого правила достаточно лемм (MIN_SUPPORT)
+STEMS = ["стол", "дом", "кот", "сад", "лес", "мост", "двор", "зал", "слон", "кран",
+         "лук", "жук", "мяч", "ключ", "врач", "нож", "сыр", "шар", "флаг", "бант"]
+VOCABULARY = (
+    STEMS
+    + ["кошка", "лампа", "книга", "рыба", "школа", "мама", "вода", "игра", "рука", "нога",
+       "зима", "гора", "луна", "роза", "лиса", "сова", "коза", "липа", "лужа", "каша"]
+    + ["кусок", "звонок", "платок", "замок", "листок", "цветок", "песок", "волчок", "сучок", "урок",
+       "венок", "крючок", "прыжок", "рожок", "глазок", "дружок", "ларек", "поток", "щенок", "мешок"]
+    + ["линия", "армия", "история", "энергия", "станция", "позиция", "версия", "серия", "эмоция",
+       "партия", "лекция", "акция", "секция", "реакция", "миссия", "пенсия", "комиссия", "магия",
+       "теория", "мелодия"]
+    + ["здание", "знание", "желание", "зрение", "пение", "чтение", "мнение", "сияние", "растение",
+       "решение", "событие", "занятие", "открытие", "явление", "движение", "правление", "рвение",
+       "влияние", "внимание", "задание"]
+    + ["человек", "ребенок"]
+)
+
+
+@pytest.fixture(scope="module")
+def index():
+    return LemmaIndex(build_lemma_index(VOCABULARY))
+
+
+@pytest.fixture(scope="module")
+def vocabulary():
+    return set(VOCABULARY)
+
+
+@pytest.mark.parametrize("form, lemma", [
+    ("столы", "стол"),
+    ("домами", "дом"),
+    ("кошки", "кошка"),
+    ("лампой", "лампа"),
+    ("куска", "кусок"),
+    ("звонками", "звонок"),
+    ("линии", "линия"),
+    ("зданиям", "здание"),
+])
+def test_suffix_rules_find_lemma(index, vocabulary, form, lemma):
+    assert index.lemmatize(form, vocabulary) == lemma
+
+
+def test_irregular_forms(index, vocabulary):
+    assert index.lemmatize("людей", vocabulary) == "человек"
+    assert index.lemmatize("дети", vocabulary) == "ребенок"
+
+
+def test_irregular_form_needs_lemma_in_dictionary():
+    built = build_lemma_index(["стол"])
+    assert "люди" not in built["irregular"]
+
+
+def test_lemma_itself_and_unknown_words(index, vocabulary):
+    assert index.lemmatize("стол", vocabulary) is None
+    assert index.lemmatize("сидит", vocabulary) is None
+
+
+def test_rules_need_support():
+    # Леммы на согласный: к-а-т, к-аа-т, ...
+    words = ["к" + "а" * i + "т" for i in range(1, MIN_SUPPORT)] + ["кошка"]
+    rules = build_lemma_index(words)["rules"]
+    # Ни у одной парадигмы нет MIN_SUPPORT лемм
+    assert rules == {}
+
+    words = ["к" + "а" * i + "т" for i in range(1, MIN_SUPPORT + 1)]
+    rules = build_lemma_index(words)["rules"]
+    assert "" in rules["ы"]
+    assert "а" not in rules.get("ы", ())
+
+
+def test_load_or_build_round_trip(tmp_path, index, vocabulary):
+    path = tmp_path / "lemma_index.json"
+    save_lemma_index(build_lemma_index(VOCABULARY), str(path))
+    loaded = LemmaIndex.load_or_build(str(path), [])
+    assert loaded.rules == index.rules
+    assert loaded.lemmatize("столы", vocabulary) == "стол"
+
+    built = LemmaIndex.load_or_build(str(tmp_path / "missing.json"), VOCABULARY)
+    assert built.max_suffix == index.max_suffix
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+import main
+from game_logic import GameMode, GameSession
+from session_store import SessionStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Журнал сессий и пустая память игр, как сразу после перезапуска"""
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    monkeypatch.setattr(main, "session_store", store)
+    monkeypatch.setattr(main, "active_games", {})
+    yield store
+    store.close()
+
+
+def start_game(store, game_id, mode=GameMode.SOLO, players=("p1",)):
+    game = GameSession(
+        game_id=game_id,
+        mode=mode,
+        similarity_engine=main.model_registry.current.engine,
+        players=list(players),
+        target_word="кошка"
+    )
+    store.record_game(game)
+    return game
+
+
+def find(game_id, client_id):
+    return asyncio.run(main.find_game(game_id, client_id))
+
+
+def test_game_is_restored_from_journal(store):
+    start_game(store, "g1")
+    store.record_guess("g1", "p1", "собака", 0.61234, 12)
+    store.record_hint("g1", "p1", "мышь")
+    store.record_guess("g1", "p1", "дом", 0.1, 900)
+
+    game = find("g1", "p1")
+    try:
+        assert game is main.active_games["g1"]
+        assert game.target_word == "кошка"
+        assert game.mode == GameMode.SOLO
+        assert game.attempts["p1"] == 2
+        assert [g["word"] for g in game.history["p1"]] == ["собака", "дом"]
+        assert game.history["p1"][0]["similarity"] == 0.6123
+        assert game.hints["p1"] == ["мышь"]
+        assert game.winner is None
+        # Второе обращение берет игру из памяти, а не из журнала
+        assert find("g1", "p1") is game
+    finally:
+        main.retire_game("g1")
+
+
+def test_restored_multiplayer_game_keeps_all_players(store):
+    start_game(store, "g2", GameMode.MULTIPLAYER, players=("p1", "p2"))
+    store.record_guess("g2", "p2", "собака", 0.6, 12)
+
+    game = find("g2", "p1")
+    try:
+        assert game.players == ["p1", "p2"]
+        assert game.attempts == {"p1": 0, "p2": 1}
+        assert main.channels.get("g2") is not None
+        assert find("g2", "p2") is game
+    finally:
+        main.retire_game("g2")
+
+
+def test_foreign_finished_and_unknown_games_are_not_restored(store):
+    start_game(store, "g3")
+    start_game(store, "g4")
+    store.record_guess("g4", "p1", "кошка", 1.0, 0)
+    store.record_finish("g4", "p1")
+
+    assert find("g3", "чужой") is None
+    assert find("g4", "p1") is None
+    assert find("нет такой", "p1") is None
+    assert find(["g3"], "p1") is None
+    assert main.active_games == {}
@@ -0,0 +1,158 @@
+import random
+import threading
+
+import pytest
+
+from spelling import (
+    MAX_DISTANCE, MIN_WORD_LENGTH, SpellingIndex, build_spelling_arrays, save_spelling_index,
+    within_one, within_two
+)
+
+LETTERS = "абвгдеко"
+
+
+def osa_distance(a: str, b: str) -> int:
+    """Эталонное расстояние OSA (динамика по таблице)"""
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+
+def random_word(rng, low=3, high=10):
+    return "".join(rng.choice(LETTERS) for _ in range(rng.randint(low, high)))
+
+
+def mutate(rng, word, edits):
+    for _ in range(edits):
+        i = rng.randrange(len(word) + 1)
+        kind = rng.randrange(4)
+        if kind == 0:
+            word = word[:i] + rng.choice(LETTERS) + word[i:]
+        elif kind == 1 and i < len(word):
+            word = word[:i] + word[i + 1:]
+        elif kind == 2 and i < len(word):
+            word = word[:i] + rng.choice(LETTERS) + word[i + 1:]
+        elif i + 1 < len(word):
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word
+
+
+def test_within_checks_match_osa_distance():
+    rng = random.Random(5)
+    for _ in range(5000):
+        a = random_word(rng)
+        b = mutate(rng, a, rng.randint(1, 3))
+        if a == b:
+            continue
+        distance = osa_distance(a, b)
+        assert within_one(a, b) == (distance <= 1), (a, b)
+        assert within_two(a, b) == (distance <= 2), (a, b)
+
+
+@pytest.mark.parametrize("a, b, one, two", [
+    ("кошка", "кашак", False, True),
+    ("кошка", "кошкa", True, True),
+    ("кошка", "окшка", True, True),
+    ("кошка", "кшка", True, True),
+    ("кошка", "кошкаа", True, True),
+    ("кошка", "ккошкаа", False, True),
+    ("кошка", "ошк", False, True),
+    ("кошка", "ош", False, False),
+])
+def test_within_examples(a, b, one, two):
+    assert within_one(a, b) == one
+    assert within_two(a, b) == two
+
+
+def make_database(count=1200, seed=9):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add(random_word(rng, 3, 11))
+    return {word: {"frequency": rng.randint(0, 50)} for word in words}
+
+
+def brute_force(database, word):
+    """Все слова на расстоянии до MAX_DISTANCE в порядке suggest"""
+    found = []
+    for candidate, info in database.items():
+        if candidate == word or abs(len(candidate) - len(word)) > MAX_DISTANCE:
+            continue
+        distance = osa_distance(word, candidate)
+        if distance <= MAX_DISTANCE:
+            found.append((distance, -float(info["frequency"]), candidate))
+    found.sort()
+    return [candidate for _, _, candidate in found]
+
+
+@pytest.fixture(scope="module")
+def database():
+    return make_database()
+
+
+@pytest.fixture(scope="module")
+def index(database):
+    return SpellingIndex(build_spelling_arrays(database))
+
+
+def test_candidate_filtering_matches_brute_force(index, database):
+    rng = random.Random(11)
+    words = sorted(database)
+    for _ in range(120):
+        query = mutate(rng, rng.choice(words), rng.randint(1, 2))
+        if len(query) < MIN_WORD_LENGTH:
+            continue
+        expected = brute_force(database, query)
+        # limit=1 часто обходится словами на расстоянии 1, без проверки расстояния 2
+        for limit in (1, 5, 50):
+            assert index.suggest(query, limit) == expected[:limit], query
+
+
+def test_long_words_are_found_past_prefix(index, database):
+    long_words = [w for w in database if len(w) > 9 and w[1] != w[2]]
+    for word in long_words[:50]:
+        assert word in index.suggest(word[:-1] + ("а" if word[-1] != "а" else "б"), 50)
+        assert word in index.suggest(word[0] + word[2] + word[1] + word[3:], 50)
+
+
+def test_short_and_exact_queries(index, database):
+    word = next(w for w in database if len(w) >= 5)
+    assert word not in index.suggest(word, 50)
+    assert index.suggest("ко") == []
+    assert index.suggest(word.upper().replace("е", "ё")) == index.suggest(word)
+
+
+def test_not_ready_index_has_no_suggestions():
+    index = SpellingIndex()
+    assert index.suggest("кошка") == []
+    assert index.stats() == {"ready": False}
+
+
+def test_load_or_build(tmp_path, database):
+    directory = str(tmp_path / "spelling_index")
+    built = SpellingIndex.load_or_build(directory, database, background=False)
+    save_spelling_index(build_spelling_arrays(database), directory)
+
+    loaded = SpellingIndex.load_or_build(directory, database)
+    assert loaded.ready
+    query = next(w for w in database if len(w) >= 5)[:-1]
+    assert loaded.suggest(query) == built.suggest(query)
+
+    # Другой список слов: индекс строится заново в фоне и сохраняется
+    changed = dict(database, кошка={"frequency": 1})
+    rebuilt = SpellingIndex.load_or_build(directory, changed)
+    for thread in threading.enumerate():
+        if thread.name == "spelling-index":
+            thread.join(30)
+    assert rebuilt.ready
+    assert "кошка" in rebuilt.suggest("кошкк")
+    assert "кошка" in SpellingIndex.load(directory).words
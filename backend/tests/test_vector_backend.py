@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from convert_model import load_source
+from vector_backend import VOCAB_SUFFIX, VectorModel, load_vectors, save_word2vec_format
+
+KEYS = ["кошка_NOUN", "собака_NOUN", "ёж_NOUN", "бежать_VERB"]
+VECTORS = np.array([
+    [3.0, 4.0, 0.0],
+    [4.0, 3.0, 0.0],
+    [0.0, 0.0, 2.0],
+    # Байты значений совпадают с пробелом и переводом строки (разделители формата)
+    np.frombuffer(b"  \x00\x00\n\n\n\n\x00\x00\x80\x3f", dtype="<f4"),
+], dtype=np.float32)
+
+
+def write_bin(path, newline_after_vector=True):
+    """Бинарный word2vec, как пишет оригинальный word2vec.c"""
+    with open(path, "wb") as f:
+        f.write(f"{len(KEYS)} {VECTORS.shape[1]}\n".encode())
+        for key, vector in zip(KEYS, VECTORS):
+            f.write(key.encode("utf-8") + b" " + vector.astype("<f4").tobytes())
+            if newline_after_vector:
+                f.write(b"\n")
+
+
+def unit(vectors):
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("newline", [True, False])
+def test_load_word2vec_bin(tmp_path, newline):
+    path = tmp_path / "model.bin"
+    write_bin(path, newline)
+    model = VectorModel.load_word2vec_format(str(path))
+
+    assert model.index_to_key == KEYS
+    assert len(model) == 4 and model.vector_size == 3
+    assert "ёж_NOUN" in model and "ёж" not in model
+    np.testing.assert_allclose(model.vectors, unit(VECTORS), rtol=1e-6)
+    assert model.similarity("кошка_NOUN", "собака_NOUN") == pytest.approx(24 / 25)
+
+
+def test_matches_gensim(tmp_path):
+    KeyedVectors = pytest.importorskip("gensim.models").KeyedVectors
+    path = tmp_path / "model.bin"
+    write_bin(path)
+    expected = KeyedVectors.load_word2vec_format(str(path), binary=True)
+    model = VectorModel.load_word2vec_format(str(path))
+
+    assert model.index_to_key == expected.index_to_key
+    np.testing.assert_allclose(model.vectors, expected.get_normed_vectors(), rtol=1e-6)
+    for key in KEYS:
+        ours = model.most_similar(key, topn=3)
+        theirs = expected.most_similar(key, topn=3)
+        assert [k for k, _ in ours] == [k for k, _ in theirs]
+        assert [s for _, s in ours] == pytest.approx([s for _, s in theirs], abs=1e-6)
+
+
+def test_most_similar_excludes_key_and_sorts():
+    rng = np.random.default_rng(0)
+    keys = [f"слово{i}" for i in range(50)]
+    vectors = unit(rng.normal(size=(50, 8)).astype(np.float32))
+    model = VectorModel(keys, vectors)
+
+    result = model.most_similar("слово7", topn=5)
+    scores = vectors @ vectors[7]
+    scores[7] = -np.inf
+    assert [k for k, _ in result] == [keys[i] for i in np.argsort(-scores)[:5]]
+    assert len(model.most_similar("слово7", topn=100)) == 49
+
+
+def test_convert_and_load_prefers_converted(tmp_path):
+    source = tmp_path / "model.bin"
+    save_word2vec_format(str(source), KEYS, VECTORS)
+    base = VectorModel.converted_path(str(source))
+    load_source(str(source)).save(base)
+
+    model = load_vectors(str(source))
+    assert isinstance(model.vectors, np.memmap)
+    assert model.index_to_key == KEYS
+    np.testing.assert_allclose(model.vectors, unit(VECTORS), rtol=1e-6)
+
+    in_memory = VectorModel.load(base, mmap=False)
+    assert not isinstance(in_memory.vectors, np.memmap)
+
+
+def test_load_rejects_mismatched_vocab(tmp_path):
+    base = str(tmp_path / "model")
+    VectorModel(KEYS, unit(VECTORS)).save(base)
+    with open(base + VOCAB_SUFFIX, "a", encoding="utf-8") as f:
+        f.write("лишний_NOUN\n")
+    with pytest.raises(ValueError):
+        VectorModel.load(base)
@@ -0,0 +1,119 @@
+"""
+Векторная модель на NumPy вместо gensim KeyedVectors
+
+Реализует ровно то, что нужно WordSimilarityEngine: словарь ключей,
+матрицу нормированных векторов, `in`, most_similar и similarity.
+Сервер не импортирует gensim (и вместе с ним scipy и smart_open).
+
+Основной формат — пара файлов, которые пишет convert_model.py:
+    <имя>.npy    матрица float32, строки уже нормированы (открывается через mmap)
+    <имя>.vocab  ключи по одному на строку, в порядке строк матрицы
+Бинарный word2vec (.bin) тоже читается, но медленнее и целиком в память.
+"""
+
+import os
+
+import numpy as np
+
+VECTORS_SUFFIX = ".npy"
+VOCAB_SUFFIX = ".vocab"
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    vectors /= norms
+    return vectors
+
+
+class VectorModel:
+    """Ключи и единичные векторы; интерфейс совпадает с используемой частью KeyedVectors"""
+
+    def __init__(self, keys, vectors: np.ndarray):
+        self.index_to_key = list(keys)
+        self.key_to_index = {key: i for i, key in enumerate(self.index_to_key)}
+        self.vectors = vectors
+        self.vector_size = vectors.shape[1]
+
+    def __contains__(self, key) -> bool:
+        return key in self.key_to_index
+
+    def __len__(self) -> int:
+        return len(self.index_to_key)
+
+    def similarity(self, key1: str, key2: str) -> float:
+        return float(self.vectors[self.key_to_index[key1]].dot(self.vectors[self.key_to_index[key2]]))
+
+    def most_similar(self, key: str, topn: int = 10) -> list:
+        """topn ближайших ключей по косинусу, без самого key (как в gensim)"""
+        row = self.key_to_index[key]
+        scores = self.vectors @ self.vectors[row]
+        count = min(topn + 1, len(scores))
+        best = np.argpartition(-scores, count - 1)[:count]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        keys = self.index_to_key
+        return [(keys[i], float(scores[i])) for i in best.tolist() if i != row][:topn]
+
+    # ========== ФАЙЛЫ ==========
+
+    @staticmethod
+    def converted_path(model_path: str) -> str:
+        """База имени сконвертированной модели рядом с исходным файлом"""
+        return os.path.splitext(model_path)[0]
+
+    @classmethod
+    def load(cls, base_path: str, mmap: bool = True) -> "VectorModel":
+        vectors = np.load(base_path + VECTORS_SUFFIX, mmap_mode="r" if mmap else None)
+        with open(base_path + VOCAB_SUFFIX, "r", encoding="utf-8") as f:
+            keys = f.read().split("\n")
+        if keys and keys[-1] == "":
+            keys.pop()
+        if len(keys) != len(vectors):
+            raise ValueError(f"{base_path}: {len(keys)} ключей, {len(vectors)} векторов")
+        return cls(keys, vectors)
+
+    def save(self, base_path: str):
+        np.save(base_path + VECTORS_SUFFIX, np.ascontiguousarray(self.vectors, dtype=np.float32))
+        with open(base_path + VOCAB_SUFFIX, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.index_to_key))
+            f.write("\n")
+
+    @classmethod
+    def load_word2vec_format(cls, path: str) -> "VectorModel":
+        """Бинарный формат word2vec (как у RusVectōrēs), векторы нормируются"""
+        with open(path, "rb") as f:
+            data = f.read()
+
+        header_end = data.index(b"\n")
+        count, size = (int(x) for x in data[:header_end].split())
+        row_bytes = size * 4
+        vectors = np.empty((count, size), dtype=np.float32)
+        keys = []
+        position = header_end + 1
+        for row in range(count):
+            space = data.index(b" ", position)
+            keys.append(data[position:space].decode("utf-8", errors="ignore").strip())
+            start = space + 1
+            vectors[row] = np.frombuffer(data, dtype="<f4", count=size, offset=start)
+            position = start + row_bytes
+            if position < len(data) and data[position:position + 1] == b"\n":
+                position += 1
+
+        return cls(keys, normalize_rows(vectors))
+
+
+def load_vectors(model_path: str) -> VectorModel:
+    """Сконвертированная модель рядом с model_path, иначе сам word2vec файл"""
+    base_path = VectorModel.converted_path(model_path)
+    if os.path.exists(base_path + VECTORS_SUFFIX) and os.path.exists(base_path + VOCAB_SUFFIX):
+        return VectorModel.load(base_path)
+    return VectorModel.load_word2vec_format(model_path)
+
+
+def save_word2vec_format(path: str, keys, vectors: np.ndarray):
+    """Пишет бинарный word2vec файл (для тестовых данных без gensim)"""
+    vectors = np.asarray(vectors, dtype="<f4")
+    with open(path, "wb") as f:
+        f.write(f"{len(keys)} {vectors.shape[1]}\n".encode("utf-8"))
+        for key, vector in zip(keys, vectors):
+            f.write(key.encode("utf-8") + b" " + vector.tobytes() + b"\n")
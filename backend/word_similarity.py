@@ -1,56 +1,168 @@
-import gensim
-from gensim.models import KeyedVectors
 import os
 import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+import numpy as np
 from difflib import SequenceMatcher
+from logger import get_logger
+from morphology import DEFAULT_INDEX_PATH, LemmaIndex
+from popular_words import get_popular_words
+from spelling import DEFAULT_INDEX_DIR, SpellingIndex
+from difficulty import DIFFICULTY_PATH, TargetDifficulty
+from metrics import timed, CacheStats
+from vector_backend import VECTORS_SUFFIX, VectorModel, load_vectors
+
+logger = get_logger("similarity")
+
+SYNONYMS_CACHE_SIZE = 2048
+ROW_INDEX_CACHE_SIZE = 65536
+DEFAULT_MODEL_PATH = "ruscorpora_upos_skipgram_300_2_2019.bin"
 
 class WordSimilarityEngine:
-    def __init__(self, database_path='word_database.json', ai_system=None):
-        """Инициализация с AI системой"""
+    def __init__(self, database_path='word_database.json', ai_system=None, model_path=DEFAULT_MODEL_PATH, load=True):
+        """Инициализация с AI системой
+
+        При load=False база и модель не загружаются: load_database() и
+        load_model() вызываются позже (например, в фоне при старте сервера).
+        """
         self.model = None
+        self.database_path = database_path
+        self.model_path = model_path
         self.word_database = {}
+        self.lemma_index = None
+        self.spelling_index = None
+        self.target_difficulty = None
+        self._words_by_id = None
         self.ai_system = ai_system
+        self.association_graph = None
+        self._synonyms_cache = OrderedDict()
+        self._synonyms_stats = CacheStats("synonyms")
+        # get_synonyms вызывается и из event loop, и из пула потоков (/api/score, подсказки)
+        self.cache_lock = threading.Lock()
+        self._unit_vectors = None
+        self._row_index = lru_cache(maxsize=ROW_INDEX_CACHE_SIZE)(self._resolve_row)
         
-        self.load_database(database_path)
-        self.load_model()
+        if load:
+            self.load_database(database_path)
+            self.load_model()
     
     def load_database(self, database_path):
         """Загружает базу слов"""
         if os.path.exists(database_path):
-            print(f"📖 Загрузка базы слов...")
+            logger.info("📖 Загрузка базы слов...")
             with open(database_path, 'r', encoding='utf-8') as f:
                 self.word_database = json.load(f)
-            print(f"✓ Загружено {len(self.word_database)} слов")
+            logger.info(f"✓ Загружено {len(self.word_database)} слов")
+            
+            # Индекс лемм лежит рядом с базой (строится в load_dictionary.py)
+            index_path = os.path.join(os.path.dirname(database_path), DEFAULT_INDEX_PATH)
+            self.lemma_index = LemmaIndex.load_or_build(index_path, self.word_database)
+            spelling_path = os.path.join(os.path.dirname(database_path), DEFAULT_INDEX_DIR)
+            self.spelling_index = SpellingIndex.load_or_build(
+                spelling_path, self.word_database, get_popular_words()
+            )
         else:
-            print(f"⚠️ База слов не найдена")
+            logger.warning("⚠️ База слов не найдена")
     
     def load_model(self):
-        """Загружает Word2Vec модель"""
-        model_path = "ruscorpora_upos_skipgram_300_2_2019.bin"
+        """Загружает Word2Vec модель (сконвертированную через convert_model.py, если есть)"""
+        model_path = self.model_path
+        converted = VectorModel.converted_path(model_path) + VECTORS_SUFFIX
         
-        if os.path.exists(model_path):
+        if os.path.exists(converted) or os.path.exists(model_path):
             try:
-                print("📦 Загрузка Word2Vec модели...")
-                self.model = KeyedVectors.load_word2vec_format(
-                    model_path,
-                    binary=True
-                )
-                print("✓ Word2Vec модель загружена!")
+                logger.info("📦 Загрузка Word2Vec модели...")
+                if not os.path.exists(converted):
+                    logger.warning("⚠️ Модель не сконвертирована: чтение .bin, запустите convert_model.py")
+                self.model = load_vectors(model_path)
+                self._build_vector_index()
+                logger.info("✓ Word2Vec модель загружена!")
+                # Статистика самоигры (simulate.py) для этой модели, если посчитана
+                difficulty_path = os.path.join(os.path.dirname(self.database_path), DIFFICULTY_PATH)
+                self.target_difficulty = TargetDifficulty.load(difficulty_path, self.model_name)
             except Exception as e:
-                print(f"⚠️ Ошибка загрузки модели: {e}")
+                logger.error(f"⚠️ Ошибка загрузки модели: {e}")
                 self.model = None
         else:
-            print("⚠️ Word2Vec модель не найдена")
+            logger.warning("⚠️ Word2Vec модель не найдена")
             self.model = None
     
+    @property
+    def model_name(self) -> str:
+        """Имя модели без пути и расширения (ключ кэшей, зависящих от модели)"""
+        return os.path.splitext(os.path.basename(self.model_path))[0]
+    
+    def scoring_fingerprint(self) -> dict:
+        """Что кроме модели влияет на оценку: граф ассоциаций и AI.
+
+        Выученные AI связи меняются непрерывно, поэтому учитывается только
+        то, подключена ли AI система.
+        """
+        graph = self.association_graph
+        return {
+            "model": self.model_name,
+            "graph": graph.fingerprint if graph is not None else None,
+            "ai": self.ai_system is not None,
+        }
+    
+    def with_model(self, model_path: str) -> "WordSimilarityEngine":
+        """Новый движок с другой моделью; база, леммы, граф и AI общие"""
+        engine = WordSimilarityEngine(
+            database_path=self.database_path,
+            ai_system=self.ai_system,
+            model_path=model_path,
+            load=False
+        )
+        engine.word_database = self.word_database
+        engine.lemma_index = self.lemma_index
+        engine.spelling_index = self.spelling_index
+        engine.association_graph = self.association_graph
+        engine.load_model()
+        return engine
+    
+    def unload_model(self):
+        """Освобождает модель и все кэши, зависящие от нее"""
+        self.model = None
+        self._unit_vectors = None
+        self.target_difficulty = None
+        with self.cache_lock:
+            self._synonyms_cache.clear()
+        self._row_index.cache_clear()
+    
+    def caches(self) -> list:
+        """LRU кэш синонимов (для учета и вытеснения памяти)"""
+        return [self._synonyms_cache]
+    
+    def _build_vector_index(self):
+        """Запоминает матрицу единичных векторов и сбрасывает кэш индексов строк
+
+        VectorModel хранит векторы уже нормированными, поэтому
+        get_similarity считает косинус одним скалярным произведением.
+        """
+        self._unit_vectors = self.model.vectors
+        self._row_index.cache_clear()
+    
+    def _resolve_row(self, word: str) -> int:
+        """Строка матрицы для слова: сначала слово_NOUN, затем само слово; -1 если нет"""
+        key_to_index = self.model.key_to_index
+        row = key_to_index.get(f"{word}_NOUN")
+        if row is None:
+            row = key_to_index.get(word, -1)
+        return row
+    
     def normalize_word(self, word: str) -> str:
         """Нормализация слова с заменой ё → е"""
         word = word.lower().strip()
         word = word.replace('ё', 'е')
         return word
     
-    def validate_word(self, word: str) -> dict:
-        """Проверяет валидность слова с поддержкой ё/е"""
+    def validate_word(self, word: str, suggest: bool = True) -> dict:
+        """Проверяет валидность слова с поддержкой ё/е.
+
+        suggest=False — без поиска исправлений опечаток (пакетная оценка
+        их не показывает).
+        """
         word_normalized = self.normalize_word(word)
         
         if not word_normalized:
@@ -63,18 +175,45 @@ class WordSimilarityEngine:
         if word_original in self.word_database:
             return {"valid": True, "word": word_original}
         
+        # Словоформа → лемма из словаря ("котами" → "кот")
+        if self.lemma_index:
+            lemma = self.lemma_index.lemmatize(word_normalized, self.word_database)
+            if lemma:
+                return {"valid": True, "word": lemma, "surface": word_normalized}
+        
         return {
             "valid": False,
-            "message": f"Слово '{word}' не найдено в словаре"
+            "message": f"Слово '{word}' не найдено в словаре",
+            "suggestions": self.spelling_index.suggest(word_normalized) if suggest and self.spelling_index else []
         }
     
+    @timed("get_synonyms")
     def get_synonyms(self, word: str, top_n: int = 20) -> list:
-        """Получает синонимы через Word2Vec"""
+        """Получает синонимы через Word2Vec (с LRU-кэшем по слову и top_n)"""
         if not self.model:
             return []
         
         word = self.normalize_word(word)
+        key = (word, top_n)
         
+        with self.cache_lock:
+            cached = self._synonyms_cache.get(key)
+            if cached is not None:
+                self._synonyms_cache.move_to_end(key)
+        if cached is not None:
+            self._synonyms_stats.hit()
+            return cached
+        
+        self._synonyms_stats.miss()
+        # Считается вне блокировки: два потока могут посчитать одно слово, это безопасно
+        synonyms = self._compute_synonyms(word, top_n)
+        with self.cache_lock:
+            self._synonyms_cache[key] = synonyms
+            if len(self._synonyms_cache) > SYNONYMS_CACHE_SIZE:
+                self._synonyms_cache.popitem(last=False)
+        return synonyms
+    
+    def _compute_synonyms(self, word: str, top_n: int) -> list:
         try:
             variants = [f"{word}_NOUN", f"{word}_ADJ", word]
             
@@ -92,6 +231,7 @@ class WordSimilarityEngine:
         except Exception as e:
             return []
     
+    @timed("get_similarity")
     def get_similarity(self, word1: str, word2: str) -> float:
         """Вычисляет похожесть с уменьшенным весом AI"""
         word1 = self.normalize_word(word1)
@@ -100,6 +240,18 @@ class WordSimilarityEngine:
         if word1 == word2:
             return 1.0
         
+        w2v_sim = None
+        unit = self._unit_vectors
+        if unit is not None:
+            row1 = self._row_index(word1)
+            row2 = self._row_index(word2)
+            if row1 >= 0 and row2 >= 0:
+                w2v_sim = float(unit[row1].dot(unit[row2]))
+        
+        return self._combine_similarity(word1, word2, w2v_sim)
+    
+    def _combine_similarity(self, word1: str, word2: str, w2v_sim) -> float:
+        """Взвешенная сумма сигналов; w2v_sim=None, если слова нет в модели"""
         similarities = []
         
         # 1. AI обучение (15% веса)
@@ -108,24 +260,18 @@ class WordSimilarityEngine:
             if ai_sim > 0:
                 similarities.append(('ai', ai_sim, 0.15))
         
-        # 2. Word2Vec (70% веса)
-        if self.model:
-            try:
-                variants1 = [f"{word1}_NOUN", word1]
-                variants2 = [f"{word2}_NOUN", word2]
-                
-                for v1 in variants1:
-                    for v2 in variants2:
-                        if v1 in self.model and v2 in self.model:
-                            w2v_sim = float(self.model.similarity(v1, v2))
-                            similarities.append(('w2v', w2v_sim, 0.70))
-                            break
-                    if similarities and similarities[-1][0] == 'w2v':
-                        break
-            except:
-                pass
-        
-        # 3. Фонетическая (15% веса)
+        # 2. Граф ассоциаций WORD_CATEGORIES + выученные категории (15% веса)
+        graph = self.association_graph
+        if graph is not None:
+            graph_sim = graph.strength(word1, word2)
+            if graph_sim > 0:
+                similarities.append(('graph', graph_sim, 0.15))
+        
+        # 3. Word2Vec (70% веса)
+        if w2v_sim is not None:
+            similarities.append(('w2v', w2v_sim, 0.70))
+        
+        # 4. Фонетическая (15% веса)
         phonetic_sim = SequenceMatcher(None, word1, word2).ratio()
         similarities.append(('phonetic', phonetic_sim, 0.15))
         
@@ -137,6 +283,7 @@ class WordSimilarityEngine:
         
         return 0.0
     
+    @timed("get_rank")
     def get_rank(self, guess_word: str, target_word: str) -> int:
         """Вычисляет ранг БЕЗ AI (для одинакового ранга у всех)"""
         guess_word = self.normalize_word(guess_word)
@@ -149,12 +296,18 @@ class WordSimilarityEngine:
         synonyms = self.get_synonyms(target_word, top_n=100)
         for idx, (syn_word, score) in enumerate(synonyms):
             if syn_word == guess_word:
-                rank = int(idx / score) + 1
-                return min(rank, 200)
+                return self._synonym_rank(idx, score)
         
         # По похожести
-        similarity = self.get_similarity(guess_word, target_word)
-        
+        return self._rank_from_similarity(self.get_similarity(guess_word, target_word))
+    
+    @staticmethod
+    def _synonym_rank(idx: int, score: float) -> int:
+        rank = int(idx / score) + 1
+        return min(rank, 200)
+    
+    @staticmethod
+    def _rank_from_similarity(similarity: float) -> int:
         if similarity >= 0.85:
             return int((1 - similarity) * 200) + 10
         elif similarity >= 0.70:
@@ -170,10 +323,64 @@ class WordSimilarityEngine:
         else:
             return int((1 - similarity) * 63000) + 36000
     
+    @timed("score_batch")
+    def score_batch(self, guesses: list, target_word: str) -> list:
+        """Похожесть и ранг для многих слов против одного target.
+
+        Word2Vec часть считается одним умножением матрицы на вектор,
+        остальное — как в get_similarity / get_rank.
+        Возвращает список пар (similarity, rank) в порядке guesses.
+        """
+        target_word = self.normalize_word(target_word)
+        guesses = [self.normalize_word(g) for g in guesses]
+        
+        w2v = [None] * len(guesses)
+        unit = self._unit_vectors
+        if unit is not None:
+            target_row = self._row_index(target_word)
+            if target_row >= 0:
+                rows = np.fromiter((self._row_index(g) for g in guesses), dtype=np.int64, count=len(guesses))
+                present = np.flatnonzero(rows >= 0)
+                if len(present):
+                    dots = unit[rows[present]] @ unit[target_row]
+                    for position, value in zip(present.tolist(), dots.tolist()):
+                        w2v[position] = value
+        
+        synonym_positions = {
+            word: (idx, score)
+            for idx, (word, score) in enumerate(self.get_synonyms(target_word, top_n=100))
+        }
+        
+        results = []
+        for guess, w2v_sim in zip(guesses, w2v):
+            if guess == target_word:
+                results.append((1.0, 0))
+                continue
+            similarity = self._combine_similarity(guess, target_word, w2v_sim)
+            synonym = synonym_positions.get(guess)
+            if synonym is not None:
+                rank = self._synonym_rank(*synonym)
+            else:
+                rank = self._rank_from_similarity(similarity)
+            results.append((similarity, rank))
+        return results
+    
     def get_all_words(self) -> list:
         """Возвращает все слова"""
         return list(self.word_database.keys())
     
+    def get_word_by_id(self, word_id: int):
+        """Слово по его id из word_database (None, если такого нет)"""
+        words_by_id = self._words_by_id
+        if words_by_id is None or len(words_by_id) != len(self.word_database):
+            words_by_id = {
+                info['id']: word
+                for word, info in self.word_database.items()
+                if isinstance(info, dict) and 'id' in info
+            }
+            self._words_by_id = words_by_id
+        return words_by_id.get(word_id)
+    
     def get_word_info(self, word: str) -> dict:
         """Информация о слове"""
         word = self.normalize_word(word)
@@ -1,8 +1,17 @@
 import { useState, useEffect, useRef } from 'react'
 import './App.css'
 
+const CLIENT_ID_KEY = 'wordweave_client_id'
+const GAME_ID_KEY = 'wordweave_game_id'
+
 function App() {
-  const [clientId] = useState(() => 'player_' + Math.random().toString(36).substr(2, 9))
+  const [clientId] = useState(() => {
+    const saved = localStorage.getItem(CLIENT_ID_KEY)
+    if (saved) return saved
+    const id = 'player_' + Math.random().toString(36).substr(2, 9)
+    localStorage.setItem(CLIENT_ID_KEY, id)
+    return id
+  })
   const [gameMode, setGameMode] = useState(null)
   const [gameId, setGameId] = useState(null)
   const [gameStatus, setGameStatus] = useState('menu')
@@ -14,6 +23,8 @@ function App() {
   const [opponentId, setOpponentId] = useState(null)
   const [opponentAttempts, setOpponentAttempts] = useState(0)
   const [opponentLastWord, setOpponentLastWord] = useState('')
+  const [suggestions, setSuggestions] = useState([])
+  const [didYouMean, setDidYouMean] = useState([])
   
   const [showRules, setShowRules] = useState(false)
   const [showStats, setShowStats] = useState(false)
@@ -55,92 +66,146 @@ function App() {
   }, [totalTimeSpent])
 
   useEffect(() => {
-    console.log('🔌 Подключение к серверу...')
-    ws.current = new WebSocket(`ws://localhost:8000/ws/${clientId}`)
+    let reconnectTimer = null
+    let reconnectAttempt = 0
+    let closedByUser = false
+
+    const connect = () => {
+      console.log('🔌 Подключение к серверу...')
+      ws.current = new WebSocket(`ws://localhost:8000/ws/${clientId}`)
     
-    ws.current.onopen = () => {
-      console.log('✓ Соединение установлено')
-    }
+      ws.current.onopen = () => {
+        console.log('✓ Соединение установлено')
+        reconnectAttempt = 0
+        const savedGameId = localStorage.getItem(GAME_ID_KEY)
+        if (savedGameId) {
+          ws.current.send(JSON.stringify({ action: 'resume', game_id: savedGameId }))
+        }
+      }
     
-    ws.current.onmessage = (event) => {
-      const data = JSON.parse(event.data)
-      console.log('📨 Получено:', data)
+      ws.current.onmessage = (event) => {
+        const data = JSON.parse(event.data)
+        if (data.type === 'ping') {
+          ws.current.send(JSON.stringify({ action: 'pong' }))
+          return
+        }
+        console.log('📨 Получено:', data)
       
-      if (data.type === 'game_started') {
-        setGameId(data.game_id)
-        setGameMode(data.mode)
-        setGameStatus('playing')
-        setGuessHistory([])
-        setAttempts(0)
-        setOpponentAttempts(0)
-        sessionStartTime.current = Date.now()
+        if (data.type === 'game_started') {
+          localStorage.setItem(GAME_ID_KEY, data.game_id)
+          setGameId(data.game_id)
+          setGameMode(data.mode)
+          setGameStatus('playing')
+          setGuessHistory([])
+          setAttempts(0)
+          setOpponentAttempts(0)
+          sessionStartTime.current = Date.now()
         
-        if (data.mode === 'solo') {
-          setMessage('🎮 Игра началась! Угадайте слово.')
-        } else {
+          if (data.mode === 'solo') {
+            setMessage('🎮 Игра началась! Угадайте слово.')
+          } else if (data.mode === 'daily') {
+            setMessage(`📅 Слово дня #${data.number}! Одно слово для всех игроков.`)
+          } else {
+            setOpponentId(data.opponent)
+            setMessage('⚔️ Соперник найден! Кто быстрее угадает слово.')
+          }
+        } 
+        else if (data.type === 'game_resumed') {
+          setGameId(data.game_id)
+          setGameMode(data.mode)
+          setGameStatus('playing')
+          setGuessHistory(data.history || [])
+          setAttempts(data.attempts || 0)
           setOpponentId(data.opponent)
-          setMessage('⚔️ Соперник найден! Кто быстрее угадает слово.')
+          setMessage('♻️ Игра восстановлена, продолжайте!')
         }
-      } 
-      else if (data.type === 'waiting_for_opponent') {
-        setGameStatus('waiting')
-        setMessage('⏳ Поиск соперника...')
-      }
-      else if (data.type === 'guess_result') {
-        if (data.error) {
-          setMessage('❌ ' + data.error)
-          return
+        else if (data.type === 'resume_failed') {
+          localStorage.removeItem(GAME_ID_KEY)
+        }
+        else if (data.type === 'waiting_for_opponent') {
+          setGameStatus('waiting')
+          setMessage('⏳ Поиск соперника...')
         }
+        else if (data.type === 'guess_result') {
+          if (data.error) {
+            setMessage('❌ ' + data.error)
+            setDidYouMean(data.suggestions || [])
+            return
+          }
         
-        setGuessHistory(data.history || [])
-        setAttempts(data.attempts || attempts)
+          setDidYouMean([])
+          setGuessHistory(data.history || [])
+          setAttempts(data.attempts || attempts)
         
-        if (data.is_correct) {
+          if (data.is_correct) {
+            localStorage.removeItem(GAME_ID_KEY)
+            setGameStatus('finished')
+            setTargetWord(data.target_word)
+            const gameTime = Math.floor((Date.now() - sessionStartTime.current) / 1000)
+            setMessage(`🎉 Победа! Вы угадали слово "${data.target_word}" за ${data.attempts} попыток!`)
+            updateStatsFunc(true, data.attempts, gameTime)
+          } else {
+            const rankText = data.rank < 100 ? `очень близко (ранг ${data.rank})` :
+                            data.rank < 500 ? `близко (ранг ${data.rank})` :
+                            data.rank < 1000 ? `средне (ранг ${data.rank})` :
+                            `далеко (ранг ${data.rank})`
+            setMessage(`"${data.word}" - ${rankText}`)
+          }
+        }
+        else if (data.type === 'opponent_guess') {
+          setOpponentAttempts(data.attempts)
+          setOpponentLastWord(data.last_word || '')
+        }
+        else if (data.type === 'game_over') {
+          localStorage.removeItem(GAME_ID_KEY)
           setGameStatus('finished')
-          setTargetWord(data.target_word)
+          setTargetWord(data.word)
           const gameTime = Math.floor((Date.now() - sessionStartTime.current) / 1000)
-          setMessage(`🎉 Победа! Вы угадали слово "${data.target_word}" за ${data.attempts} попыток!`)
-          updateStatsFunc(true, data.attempts, gameTime)
-        } else {
-          const rankText = data.rank < 100 ? `очень близко (ранг ${data.rank})` :
-                          data.rank < 500 ? `близко (ранг ${data.rank})` :
-                          data.rank < 1000 ? `средне (ранг ${data.rank})` :
-                          `далеко (ранг ${data.rank})`
-          setMessage(`"${data.word}" - ${rankText}`)
-        }
-      }
-      else if (data.type === 'opponent_guess') {
-        setOpponentAttempts(data.attempts)
-        setOpponentLastWord(data.last_word || '')
-      }
-      else if (data.type === 'game_over') {
-        setGameStatus('finished')
-        setTargetWord(data.word)
-        const gameTime = Math.floor((Date.now() - sessionStartTime.current) / 1000)
         
-        if (data.winner === clientId) {
-          setMessage(`🎉 Победа! Слово: "${data.word}"`)
-          updateStatsFunc(true, attempts, gameTime)
-        } else {
-          setMessage(`😔 Соперник победил. Слово было: "${data.word}"`)
-          updateStatsFunc(false, attempts, gameTime)
+          if (data.winner === clientId) {
+            setMessage(`🎉 Победа! Слово: "${data.word}"`)
+            updateStatsFunc(true, attempts, gameTime)
+          } else {
+            setMessage(`😔 Соперник победил. Слово было: "${data.word}"`)
+            updateStatsFunc(false, attempts, gameTime)
+          }
+        }
+        else if (data.type === 'completions') {
+          setSuggestions(data.words || [])
+        }
+        else if (data.type === 'hint') {
+          if (data.available) {
+            setMessage(`💡 Подсказка: "${data.word}"${data.rank ? ` (ранг ${data.rank})` : ''}`)
+          } else {
+            setMessage('💡 ' + data.message)
+          }
+        }
+        else if (data.type === 'error') {
+          setMessage('❌ ' + data.message)
         }
       }
-      else if (data.type === 'error') {
-        setMessage('❌ ' + data.message)
-      }
-    }
     
-    ws.current.onerror = (error) => {
-      console.error('❌ Ошибка WebSocket:', error)
-      setMessage('❌ Ошибка подключения к серверу')
-    }
+      ws.current.onerror = (error) => {
+        console.error('❌ Ошибка WebSocket:', error)
+        setMessage('❌ Ошибка подключения к серверу')
+      }
     
-    ws.current.onclose = () => {
-      console.log('🔌 Соединение закрыто')
+      ws.current.onclose = (event) => {
+        console.log('🔌 Соединение закрыто')
+        // 4000: этот же игрок подключился из другой вкладки
+        if (closedByUser || event.code === 4000) return
+        // Экспоненциальная задержка с разбросом, чтобы клиенты не переподключались разом
+        const delay = Math.min(30000, 1000 * 2 ** reconnectAttempt) * (0.5 + Math.random() / 2)
+        reconnectAttempt += 1
+        reconnectTimer = setTimeout(connect, delay)
+      }
     }
+
+    connect()
     
     return () => {
+      closedByUser = true
+      clearTimeout(reconnectTimer)
       if (ws.current) {
         ws.current.close()
       }
@@ -168,8 +233,9 @@ function App() {
   const startGame = (mode) => {
     console.log(`🎮 Начинаем игру в режиме: ${mode}`)
     if (ws.current && ws.current.readyState === WebSocket.OPEN) {
+      const actions = { solo: 'start_solo', daily: 'start_daily', multiplayer: 'start_multiplayer' }
       ws.current.send(JSON.stringify({
-        action: mode === 'solo' ? 'start_solo' : 'start_multiplayer'
+        action: actions[mode]
       }))
     }
   }
@@ -197,6 +263,31 @@ function App() {
       }))
     }
     setInputWord('')
+    setSuggestions([])
+  }
+
+  const handleInputChange = (value) => {
+    setInputWord(value)
+    const prefix = value.trim()
+    if (prefix.length >= 2 && ws.current && ws.current.readyState === WebSocket.OPEN) {
+      ws.current.send(JSON.stringify({
+        action: 'complete',
+        prefix: prefix,
+        limit: 8
+      }))
+    } else {
+      setSuggestions([])
+    }
+  }
+
+  const requestHint = (band) => {
+    if (ws.current && ws.current.readyState === WebSocket.OPEN) {
+      ws.current.send(JSON.stringify({
+        action: 'hint',
+        game_id: gameId,
+        band: band
+      }))
+    }
   }
 
   const handleKeyPress = (e) => {
@@ -206,6 +297,7 @@ function App() {
   }
 
   const resetGame = () => {
+    localStorage.removeItem(GAME_ID_KEY)
     setGameStatus('menu')
     setGameMode(null)
     setGameId(null)
@@ -265,6 +357,13 @@ function App() {
                 <small>Играйте в своем темпе</small>
               </div>
             </button>
+            <button className="btn btn-primary" onClick={() => startGame('daily')}>
+              <div className="btn-icon">📅</div>
+              <div className="btn-text">
+                <strong>Слово дня</strong>
+                <small>Одно слово для всех</small>
+              </div>
+            </button>
             <button className="btn btn-primary" onClick={() => startGame('multiplayer')}>
               <div className="btn-icon">⚔️</div>
               <div className="btn-text">
@@ -314,16 +413,49 @@ function App() {
               type="text"
               className="word-input"
               value={inputWord}
-              onChange={(e) => setInputWord(e.target.value)}
+              onChange={(e) => handleInputChange(e.target.value)}
+              list="word-suggestions"
               onKeyPress={handleKeyPress}
               placeholder="Введите слово..."
               autoFocus
             />
+            <datalist id="word-suggestions">
+              {suggestions.map((word) => (
+                <option key={word} value={word} />
+              ))}
+            </datalist>
             <button className="btn btn-primary btn-large" onClick={makeGuess}>
               Проверить →
             </button>
           </div>
 
+          {didYouMean.length > 0 && (
+            <div className="did-you-mean">
+              Возможно, вы имели в виду:
+              {didYouMean.map((word) => (
+                <button
+                  key={word}
+                  className="btn btn-outline btn-small"
+                  onClick={() => { setInputWord(word); setDidYouMean([]) }}
+                >
+                  {word}
+                </button>
+              ))}
+            </div>
+          )}
+
+          <div className="hint-buttons">
+            <button className="btn btn-outline btn-small" onClick={() => requestHint('far')}>
+              💡 Дальняя подсказка
+            </button>
+            <button className="btn btn-outline btn-small" onClick={() => requestHint('medium')}>
+              💡 Средняя
+            </button>
+            <button className="btn btn-outline btn-small" onClick={() => requestHint('close')}>
+              💡 Близкая
+            </button>
+          </div>
+
           <div className="history">
             <h3>История попыток (сортировано по близости)</h3>
             <div className="history-list">